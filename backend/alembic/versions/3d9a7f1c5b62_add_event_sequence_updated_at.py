@@ -0,0 +1,30 @@
+"""add event sequence updated_at
+
+Revision ID: 3d9a7f1c5b62
+Revises: f1c6a3d8e925
+Create Date: 2026-10-19 05:02:47.318265
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3d9a7f1c5b62'
+down_revision: Union[str, None] = 'f1c6a3d8e925'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('organization_event_sequences', sa.Column(
+        'updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False
+    ))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('organization_event_sequences', 'updated_at')
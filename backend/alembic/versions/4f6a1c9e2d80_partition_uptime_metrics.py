@@ -0,0 +1,95 @@
+"""create partitioned uptime_metrics and uptime_reports
+
+Revision ID: 4f6a1c9e2d80
+Revises: e8b2d4c61f37
+Create Date: 2026-10-18 14:03:27.880412
+
+"""
+from datetime import datetime, timedelta
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4f6a1c9e2d80'
+down_revision: Union[str, None] = 'e8b2d4c61f37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('organizations', sa.Column('metrics_retention_days', sa.Integer(), server_default='90', nullable=False))
+
+    bind = op.get_bind()
+    legacy = bind.execute(sa.text(
+        "SELECT c.relkind FROM pg_class c WHERE c.relname = 'uptime_metrics' AND c.relkind IN ('r', 'p')"
+    )).scalar()
+    if legacy == 'r':
+        # Table created outside of migrations (e.g. create_all): keep its rows
+        op.execute('ALTER TABLE uptime_metrics RENAME TO uptime_metrics_legacy')
+
+    if legacy != 'p':
+        op.execute("""
+            CREATE TABLE uptime_metrics (
+                id BIGSERIAL NOT NULL,
+                service_id INTEGER NOT NULL REFERENCES services (id),
+                "timestamp" TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+                status VARCHAR(50) NOT NULL,
+                response_time DOUBLE PRECISION,
+                is_up BOOLEAN NOT NULL,
+                organization_id INTEGER NOT NULL REFERENCES organizations (id),
+                PRIMARY KEY (id, "timestamp")
+            ) PARTITION BY RANGE ("timestamp")
+        """)
+        op.execute('CREATE INDEX ix_uptime_metrics_service_id_timestamp ON uptime_metrics (service_id, "timestamp")')
+        op.execute('CREATE INDEX ix_uptime_metrics_organization_id_timestamp ON uptime_metrics (organization_id, "timestamp")')
+        op.execute('CREATE TABLE uptime_metrics_default PARTITION OF uptime_metrics DEFAULT')
+
+        # Daily partitions around now; app.monitoring.partitions keeps creating them ahead of time
+        today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+        for offset in range(-1, 8):
+            start = today + timedelta(days=offset)
+            end = start + timedelta(days=1)
+            op.execute(
+                f"CREATE TABLE uptime_metrics_p{start:%Y%m%d} PARTITION OF uptime_metrics "
+                f"FOR VALUES FROM ('{start:%Y-%m-%d %H:%M:%S}') TO ('{end:%Y-%m-%d %H:%M:%S}')"
+            )
+
+    if legacy == 'r':
+        op.execute("""
+            INSERT INTO uptime_metrics (service_id, "timestamp", status, response_time, is_up, organization_id)
+            SELECT service_id, "timestamp", status, response_time, is_up, organization_id
+            FROM uptime_metrics_legacy
+        """)
+        op.execute('DROP TABLE uptime_metrics_legacy')
+
+    if not sa.inspect(bind).has_table('uptime_reports'):
+        op.create_table('uptime_reports',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('service_id', sa.Integer(), nullable=False),
+        sa.Column('organization_id', sa.Integer(), nullable=False),
+        sa.Column('start_date', sa.DateTime(), nullable=False),
+        sa.Column('end_date', sa.DateTime(), nullable=False),
+        sa.Column('uptime_percentage', sa.Float(), nullable=False),
+        sa.Column('total_downtime_minutes', sa.Integer(), nullable=False),
+        sa.Column('total_incidents', sa.Integer(), nullable=False),
+        sa.Column('avg_response_time', sa.Float(), nullable=True),
+        sa.Column('generated_at', sa.DateTime(), nullable=True),
+        sa.Column('period_type', sa.String(length=20), nullable=False),
+        sa.ForeignKeyConstraint(['organization_id'], ['organizations.id'], ),
+        sa.ForeignKeyConstraint(['service_id'], ['services.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_uptime_reports_id'), 'uptime_reports', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_uptime_reports_id'), table_name='uptime_reports')
+    op.drop_table('uptime_reports')
+    # Dropping the parent drops every partition with it
+    op.execute('DROP TABLE uptime_metrics')
+    op.drop_column('organizations', 'metrics_retention_days')
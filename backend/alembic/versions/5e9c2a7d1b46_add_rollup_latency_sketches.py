@@ -0,0 +1,30 @@
+"""add latency sketches to uptime rollups
+
+Revision ID: 5e9c2a7d1b46
+Revises: d2a8f4b61c05
+Create Date: 2026-10-18 22:08:35.290571
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e9c2a7d1b46'
+down_revision: Union[str, None] = 'd2a8f4b61c05'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in ('uptime_rollups_1m', 'uptime_rollups_1h', 'uptime_rollups_1d'):
+        op.add_column(table, sa.Column('response_time_sketch', sa.LargeBinary(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in ('uptime_rollups_1m', 'uptime_rollups_1h', 'uptime_rollups_1d'):
+        op.drop_column(table, 'response_time_sketch')
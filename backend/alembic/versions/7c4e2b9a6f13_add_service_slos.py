@@ -0,0 +1,39 @@
+"""add service slos
+
+Revision ID: 7c4e2b9a6f13
+Revises: 5e9c2a7d1b46
+Create Date: 2026-10-18 23:41:06.518204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c4e2b9a6f13'
+down_revision: Union[str, None] = '5e9c2a7d1b46'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    slo_type = sa.Enum('AVAILABILITY', 'LATENCY', name='slotype')
+    slo_type.create(op.get_bind(), checkfirst=True)
+    op.add_column('services', sa.Column('slo_type', slo_type, nullable=True))
+    op.add_column('services', sa.Column('slo_target', sa.Float(), nullable=True))
+    op.add_column('services', sa.Column('slo_latency_threshold_ms', sa.Float(), nullable=True))
+    for table in ('uptime_rollups_1m', 'uptime_rollups_1h', 'uptime_rollups_1d'):
+        op.add_column(table, sa.Column('latency_good_count', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in ('uptime_rollups_1m', 'uptime_rollups_1h', 'uptime_rollups_1d'):
+        op.drop_column(table, 'latency_good_count')
+    op.drop_column('services', 'slo_latency_threshold_ms')
+    op.drop_column('services', 'slo_target')
+    op.drop_column('services', 'slo_type')
+    sa.Enum(name='slotype').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,90 @@
+"""add uptime rollup tables
+
+Revision ID: 91d3e7a5b2c4
+Revises: 4f6a1c9e2d80
+Create Date: 2026-10-18 16:25:51.004719
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '91d3e7a5b2c4'
+down_revision: Union[str, None] = '4f6a1c9e2d80'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('uptime_rollups_1m',
+    sa.Column('service_id', sa.Integer(), nullable=False),
+    sa.Column('bucket_start', sa.DateTime(), nullable=False),
+    sa.Column('organization_id', sa.Integer(), nullable=False),
+    sa.Column('sample_count', sa.Integer(), nullable=False),
+    sa.Column('up_count', sa.Integer(), nullable=False),
+    sa.Column('response_time_count', sa.Integer(), nullable=False),
+    sa.Column('response_time_sum', sa.Float(), nullable=True),
+    sa.Column('response_time_min', sa.Float(), nullable=True),
+    sa.Column('response_time_max', sa.Float(), nullable=True),
+    sa.Column('operational_count', sa.Integer(), nullable=False),
+    sa.Column('degraded_count', sa.Integer(), nullable=False),
+    sa.Column('partial_outage_count', sa.Integer(), nullable=False),
+    sa.Column('major_outage_count', sa.Integer(), nullable=False),
+    sa.Column('maintenance_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['service_id'], ['services.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('service_id', 'bucket_start')
+    )
+    op.create_table('uptime_rollups_1h',
+    sa.Column('service_id', sa.Integer(), nullable=False),
+    sa.Column('bucket_start', sa.DateTime(), nullable=False),
+    sa.Column('organization_id', sa.Integer(), nullable=False),
+    sa.Column('sample_count', sa.Integer(), nullable=False),
+    sa.Column('up_count', sa.Integer(), nullable=False),
+    sa.Column('response_time_count', sa.Integer(), nullable=False),
+    sa.Column('response_time_sum', sa.Float(), nullable=True),
+    sa.Column('response_time_min', sa.Float(), nullable=True),
+    sa.Column('response_time_max', sa.Float(), nullable=True),
+    sa.Column('operational_count', sa.Integer(), nullable=False),
+    sa.Column('degraded_count', sa.Integer(), nullable=False),
+    sa.Column('partial_outage_count', sa.Integer(), nullable=False),
+    sa.Column('major_outage_count', sa.Integer(), nullable=False),
+    sa.Column('maintenance_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['service_id'], ['services.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('service_id', 'bucket_start')
+    )
+    op.create_table('uptime_rollups_1d',
+    sa.Column('service_id', sa.Integer(), nullable=False),
+    sa.Column('bucket_start', sa.DateTime(), nullable=False),
+    sa.Column('organization_id', sa.Integer(), nullable=False),
+    sa.Column('sample_count', sa.Integer(), nullable=False),
+    sa.Column('up_count', sa.Integer(), nullable=False),
+    sa.Column('response_time_count', sa.Integer(), nullable=False),
+    sa.Column('response_time_sum', sa.Float(), nullable=True),
+    sa.Column('response_time_min', sa.Float(), nullable=True),
+    sa.Column('response_time_max', sa.Float(), nullable=True),
+    sa.Column('operational_count', sa.Integer(), nullable=False),
+    sa.Column('degraded_count', sa.Integer(), nullable=False),
+    sa.Column('partial_outage_count', sa.Integer(), nullable=False),
+    sa.Column('major_outage_count', sa.Integer(), nullable=False),
+    sa.Column('maintenance_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['service_id'], ['services.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('service_id', 'bucket_start')
+    )
+    op.create_table('uptime_rollup_state',
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('last_metric_id', sa.BigInteger(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('uptime_rollup_state')
+    op.drop_table('uptime_rollups_1d')
+    op.drop_table('uptime_rollups_1h')
+    op.drop_table('uptime_rollups_1m')
@@ -0,0 +1,30 @@
+"""add incident analytics indexes
+
+Revision ID: a3f8d6c2e471
+Revises: 7c4e2b9a6f13
+Create Date: 2026-10-19 00:27:53.804112
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3f8d6c2e471'
+down_revision: Union[str, None] = '7c4e2b9a6f13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_incidents_organization_id_created_at', 'incidents', ['organization_id', 'created_at'], unique=False)
+    op.create_index('ix_incident_updates_incident_id_created_at', 'incident_updates', ['incident_id', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_incident_updates_incident_id_created_at', table_name='incident_updates')
+    op.drop_index('ix_incidents_organization_id_created_at', table_name='incidents')
@@ -0,0 +1,36 @@
+"""add uptime report upsert key and merge totals
+
+Revision ID: b7c0e5f83a19
+Revises: 91d3e7a5b2c4
+Create Date: 2026-10-18 18:47:10.663125
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7c0e5f83a19'
+down_revision: Union[str, None] = '91d3e7a5b2c4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('uptime_reports', sa.Column('sample_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('uptime_reports', sa.Column('up_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('uptime_reports', sa.Column('response_time_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('uptime_reports', sa.Column('response_time_sum', sa.Float(), nullable=True))
+    op.create_unique_constraint('uq_uptime_reports_service_period', 'uptime_reports', ['service_id', 'period_type', 'start_date'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('uq_uptime_reports_service_period', 'uptime_reports', type_='unique')
+    op.drop_column('uptime_reports', 'response_time_sum')
+    op.drop_column('uptime_reports', 'response_time_count')
+    op.drop_column('uptime_reports', 'up_count')
+    op.drop_column('uptime_reports', 'sample_count')
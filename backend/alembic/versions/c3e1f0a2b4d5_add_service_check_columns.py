@@ -0,0 +1,37 @@
+"""add service check columns
+
+Revision ID: c3e1f0a2b4d5
+Revises: 0a7b467f0707
+Create Date: 2026-10-18 09:12:44.201337
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3e1f0a2b4d5'
+down_revision: Union[str, None] = '0a7b467f0707'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    check_type = sa.Enum('HTTP', 'TCP', 'TCP_IP', name='checktype')
+    check_type.create(op.get_bind(), checkfirst=True)
+    op.add_column('services', sa.Column('check_type', check_type, nullable=True))
+    op.add_column('services', sa.Column('check_target', sa.String(), nullable=True))
+    op.add_column('services', sa.Column('check_interval_seconds', sa.Integer(), server_default='60', nullable=False))
+    op.add_column('services', sa.Column('check_timeout_seconds', sa.Float(), server_default='10', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('services', 'check_timeout_seconds')
+    op.drop_column('services', 'check_interval_seconds')
+    op.drop_column('services', 'check_target')
+    op.drop_column('services', 'check_type')
+    sa.Enum(name='checktype').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,54 @@
+"""add outage intervals
+
+Revision ID: c8e1b5f2a9d7
+Revises: a3f8d6c2e471
+Create Date: 2026-10-19 01:15:32.667019
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c8e1b5f2a9d7'
+down_revision: Union[str, None] = 'a3f8d6c2e471'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('outage_intervals',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('service_id', sa.Integer(), nullable=False),
+    sa.Column('organization_id', sa.Integer(), nullable=False),
+    sa.Column('started_at', sa.DateTime(), nullable=False),
+    sa.Column('ended_at', sa.DateTime(), nullable=True),
+    sa.Column('failure_count', sa.Integer(), nullable=False),
+    sa.Column('last_failure_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['service_id'], ['services.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_outage_intervals_service_id_started_at', 'outage_intervals', ['service_id', 'started_at'], unique=False)
+    op.create_index(
+        'uq_outage_intervals_open', 'outage_intervals', ['service_id'], unique=True,
+        postgresql_where=sa.text('ended_at IS NULL'),
+    )
+    op.create_table('outage_trackers',
+    sa.Column('service_id', sa.Integer(), nullable=False),
+    sa.Column('last_sample_at', sa.DateTime(), nullable=False),
+    sa.Column('failure_run_start', sa.DateTime(), nullable=True),
+    sa.Column('failure_run_length', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['service_id'], ['services.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('service_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('outage_trackers')
+    op.drop_index('uq_outage_intervals_open', table_name='outage_intervals')
+    op.drop_index('ix_outage_intervals_service_id_started_at', table_name='outage_intervals')
+    op.drop_table('outage_intervals')
@@ -0,0 +1,28 @@
+"""add incident (service_id, created_at) index
+
+Revision ID: d2a8f4b61c05
+Revises: b7c0e5f83a19
+Create Date: 2026-10-18 20:31:42.117264
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2a8f4b61c05'
+down_revision: Union[str, None] = 'b7c0e5f83a19'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_incidents_service_id_created_at', 'incidents', ['service_id', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_incidents_service_id_created_at', table_name='incidents')
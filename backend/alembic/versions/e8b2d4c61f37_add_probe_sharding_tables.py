@@ -0,0 +1,46 @@
+"""add probe sharding tables
+
+Revision ID: e8b2d4c61f37
+Revises: c3e1f0a2b4d5
+Create Date: 2026-10-18 11:40:02.518930
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8b2d4c61f37'
+down_revision: Union[str, None] = 'c3e1f0a2b4d5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('probe_workers',
+    sa.Column('worker_id', sa.String(), nullable=False),
+    sa.Column('hostname', sa.String(), nullable=False),
+    sa.Column('started_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('heartbeat_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('worker_id')
+    )
+    op.create_index(op.f('ix_probe_workers_heartbeat_at'), 'probe_workers', ['heartbeat_at'], unique=False)
+    op.create_table('probe_assignments',
+    sa.Column('service_id', sa.Integer(), nullable=False),
+    sa.Column('worker_id', sa.String(), nullable=False),
+    sa.Column('lease_expires_at', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['service_id'], ['services.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('service_id')
+    )
+    op.create_index(op.f('ix_probe_assignments_worker_id'), 'probe_assignments', ['worker_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_probe_assignments_worker_id'), table_name='probe_assignments')
+    op.drop_table('probe_assignments')
+    op.drop_index(op.f('ix_probe_workers_heartbeat_at'), table_name='probe_workers')
+    op.drop_table('probe_workers')
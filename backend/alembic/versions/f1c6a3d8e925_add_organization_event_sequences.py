@@ -0,0 +1,33 @@
+"""add organization event sequences
+
+Revision ID: f1c6a3d8e925
+Revises: c8e1b5f2a9d7
+Create Date: 2026-10-19 03:40:11.204817
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1c6a3d8e925'
+down_revision: Union[str, None] = 'c8e1b5f2a9d7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('organization_event_sequences',
+    sa.Column('organization_id', sa.Integer(), nullable=False),
+    sa.Column('last_sequence', sa.BigInteger(), nullable=False),
+    sa.ForeignKeyConstraint(['organization_id'], ['organizations.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('organization_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('organization_event_sequences')
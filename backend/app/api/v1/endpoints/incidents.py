@@ -1,22 +1,35 @@
-from typing import Any, List
+from typing import Any, List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 
 from app.core import security
+from app.api.websockets.bus import changed_fields, event_bus
 from app.db.session import get_db
+from app.monitoring.status_snapshot import status_snapshot
 from app.schemas.incident import (
     Incident,
     IncidentCreate,
     IncidentUpdate,
     IncidentUpdateCreate,
     IncidentUpdateInDB as IncidentUpdateSchema,
+    IncidentAnalytics,
+    IncidentTimingStats,
+    IncidentWeeklyTrend,
+    ServiceIncidentAnalytics,
 )
 from app.models.incident import IncidentModel, IncidentUpdateModel
 from app.models.user import UserModel
+from app.monitoring.incident_analytics import incident_summary, incident_weekly_trends
 
 router = APIRouter()
 
+def _naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Stored timestamps are naive UTC; convert offset-aware query params to match."""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
 @router.get("/", response_model=List[Incident])
 def read_incidents(
     db: Session = Depends(get_db),
@@ -39,6 +52,74 @@ def read_incidents(
         )
     return incidents
 
+@router.get("/analytics", response_model=List[IncidentAnalytics])
+def read_incident_analytics(
+    *,
+    db: Session = Depends(get_db),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    service_id: Optional[int] = None,
+    organization_id: Optional[int] = None,
+    current_user: UserModel = Depends(security.all_authenticated_users()),
+) -> Any:
+    """
+    MTTR, MTTA and incident frequency per service and per organization for
+    incidents created between start and end (default: the last 90 days),
+    with weekly trends. Superusers may pick an organization; everyone else
+    only sees their own.
+    """
+    end = _naive_utc(end) or datetime.utcnow()
+    start = _naive_utc(start) or end - timedelta(days=90)
+    if start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+    if not current_user.is_superuser:
+        if current_user.organization_id is None:
+            # No organization to report on; None would mean all of them
+            return []
+        organization_id = current_user.organization_id
+    
+    weeks = (end - start) / timedelta(weeks=1)
+    
+    def timing(row) -> dict:
+        return {
+            "incident_count": row.incident_count,
+            "resolved_count": row.resolved_count,
+            "incidents_per_week": row.incident_count / weeks,
+            "mttr_seconds": row.mttr_seconds,
+            "ttr_p50_seconds": row.ttr_p50_seconds,
+            "ttr_p90_seconds": row.ttr_p90_seconds,
+            "mtta_seconds": row.mtta_seconds,
+            "tta_p50_seconds": row.tta_p50_seconds,
+            "tta_p90_seconds": row.tta_p90_seconds,
+        }
+    
+    analytics = {}
+    for row in incident_summary(db, start, end, organization_id, service_id):
+        if row.is_total:
+            analytics[row.organization_id] = IncidentAnalytics(
+                organization_id=row.organization_id,
+                start=start,
+                end=end,
+                overall=IncidentTimingStats(**timing(row)),
+                services=[],
+                weekly=[],
+            )
+        elif row.service_id is not None:
+            # Incidents without a service only count towards the organization total
+            analytics[row.organization_id].services.append(
+                ServiceIncidentAnalytics(service_id=row.service_id, **timing(row))
+            )
+    
+    for row in incident_weekly_trends(db, start, end, organization_id, service_id):
+        analytics[row.organization_id].weekly.append(IncidentWeeklyTrend(
+            week_start=row.week_start,
+            mttr_4w_seconds=row.mttr_4w_seconds,
+            mtta_4w_seconds=row.mtta_4w_seconds,
+            **{**timing(row), "incidents_per_week": float(row.incident_count)},
+        ))
+    
+    return list(analytics.values())
+
 @router.post("/", response_model=Incident)
 def create_incident(
     *,
@@ -57,8 +138,11 @@ def create_incident(
     
     incident = IncidentModel(**incident_data)
     db.add(incident)
+    db.flush()
+    event_bus.publish(db, "incident", "created", incident.id, incident.organization_id, incident.service_id)
     db.commit()
     db.refresh(incident)
+    status_snapshot.refresh(db)
     
     return incident
 
@@ -120,8 +204,10 @@ def update_incident(
         incident.resolved_at = datetime.utcnow()
     
     db.add(incident)
+    event_bus.publish(db, "incident", "updated", incident.id, incident.organization_id, incident.service_id, changed_fields(incident))
     db.commit()
     db.refresh(incident)
+    status_snapshot.refresh(db)
     
     return incident
 
@@ -147,7 +233,9 @@ def delete_incident(
         )
     
     db.delete(incident)
+    event_bus.publish(db, "incident", "deleted", incident.id, incident.organization_id, incident.service_id)
     db.commit()
+    status_snapshot.refresh(db)
     return incident
 
 @router.get("/{incident_id}/updates", response_model=List[IncidentUpdateSchema])
@@ -213,7 +301,13 @@ def create_incident_update(
             incident.resolved_at = datetime.utcnow()
         db.add(incident)
     
+    # Read before the flush clears the change history
+    incident_changes = changed_fields(incident)
+    db.flush()
+    event_bus.publish(db, "incident_update", "created", incident_update.id, incident.organization_id, incident.service_id)
+    event_bus.publish(db, "incident", "updated", incident.id, incident.organization_id, incident.service_id, incident_changes)
     db.commit()
     db.refresh(incident_update)
+    status_snapshot.refresh(db)
     
     return incident_update
\ No newline at end of file
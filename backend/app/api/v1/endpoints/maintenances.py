@@ -3,7 +3,9 @@ from sqlalchemy.orm import Session
 from typing import List
 from datetime import datetime, timedelta
 
+from app.api.websockets.bus import changed_fields, event_bus
 from app.db.session import get_db
+from app.monitoring.status_snapshot import status_snapshot
 from app.models.maintenance import MaintenanceModel
 from app.schemas.maintenance import Maintenance, MaintenanceCreate, MaintenanceUpdate
 from app.models.user import UserModel
@@ -51,8 +53,11 @@ def create_maintenance(
     
     maintenance = MaintenanceModel(**maintenance_data)
     db.add(maintenance)
+    db.flush()
+    event_bus.publish(db, "maintenance", "created", maintenance.id, maintenance.organization_id, maintenance.service_id)
     db.commit()
     db.refresh(maintenance)
+    status_snapshot.refresh(db)
     return maintenance
 
 @router.get("/{maintenance_id}", response_model=Maintenance)
@@ -109,8 +114,10 @@ def update_maintenance(
         setattr(maintenance, field, value)
     
     db.add(maintenance)
+    event_bus.publish(db, "maintenance", "updated", maintenance.id, maintenance.organization_id, maintenance.service_id, changed_fields(maintenance))
     db.commit()
     db.refresh(maintenance)
+    status_snapshot.refresh(db)
     return maintenance
 
 @router.delete("/{maintenance_id}", response_model=Maintenance)
@@ -135,7 +142,9 @@ def delete_maintenance(
         )
     
     db.delete(maintenance)
+    event_bus.publish(db, "maintenance", "deleted", maintenance.id, maintenance.organization_id, maintenance.service_id)
     db.commit()
+    status_snapshot.refresh(db)
     return maintenance
 
 # Public endpoint for active and recent maintenances
@@ -155,6 +155,8 @@ def update_organization(
         organization.logo_url = organization_in.logo_url
     if organization_in.is_active is not None:
         organization.is_active = organization_in.is_active
+    if organization_in.metrics_retention_days is not None:
+        organization.metrics_retention_days = organization_in.metrics_retention_days
     
     db.add(organization)
     db.commit()
@@ -1,10 +1,17 @@
 # backend/app/api/v1/endpoints/public.py
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session, joinedload
-from datetime import datetime, timedelta
-from typing import List, Dict, Any
+from datetime import datetime, timedelta, timezone
+import time
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import List, Dict, Any, Optional, Tuple
 
+from app.api.websockets.status_stream import status_stream
+from app.core.config import settings
 from app.db.session import get_db
+from app.monitoring.status_snapshot import Snapshot, status_snapshot
 from app.models.service import ServiceModel
 from app.models.incident import IncidentModel, IncidentUpdateModel
 from app.models.maintenance import MaintenanceModel
@@ -15,41 +22,137 @@ from app.schemas.maintenance import Maintenance as MaintenanceSchema
 
 router = APIRouter()
 
+# Ended maintenances stay on the status overview this long
+RECENT_MAINTENANCE_WINDOW = timedelta(days=7)
+
+def _conditional(
+    request: Request, snapshot: Snapshot, surrogate_keys: List[str], windowed: bool = False
+) -> Tuple[Dict[str, str], Optional[Response]]:
+    """
+    Cache headers for the current data version, plus a 304 response when the
+    client's If-None-Match or If-Modified-Since still matches it. The check
+    only reads the in-memory snapshot, so a 304 never touches the database.
+    
+    The ETag is weak: the same data can encode differently between rebuilds
+    (last_updated, for one). Responses filtered by a window relative to now
+    (windowed=True) also change without any row changing, so their
+    validators include the current STATUS_SNAPSHOT_MAX_AGE_SECONDS period
+    and go stale at most that long after the window moves.
+    
+    Surrogate keys name what a response contains ("services", "service-3",
+    ...) so a fronting cache can purge exactly the affected responses.
+    """
+    etag = snapshot.data_version
+    last_modified = snapshot.last_modified
+    if windowed:
+        period = int(time.time() // settings.STATUS_SNAPSHOT_MAX_AGE_SECONDS)
+        etag = f"{etag}-{period}"
+        last_modified = max(
+            last_modified,
+            datetime.fromtimestamp(period * settings.STATUS_SNAPSHOT_MAX_AGE_SECONDS, timezone.utc),
+        )
+    headers = {
+        "ETag": f'W/"{etag}"',
+        "Last-Modified": format_datetime(last_modified, usegmt=True),
+        "Cache-Control": (
+            f"public, max-age={settings.PUBLIC_CACHE_MAX_AGE_SECONDS}, "
+            f"stale-while-revalidate={settings.PUBLIC_CACHE_STALE_WHILE_REVALIDATE_SECONDS}"
+        ),
+        "Surrogate-Key": " ".join(surrogate_keys),
+    }
+    
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        matched = "*" in tags or f'"{etag}"' in tags
+    else:
+        matched = False
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since:
+            try:
+                since = parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                since = None
+            if since is not None:
+                if since.tzinfo is None:
+                    since = since.replace(tzinfo=timezone.utc)
+                matched = last_modified <= since
+    
+    return headers, Response(status_code=304, headers=headers) if matched else None
+
 @router.get("/status", response_model=StatusOverview)
-def get_public_status(db: Session = Depends(get_db)):
+async def get_public_status(request: Request):
     """
     Get the current status of all services, active incidents, 
     active/recent maintenances, and a timeline of recent events.
     This endpoint is public and does not require authentication.
+    
+    Served from a pre-encoded snapshot that is rebuilt when status data
+    changes, so reads do not touch the database.
     """
+    snapshot = await _public_status_snapshot()
+    headers, not_modified = _conditional(request, snapshot, ["status"], windowed=True)
+    if not_modified:
+        return not_modified
+    return Response(content=snapshot.body, media_type="application/json", headers=headers)
+
+async def _public_status_snapshot() -> Snapshot:
+    return status_snapshot.peek("public_status") or await run_in_threadpool(status_snapshot.get, "public_status")
+
+@router.get("/status/stream")
+async def stream_public_status(
+    last_event_id: Optional[str] = Header(None),
+):
+    """
+    Server-Sent Events: a "snapshot" event with the same body as /status,
+    then a "change" event for every change to what /status shows, encoded
+    with the same schemas: a row in full, or its id when it was deleted or
+    taken off the page. Reconnecting with Last-Event-ID resumes from the missed events
+    when this worker still has them, and from a new snapshot otherwise.
+    """
+    return StreamingResponse(
+        status_stream.stream(last_event_id, _public_status_snapshot),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+def public_status_overview(
+    db: Session, organization_id: Optional[int] = None, now: Optional[datetime] = None
+) -> StatusOverview:
+    """The status overview of all organizations, or of one when organization_id is given, as of now."""
+    now = now or datetime.utcnow()
     # Get all active services with optimized query
-    services = db.query(ServiceModel).filter(ServiceModel.is_active == True).all()
+    services_query = db.query(ServiceModel).filter(ServiceModel.is_active == True)
+    if organization_id is not None:
+        services_query = services_query.filter(ServiceModel.organization_id == organization_id)
+    services = services_query.all()
     
     # Get active incidents with their related service and updates
-    incidents = (
+    incidents_query = (
         db.query(IncidentModel)
         .options(
             joinedload(IncidentModel.service),
             joinedload(IncidentModel.updates)
         )
         .filter(IncidentModel.is_active == True)
-        .order_by(IncidentModel.created_at.desc())
-        .all()
     )
+    if organization_id is not None:
+        incidents_query = incidents_query.filter(IncidentModel.organization_id == organization_id)
+    incidents = incidents_query.order_by(IncidentModel.created_at.desc()).all()
     
     # Get active and recent maintenances with their related service
-    now = datetime.utcnow()
-    recent_window = now - timedelta(days=7)
-    maintenances = (
+    recent_window = now - RECENT_MAINTENANCE_WINDOW
+    maintenances_query = (
         db.query(MaintenanceModel)
         .options(joinedload(MaintenanceModel.service))
         .filter(
             (MaintenanceModel.is_active == True) |
             (MaintenanceModel.scheduled_end >= recent_window)
         )
-        .order_by(MaintenanceModel.scheduled_start.desc())
-        .all()
     )
+    if organization_id is not None:
+        maintenances_query = maintenances_query.filter(MaintenanceModel.organization_id == organization_id)
+    maintenances = maintenances_query.order_by(MaintenanceModel.scheduled_start.desc()).all()
     
     # Build timeline with more detailed information
     timeline = []
@@ -103,30 +206,46 @@ def get_public_status(db: Session = Depends(get_db)):
     overall_status = calculate_overall_status(services)
     
     # Return the complete status overview
-    return {
+    return StatusOverview.model_validate({
         "services": services,
         "incidents": incidents,
         "maintenances": maintenances,
         "timeline": timeline,
         "overall_status": overall_status,
         "last_updated": datetime.utcnow(),
-    }
+    }, from_attributes=True)
+
+def build_public_status(db: Session) -> bytes:
+    """Build and encode the status overview served by get_public_status."""
+    return public_status_overview(db).model_dump_json().encode()
+
+status_snapshot.register("public_status", build_public_status)
 
 @router.get("/services", response_model=List[ServiceSchema])
-def get_public_services(db: Session = Depends(get_db)):
+def get_public_services(request: Request, response: Response, db: Session = Depends(get_db)):
     """
     Get all active services with their current status.
     This endpoint is public and does not require authentication.
     """
+    headers, not_modified = _conditional(request, status_snapshot.get("public_status"), ["services"])
+    if not_modified:
+        return not_modified
+    response.headers.update(headers)
+    
     services = db.query(ServiceModel).filter(ServiceModel.is_active == True).all()
     return services
 
 @router.get("/services/{service_id}", response_model=ServiceSchema)
-def get_public_service_by_id(service_id: int, db: Session = Depends(get_db)):
+def get_public_service_by_id(service_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
     """
     Get detailed information about a specific service by ID.
     This endpoint is public and does not require authentication.
     """
+    headers, not_modified = _conditional(request, status_snapshot.get("public_status"), [f"service-{service_id}"])
+    if not_modified:
+        return not_modified
+    response.headers.update(headers)
+    
     service = db.query(ServiceModel).filter(
         ServiceModel.id == service_id,
         ServiceModel.is_active == True
@@ -138,11 +257,16 @@ def get_public_service_by_id(service_id: int, db: Session = Depends(get_db)):
     return service
 
 @router.get("/incidents/active", response_model=List[IncidentSchema])
-def get_public_active_incidents(db: Session = Depends(get_db)):
+def get_public_active_incidents(request: Request, response: Response, db: Session = Depends(get_db)):
     """
     Get all active incidents with their related service and updates.
     This endpoint is public and does not require authentication.
     """
+    headers, not_modified = _conditional(request, status_snapshot.get("public_status"), ["incidents"])
+    if not_modified:
+        return not_modified
+    response.headers.update(headers)
+    
     incidents = (
         db.query(IncidentModel)
         .options(
@@ -156,11 +280,16 @@ def get_public_active_incidents(db: Session = Depends(get_db)):
     return incidents
 
 @router.get("/incidents/{incident_id}", response_model=IncidentSchema)
-def get_public_incident_by_id(incident_id: int, db: Session = Depends(get_db)):
+def get_public_incident_by_id(incident_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
     """
     Get detailed information about a specific incident by ID, including all its updates.
     This endpoint is public and does not require authentication.
     """
+    headers, not_modified = _conditional(request, status_snapshot.get("public_status"), [f"incident-{incident_id}"])
+    if not_modified:
+        return not_modified
+    response.headers.update(headers)
+    
     incident = (
         db.query(IncidentModel)
         .options(
@@ -177,11 +306,16 @@ def get_public_incident_by_id(incident_id: int, db: Session = Depends(get_db)):
     return incident
 
 @router.get("/maintenances/active", response_model=List[MaintenanceSchema])
-def get_public_active_maintenances(db: Session = Depends(get_db)):
+def get_public_active_maintenances(request: Request, response: Response, db: Session = Depends(get_db)):
     """
     Get all active and upcoming maintenances with their related service.
     This endpoint is public and does not require authentication.
     """
+    headers, not_modified = _conditional(request, status_snapshot.get("public_status"), ["maintenances"], windowed=True)
+    if not_modified:
+        return not_modified
+    response.headers.update(headers)
+    
     now = datetime.utcnow()
     maintenances = (
         db.query(MaintenanceModel)
@@ -196,11 +330,16 @@ def get_public_active_maintenances(db: Session = Depends(get_db)):
     return maintenances
 
 @router.get("/maintenances/{maintenance_id}", response_model=MaintenanceSchema)
-def get_public_maintenance_by_id(maintenance_id: int, db: Session = Depends(get_db)):
+def get_public_maintenance_by_id(maintenance_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
     """
     Get detailed information about a specific maintenance by ID.
     This endpoint is public and does not require authentication.
     """
+    headers, not_modified = _conditional(request, status_snapshot.get("public_status"), [f"maintenance-{maintenance_id}"])
+    if not_modified:
+        return not_modified
+    response.headers.update(headers)
+    
     maintenance = (
         db.query(MaintenanceModel)
         .options(joinedload(MaintenanceModel.service))
@@ -215,6 +354,8 @@ def get_public_maintenance_by_id(maintenance_id: int, db: Session = Depends(get_
 
 @router.get("/timeline", response_model=List[TimelineEvent])
 def get_public_timeline(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
     db: Session = Depends(get_db)
@@ -227,6 +368,11 @@ def get_public_timeline(
     - skip: Number of items to skip (for pagination)
     - limit: Maximum number of items to return (max 100)
     """
+    headers, not_modified = _conditional(request, status_snapshot.get("public_status"), ["timeline"], windowed=True)
+    if not_modified:
+        return not_modified
+    response.headers.update(headers)
+    
     # Get the data needed for the timeline
     now = datetime.utcnow()
     recent_window = now - timedelta(days=30)  # Extend window to 30 days for timeline
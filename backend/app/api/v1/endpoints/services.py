@@ -3,14 +3,16 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
 from app.core import security
+from app.api.websockets.bus import changed_fields, event_bus
 from app.db.session import get_db
-from app.schemas.service import Service, ServiceCreate, ServiceUpdate
+from app.monitoring.status_snapshot import status_snapshot
+from app.schemas.service import ServiceAdmin, ServiceCreate, ServiceUpdate, check_target_error, slo_error
 from app.models.service import ServiceModel
 from app.models.user import UserModel
 
 router = APIRouter()
 
-@router.get("/", response_model=List[Service])
+@router.get("/", response_model=List[ServiceAdmin])
 def read_services(
     db: Session = Depends(get_db),
     skip: int = 0,
@@ -32,7 +34,7 @@ def read_services(
         )
     return services
 
-@router.post("/", response_model=Service)
+@router.post("/", response_model=ServiceAdmin)
 def create_service(
     *,
     db: Session = Depends(get_db),
@@ -50,12 +52,15 @@ def create_service(
     
     service = ServiceModel(**service_data)
     db.add(service)
+    db.flush()
+    event_bus.publish(db, "service", "created", service.id, service.organization_id, service.id)
     db.commit()
     db.refresh(service)
+    status_snapshot.refresh(db)
     
     return service
 
-@router.get("/{service_id}", response_model=Service)
+@router.get("/{service_id}", response_model=ServiceAdmin)
 def read_service(
     *,
     db: Session = Depends(get_db),
@@ -77,7 +82,7 @@ def read_service(
         )
     return service
 
-@router.put("/{service_id}", response_model=Service)
+@router.put("/{service_id}", response_model=ServiceAdmin)
 def update_service(
     *,
     db: Session = Depends(get_db),
@@ -108,13 +113,21 @@ def update_service(
     for field, value in update_data.items():
         setattr(service, field, value)
     
+    error = check_target_error(service.check_type, service.check_target) or slo_error(
+        service.slo_type, service.slo_target, service.slo_latency_threshold_ms
+    )
+    if error:
+        raise HTTPException(status_code=400, detail=error)
+    
     db.add(service)
+    event_bus.publish(db, "service", "updated", service.id, service.organization_id, service.id, changed_fields(service))
     db.commit()
     db.refresh(service)
+    status_snapshot.refresh(db)
     
     return service
 
-@router.delete("/{service_id}", response_model=Service)
+@router.delete("/{service_id}", response_model=ServiceAdmin)
 def delete_service(
     *,
     db: Session = Depends(get_db),
@@ -136,5 +149,7 @@ def delete_service(
         )
     
     db.delete(service)
+    event_bus.publish(db, "service", "deleted", service.id, service.organization_id, service.id)
     db.commit()
+    status_snapshot.refresh(db)
     return service
\ No newline at end of file
@@ -1,25 +1,34 @@
 # backend/app/api/v1/endpoints/status.py
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Response
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session, joinedload
 from datetime import datetime, timedelta
-from typing import List, Dict, Any
+from typing import List
 
-from app.db.session import get_db
+from app.monitoring.status_snapshot import status_snapshot
 from app.models.service import ServiceModel
 from app.models.incident import IncidentModel
 from app.models.maintenance import MaintenanceModel
 
-from app.schemas.service import StatusOverview, TimelineEvent
+from app.schemas.service import StatusOverview
 
 router = APIRouter()
 
 @router.get("/status", response_model=StatusOverview)
-def get_status(db: Session = Depends(get_db)):
+async def get_status():
     """
     Get the current status of all services, active incidents, 
     active/recent maintenances, and a timeline of recent events.
     This endpoint is public and does not require authentication.
+    
+    Served from a pre-encoded snapshot that is rebuilt when status data
+    changes, so reads do not touch the database.
     """
+    snapshot = status_snapshot.peek("status") or await run_in_threadpool(status_snapshot.get, "status")
+    return Response(content=snapshot.body, media_type="application/json")
+
+def build_status(db: Session) -> bytes:
+    """Build and encode the status overview served by get_status."""
     # Get all active services with optimized query
     services = db.query(ServiceModel).filter(ServiceModel.is_active == True).all()
     
@@ -114,15 +123,18 @@ def get_status(db: Session = Depends(get_db)):
     # Calculate overall system status based on service statuses
     overall_status = calculate_overall_status(services)
     
-    # Return the complete status overview
-    return {
+    # Encode the complete status overview once per snapshot
+    overview = StatusOverview.model_validate({
         "services": services,
         "incidents": incidents,
         "maintenances": maintenances,
         "timeline": timeline,
         "overall_status": overall_status,
         "last_updated": datetime.utcnow(),
-    }
+    }, from_attributes=True)
+    return overview.model_dump_json().encode()
+
+status_snapshot.register("status", build_status)
 
 def calculate_overall_status(services: List[ServiceModel]) -> str:
     """
@@ -1,32 +1,115 @@
-from typing import Any, List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Any, Dict, List, NamedTuple, Optional
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from pydantic import ValidationError
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, desc
-from datetime import datetime, timedelta
-import random
+from sqlalchemy import func, desc, or_
+from datetime import datetime, timedelta, timezone
 
 from app.core import security
+from app.core.config import settings
 from app.db.session import get_db
 from app.schemas.uptime import (
     UptimeMetric, UptimeMetricCreate, UptimeReport, UptimeStats, 
-    UptimeGraphData, UptimeMetricsResponse
+    UptimeGraphData, UptimeMetricsResponse, UptimeMetricBatchCreate,
+    UptimeMetricBatchItem, UptimeMetricBatchResult, UptimeMetricBatchResponse,
+    UptimeMetricStreamResponse, LatencyPercentiles, SloStatus, OutageReport
 )
-from app.models.uptime import UptimeMetric as UptimeMetricModel, UptimeReport as UptimeReportModel
-from app.models.service import ServiceModel
+from app.models.uptime import (
+    UptimeMetric as UptimeMetricModel, UptimeReport as UptimeReportModel, UptimeRollupDay
+)
+from app.models.service import ServiceModel, SloType
 from app.models.incident import IncidentModel
 from app.models.user import UserModel
+from app.monitoring.ingest import (
+    get_accessible_service_organizations, build_metric_row, insert_metric_rows,
+    iter_ndjson_lines, MetricStreamWriter
+)
+from app.monitoring.buffer import metric_buffer
+from app.monitoring.downsample import lttb_indices
+from app.monitoring.downtime import bucket_uptime, effective_downtime, uptime_between
+from app.monitoring.outages import NO_OUTAGES, outage_summary, outages_in_range
+from app.monitoring.rollups import (
+    bucket_series, select_resolution, window_totals, window_sketches, average_response_time
+)
+from app.monitoring.sketch import LatencySketch
+from app.monitoring.slo import BURN_WINDOWS, evaluate_services
 
 router = APIRouter()
 
+class _IncidentStats(NamedTuple):
+    incidents_24h: int
+    incidents_7d: int
+    incidents_30d: int
+    last_incident: Optional[datetime]
+
+_NO_INCIDENTS = _IncidentStats(0, 0, 0, None)
+
+_PERIODS = {
+    "24h": timedelta(hours=24),
+    "7d": timedelta(days=7),
+    "30d": timedelta(days=30),
+    "90d": timedelta(days=90),
+}
+
+def _naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Stored timestamps are naive UTC; convert offset-aware query params to match."""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+def _latency_percentiles(sketch: Optional[LatencySketch]) -> Optional[LatencyPercentiles]:
+    if sketch is None or not sketch.count:
+        return None
+    return LatencyPercentiles(
+        p50=sketch.quantile(0.50),
+        p90=sketch.quantile(0.90),
+        p95=sketch.quantile(0.95),
+        p99=sketch.quantile(0.99),
+    )
+
+def _get_incident_stats(db: Session, service_ids: List[int], now: datetime) -> Dict[int, _IncidentStats]:
+    """Incident counts for the last 24h/7d/30d and the latest incident per service, in one grouped query."""
+    if not service_ids:
+        return {}
+    
+    rows = (
+        db.query(
+            IncidentModel.service_id,
+            func.count(IncidentModel.id).filter(IncidentModel.created_at >= now - timedelta(hours=24)),
+            func.count(IncidentModel.id).filter(IncidentModel.created_at >= now - timedelta(days=7)),
+            func.count(IncidentModel.id).filter(IncidentModel.created_at >= now - timedelta(days=30)),
+            func.max(IncidentModel.created_at),
+        )
+        .filter(IncidentModel.service_id.in_(service_ids))
+        .group_by(IncidentModel.service_id)
+        .all()
+    )
+    return {row[0]: _IncidentStats(*row[1:]) for row in rows}
+
 @router.get("/services/{service_id}/metrics", response_model=UptimeMetricsResponse)
 def get_service_uptime_metrics(
     *,
     db: Session = Depends(get_db),
     service_id: int,
-    period: str = Query("7d", regex="^(24h|7d|30d)$"),
+    period: str = Query("7d", regex="^(24h|7d|30d|90d)$"),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    max_points: int = Query(24, ge=3, le=5000),  # LTTB keeps the first and last point
+    downsample: Optional[int] = Query(None, ge=3, le=5000),
     current_user: UserModel = Depends(security.all_authenticated_users()),
 ) -> Any:
-    """Get uptime metrics and graph data for a specific service."""
+    """
+    Get uptime metrics and graph data for a specific service.
+    
+    The graph covers `period` up to now, or the explicit `start`/`end` range
+    when given. It is read from the coarsest rollup that still yields at least
+    `max_points` buckets (within a bounded oversampling factor) and reduced
+    to at most `max_points` visually representative points (LTTB), keeping
+    outages and latency spikes, so cost and payload stay bounded for any
+    range. `downsample` asks for fewer points still.
+    """
     
     # Verify user has access to this service
     service_query = db.query(ServiceModel).filter(ServiceModel.id == service_id)
@@ -39,115 +122,96 @@ def get_service_uptime_metrics(
     
     # Calculate time range
     now = datetime.utcnow()
-    if period == "24h":
-        start_time = now - timedelta(hours=24)
-        data_points = 24  # Hourly data points
-        interval = timedelta(hours=1)
-    elif period == "7d":
-        start_time = now - timedelta(days=7)
-        data_points = 7 * 24  # Hourly data points for 7 days
-        interval = timedelta(hours=1)
-    else:  # 30d
-        start_time = now - timedelta(days=30)
-        data_points = 30  # Daily data points
-        interval = timedelta(days=1)
-    
-    # Generate realistic uptime data (in production, this would come from actual monitoring)
-    graph_data = []
-    current_time = start_time
-    
-    while current_time <= now:
-        # Simulate realistic uptime data based on service status
-        base_uptime = {
-            "operational": 99.9,
-            "degraded": 95.0,
-            "partial_outage": 75.0,
-            "major_outage": 20.0,
-            "maintenance": 0.0
-        }.get(service.status.value, 99.9)
-        
-        # Add some realistic variance
-        variance = random.uniform(-2.0, 2.0)
-        uptime_percentage = max(0.0, min(100.0, base_uptime + variance))
-        
-        # Generate response time data
-        base_response_time = {
-            "operational": 150,
-            "degraded": 500,
-            "partial_outage": 1500,
-            "major_outage": 5000,
-            "maintenance": None
-        }.get(service.status.value, 150)
-        
-        response_time = None
-        if base_response_time:
-            response_time = base_response_time + random.uniform(-50, 200)
-        
-        graph_data.append(UptimeGraphData(
-            timestamp=current_time,
-            uptime_percentage=uptime_percentage,
-            status=service.status.value,
-            response_time=response_time
-        ))
-        
-        current_time += interval
-    
-    # Calculate uptime statistics
-    recent_24h = [dp for dp in graph_data if dp.timestamp >= now - timedelta(hours=24)]
-    recent_7d = [dp for dp in graph_data if dp.timestamp >= now - timedelta(days=7)]
-    recent_30d = graph_data  # All data is within 30 days
-    
-    def calc_avg_uptime(data_points: List[UptimeGraphData]) -> float:
-        if not data_points:
-            return 100.0
-        return sum(dp.uptime_percentage for dp in data_points) / len(data_points)
-    
-    def calc_avg_response_time(data_points: List[UptimeGraphData]) -> Optional[float]:
-        response_times = [dp.response_time for dp in data_points if dp.response_time is not None]
-        if not response_times:
-            return None
-        return sum(response_times) / len(response_times)
-    
-    # Count incidents (simplified - in production would be more sophisticated)
-    incidents_24h = db.query(IncidentModel).filter(
-        and_(
-            IncidentModel.service_id == service_id,
-            IncidentModel.created_at >= now - timedelta(hours=24)
-        )
-    ).count()
+    start, end = _naive_utc(start), _naive_utc(end)
+    if start is not None or end is not None:
+        end_time = end or now
+        start_time = start or end_time - _PERIODS[period]
+        period = "custom"
+    else:
+        end_time = now
+        start_time = now - _PERIODS[period]
+    if start_time >= end_time:
+        raise HTTPException(status_code=400, detail="start must be before end")
+    resolution, interval = select_resolution(start_time, end_time, max_points)
+    
+    # One gap-filled, bucketed statement over the rollup matching the bucket width
+    rows = bucket_series(db, service.id, start_time, end_time, interval)
+    
+    # Effective downtime (outages and incidents minus maintenance) covering the
+    # graph and the 30 day stats window, loaded once; uptime is the share of
+    # each bucket or window it does not cover
+    downtime = effective_downtime(
+        db, [service], min(start_time, now - timedelta(days=30)), max(end_time, now), now
+    )[service.id]
+    uptimes = [
+        None if row.status == "no_data" else float(value)
+        for row, value in zip(rows, bucket_uptime(downtime, [row.bucket_start for row in rows], interval.total_seconds(), now))
+    ]
     
-    incidents_7d = db.query(IncidentModel).filter(
-        and_(
-            IncidentModel.service_id == service_id,
-            IncidentModel.created_at >= now - timedelta(days=7)
+    target = min(max_points, downsample or max_points)
+    if len(rows) > target:
+        keep = lttb_indices(
+            [row.bucket_start.timestamp() for row in rows],
+            [
+                (
+                    float("nan") if uptime is None else uptime,
+                    float("nan") if row.response_time is None else float(row.response_time),
+                )
+                for row, uptime in zip(rows, uptimes)
+            ],
+            target,
         )
-    ).count()
+        rows = [rows[index] for index in keep]
+        uptimes = [uptimes[index] for index in keep]
     
-    incidents_30d = db.query(IncidentModel).filter(
-        and_(
-            IncidentModel.service_id == service_id,
-            IncidentModel.created_at >= now - timedelta(days=30)
+    graph_data = [
+        UptimeGraphData(
+            timestamp=row.bucket_start,
+            uptime_percentage=uptime,
+            status=row.status,
+            response_time=row.response_time,
+            latency=_latency_percentiles(LatencySketch.decode(row.response_time_sketch)),
         )
-    ).count()
+        for row, uptime in zip(rows, uptimes)
+    ]
     
-    # Get last incident
-    last_incident = db.query(IncidentModel).filter(
-        IncidentModel.service_id == service_id
-    ).order_by(desc(IncidentModel.created_at)).first()
+    windows = {
+        "24h": now - timedelta(hours=24),
+        "7d": now - timedelta(days=7),
+        "30d": now - timedelta(days=30),
+    }
+    totals = window_totals(db, [service.id], {"24h": windows["24h"]}).get(service.id, {})
+    
+    def window_uptime(name: str) -> float:
+        return uptime_between(downtime, windows[name], now)
+    
+    def window_response_time(name: str) -> Optional[float]:
+        _, _, response_time_count, response_time_sum = totals.get(name, (0, 0, 0, None))
+        return average_response_time(response_time_count, response_time_sum)
+    
+    # Window percentiles merge at most a few hundred stored bucket sketches
+    latency_24h = window_sketches(db, [service.id], windows["24h"]).get(service.id)
+    latency_7d = window_sketches(db, [service.id], windows["7d"]).get(service.id)
+    latency_30d = window_sketches(db, [service.id], windows["30d"], UptimeRollupDay).get(service.id)
+    
+    incident_stats = _get_incident_stats(db, [service.id], now).get(service.id, _NO_INCIDENTS)
     
     current_stats = UptimeStats(
         service_id=service.id,
         service_name=service.name,
-        current_uptime_percentage=calc_avg_uptime(recent_24h),
-        uptime_24h=calc_avg_uptime(recent_24h),
-        uptime_7d=calc_avg_uptime(recent_7d),
-        uptime_30d=calc_avg_uptime(recent_30d),
-        avg_response_time=calc_avg_response_time(recent_24h),
-        total_incidents_24h=incidents_24h,
-        total_incidents_7d=incidents_7d,
-        total_incidents_30d=incidents_30d,
+        current_uptime_percentage=window_uptime("24h"),
+        uptime_24h=window_uptime("24h"),
+        uptime_7d=window_uptime("7d"),
+        uptime_30d=window_uptime("30d"),
+        avg_response_time=window_response_time("24h"),
+        latency_24h=_latency_percentiles(latency_24h),
+        latency_7d=_latency_percentiles(latency_7d),
+        latency_30d=_latency_percentiles(latency_30d),
+        total_incidents_24h=incident_stats.incidents_24h,
+        total_incidents_7d=incident_stats.incidents_7d,
+        total_incidents_30d=incident_stats.incidents_30d,
         current_status=service.status.value,
-        last_incident=last_incident.created_at if last_incident else None
+        last_incident=incident_stats.last_incident
     )
     
     return UptimeMetricsResponse(
@@ -155,7 +219,78 @@ def get_service_uptime_metrics(
         service_name=service.name,
         current_stats=current_stats,
         graph_data=graph_data,
-        period=period
+        period=period,
+        start=start_time,
+        end=end_time,
+        resolution=resolution
+    )
+
+@router.get("/services/{service_id}/reports", response_model=List[UptimeReport])
+def get_service_uptime_reports(
+    *,
+    db: Session = Depends(get_db),
+    service_id: int,
+    period_type: str = Query("daily", regex="^(daily|weekly|monthly)$"),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    limit: int = Query(90, ge=1, le=1000),
+    current_user: UserModel = Depends(security.all_authenticated_users()),
+) -> Any:
+    """Get generated uptime reports (SLA history) for a service, newest first."""
+    
+    # Verify user has access to this service
+    service_query = db.query(ServiceModel).filter(ServiceModel.id == service_id)
+    if not current_user.is_superuser:
+        service_query = service_query.filter(ServiceModel.organization_id == current_user.organization_id)
+    
+    if not service_query.first():
+        raise HTTPException(status_code=404, detail="Service not found")
+    
+    query = db.query(UptimeReportModel).filter(
+        UptimeReportModel.service_id == service_id,
+        UptimeReportModel.period_type == period_type,
+    )
+    if start is not None:
+        query = query.filter(UptimeReportModel.start_date >= start)
+    if end is not None:
+        query = query.filter(UptimeReportModel.start_date < end)
+    
+    return query.order_by(desc(UptimeReportModel.start_date)).limit(limit).all()
+
+@router.get("/services/{service_id}/outages", response_model=OutageReport)
+def get_service_outages(
+    *,
+    db: Session = Depends(get_db),
+    service_id: int,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    current_user: UserModel = Depends(security.all_authenticated_users()),
+) -> Any:
+    """Outage intervals overlapping a range (default: the last 30 days) with total and longest downtime."""
+    
+    # Verify user has access to this service
+    service_query = db.query(ServiceModel).filter(ServiceModel.id == service_id)
+    if not current_user.is_superuser:
+        service_query = service_query.filter(ServiceModel.organization_id == current_user.organization_id)
+    
+    if not service_query.first():
+        raise HTTPException(status_code=404, detail="Service not found")
+    
+    now = datetime.utcnow()
+    end = _naive_utc(end) or now
+    start = _naive_utc(start) or end - timedelta(days=30)
+    if start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+    
+    summary = outage_summary(db, [service_id], start, end, now).get(service_id, NO_OUTAGES)
+    return OutageReport(
+        service_id=service_id,
+        start=start,
+        end=end,
+        outage_count=summary.outage_count,
+        downtime_minutes=summary.downtime_seconds / 60,
+        longest_outage_minutes=summary.longest_seconds / 60,
+        outages=outages_in_range(db, service_id, start, end),
     )
 
 @router.get("/overview", response_model=List[UptimeStats])
@@ -175,84 +310,97 @@ def get_uptime_overview(
     
     overview_stats = []
     now = datetime.utcnow()
+    service_ids = [service.id for service in services]
+    
+    # Constant number of queries regardless of service count: grouped rollup
+    # aggregates for response time, one incident aggregate, one read of the
+    # hourly latency sketches and three interval queries for downtime
+    totals = window_totals(db, service_ids, {"24h": now - timedelta(hours=24)})
+    incident_stats = _get_incident_stats(db, service_ids, now)
+    latency_24h = window_sketches(db, service_ids, now - timedelta(hours=24))
+    downtime = effective_downtime(db, services, now - timedelta(days=30), now, now)
+    empty_window = (0, 0, 0, None)
     
     for service in services:
-        # Count incidents for different periods
-        incidents_24h = db.query(IncidentModel).filter(
-            and_(
-                IncidentModel.service_id == service.id,
-                IncidentModel.created_at >= now - timedelta(hours=24)
-            )
-        ).count()
-        
-        incidents_7d = db.query(IncidentModel).filter(
-            and_(
-                IncidentModel.service_id == service.id,
-                IncidentModel.created_at >= now - timedelta(days=7)
-            )
-        ).count()
-        
-        incidents_30d = db.query(IncidentModel).filter(
-            and_(
-                IncidentModel.service_id == service.id,
-                IncidentModel.created_at >= now - timedelta(days=30)
-            )
-        ).count()
-        
-        # Calculate uptime based on service status and incidents
-        base_uptime = {
-            "operational": 99.9,
-            "degraded": 95.0,
-            "partial_outage": 75.0,
-            "major_outage": 20.0,
-            "maintenance": 0.0
-        }.get(service.status.value, 99.9)
-        
-        # Adjust for incidents (simplified calculation)
-        uptime_24h = max(0.0, base_uptime - (incidents_24h * 2.0))
-        uptime_7d = max(0.0, base_uptime - (incidents_7d * 1.0))
-        uptime_30d = max(0.0, base_uptime - (incidents_30d * 0.5))
-        
-        # Get last incident
-        last_incident = db.query(IncidentModel).filter(
-            IncidentModel.service_id == service.id
-        ).order_by(desc(IncidentModel.created_at)).first()
-        
-        # Generate realistic response time
-        base_response_time = {
-            "operational": 150,
-            "degraded": 500,
-            "partial_outage": 1500,
-            "major_outage": 5000,
-            "maintenance": None
-        }.get(service.status.value, 150)
+        service_totals = totals.get(service.id, {})
+        service_incidents = incident_stats.get(service.id, _NO_INCIDENTS)
+        service_downtime = downtime.get(service.id, [])
+        uptime_24h = uptime_between(service_downtime, now - timedelta(hours=24), now)
         
         overview_stats.append(UptimeStats(
             service_id=service.id,
             service_name=service.name,
             current_uptime_percentage=uptime_24h,
             uptime_24h=uptime_24h,
-            uptime_7d=uptime_7d,
-            uptime_30d=uptime_30d,
-            avg_response_time=base_response_time,
-            total_incidents_24h=incidents_24h,
-            total_incidents_7d=incidents_7d,
-            total_incidents_30d=incidents_30d,
+            uptime_7d=uptime_between(service_downtime, now - timedelta(days=7), now),
+            uptime_30d=uptime_between(service_downtime, now - timedelta(days=30), now),
+            avg_response_time=average_response_time(*service_totals.get("24h", empty_window)[2:]),
+            latency_24h=_latency_percentiles(latency_24h.get(service.id)),
+            total_incidents_24h=service_incidents.incidents_24h,
+            total_incidents_7d=service_incidents.incidents_7d,
+            total_incidents_30d=service_incidents.incidents_30d,
             current_status=service.status.value,
-            last_incident=last_incident.created_at if last_incident else None
+            last_incident=service_incidents.last_incident
         ))
     
     return overview_stats
 
+@router.get("/slos", response_model=List[SloStatus])
+def get_slo_status(
+    *,
+    db: Session = Depends(get_db),
+    current_user: UserModel = Depends(security.all_authenticated_users()),
+) -> Any:
+    """
+    Error budget and 1h/6h/24h/30d burn rates for every service with an SLO in the organization.
+    Latency SLOs without a threshold (stored before it was required) can't be evaluated and are left out.
+    """
+    
+    services_query = db.query(ServiceModel).filter(
+        ServiceModel.is_active == True,
+        ServiceModel.slo_type.isnot(None),
+        ServiceModel.slo_target.isnot(None),
+        or_(ServiceModel.slo_type != SloType.LATENCY, ServiceModel.slo_latency_threshold_ms.isnot(None)),
+    )
+    if not current_user.is_superuser:
+        services_query = services_query.filter(ServiceModel.organization_id == current_user.organization_id)
+    
+    services = services_query.order_by(ServiceModel.id).all()
+    
+    # One grouped rollup query and one vectorized pass over all services
+    evaluation = evaluate_services(db, services, datetime.utcnow())
+    window_names = [name for name, _ in BURN_WINDOWS]
+    
+    return [
+        SloStatus(
+            service_id=service.id,
+            service_name=service.name,
+            slo_type=service.slo_type.value,
+            target=service.slo_target,
+            latency_threshold_ms=service.slo_latency_threshold_ms,
+            compliance=None if np.isnan(compliance) else float(compliance),
+            error_budget_remaining=float(budget_remaining),
+            burn_rates=dict(zip(window_names, burn_rates.tolist())),
+            status=str(status),
+        )
+        for service, compliance, budget_remaining, burn_rates, status in zip(
+            services, evaluation.compliance, evaluation.budget_remaining, evaluation.burn_rates, evaluation.status
+        )
+    ]
+
 @router.post("/services/{service_id}/record-metric")
-async def record_uptime_metric(
+def record_uptime_metric(
     *,
     db: Session = Depends(get_db),
     service_id: int,
     metric_in: UptimeMetricCreate,
     current_user: UserModel = Depends(security.manager_or_admin()),
 ) -> Any:
-    """Record a new uptime metric for a service (used by monitoring systems)."""
+    """
+    Record a new uptime metric for a service (used by monitoring systems).
+    With write-behind enabled the metric is acknowledged once queued and is
+    written in the next group commit, so no metric_id is returned.
+    """
     
     # Verify user has access to this service
     service_query = db.query(ServiceModel).filter(ServiceModel.id == service_id)
@@ -262,14 +410,133 @@ async def record_uptime_metric(
     service = service_query.first()
     if not service:
         raise HTTPException(status_code=404, detail="Service not found")
+    if service.organization_id is None:
+        raise HTTPException(status_code=400, detail="Service does not belong to an organization")
     
-    # Create uptime metric
+    # Create uptime metric; the row is acknowledged before it is written, so
+    # take the organization from the service instead of trusting the client's
     metric_data = metric_in.dict()
     metric_data["service_id"] = service_id
+    metric_data["organization_id"] = service.organization_id
+    
+    if settings.METRIC_WRITE_BEHIND_ENABLED and metric_buffer.running:
+        if not metric_buffer.submit([build_metric_row(**metric_data)]):
+            raise HTTPException(status_code=503, detail="Metric buffer is full, retry later")
+        return {"message": "Uptime metric accepted", "metric_id": None}
     
     metric = UptimeMetricModel(**metric_data)
     db.add(metric)
     db.commit()
     db.refresh(metric)
     
-    return {"message": "Uptime metric recorded successfully", "metric_id": metric.id} 
\ No newline at end of file
+    return {"message": "Uptime metric recorded successfully", "metric_id": metric.id}
+
+@router.get("/ingest/stats")
+def get_ingest_stats(
+    *,
+    current_user: UserModel = Depends(security.admin_only()),
+) -> Any:
+    """Queue depth and flush latency of the metric write-behind buffer."""
+    return metric_buffer.stats()
+
+
+@router.post("/metrics/batch", response_model=UptimeMetricBatchResponse)
+def record_uptime_metrics_batch(
+    *,
+    db: Session = Depends(get_db),
+    batch_in: UptimeMetricBatchCreate,
+    current_user: UserModel = Depends(security.manager_or_admin()),
+) -> Any:
+    """
+    Record many uptime metrics, for any number of services, in one request.
+    Service access is checked once per batch and accepted metrics are written
+    with a single multi-row insert. Returns a result for every submitted item.
+    """
+    service_orgs = get_accessible_service_organizations(
+        db, (item.service_id for item in batch_in.metrics), current_user
+    )
+    
+    results: List[Optional[UptimeMetricBatchResult]] = [None] * len(batch_in.metrics)
+    rows = []
+    row_indexes = []
+    
+    for index, item in enumerate(batch_in.metrics):
+        if item.service_id not in service_orgs:
+            results[index] = UptimeMetricBatchResult(
+                index=index, service_id=item.service_id, success=False, error="Service not found"
+            )
+            continue
+        
+        organization_id = service_orgs[item.service_id]
+        if organization_id is None:
+            results[index] = UptimeMetricBatchResult(
+                index=index, service_id=item.service_id, success=False,
+                error="Service does not belong to an organization"
+            )
+            continue
+        
+        rows.append(build_metric_row(
+            service_id=item.service_id,
+            organization_id=organization_id,
+            status=item.status,
+            response_time=item.response_time,
+            is_up=item.is_up,
+            timestamp=item.timestamp,
+        ))
+        row_indexes.append(index)
+    
+    metric_ids = insert_metric_rows(db, rows)
+    db.commit()
+    
+    for index, metric_id in zip(row_indexes, metric_ids):
+        results[index] = UptimeMetricBatchResult(
+            index=index, service_id=batch_in.metrics[index].service_id, success=True, metric_id=metric_id
+        )
+    
+    return UptimeMetricBatchResponse(
+        accepted=len(metric_ids),
+        rejected=len(batch_in.metrics) - len(metric_ids),
+        results=results,
+    )
+
+@router.post("/metrics/stream", response_model=UptimeMetricStreamResponse)
+async def stream_uptime_metrics(
+    *,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: UserModel = Depends(security.manager_or_admin()),
+) -> Any:
+    """
+    Ingest a newline-delimited JSON stream of metrics over one long-lived request.
+    Each line has the shape of a batch item. Records are parsed as the body
+    arrives and written in chunks of METRIC_STREAM_CHUNK_SIZE; the body is not
+    read again until the previous chunk is committed, so a slow database pushes
+    back on the agent through TCP flow control instead of growing server memory.
+    """
+    writer = MetricStreamWriter(db, current_user, settings.METRIC_STREAM_MAX_ERRORS)
+    pending = []
+    
+    async for line_number, line in iter_ndjson_lines(request.stream(), settings.METRIC_STREAM_MAX_LINE_BYTES):
+        if line is None:
+            writer.reject(line_number, "Line exceeds maximum length")
+            continue
+        try:
+            item = UptimeMetricBatchItem.model_validate_json(line)
+        except ValidationError as e:
+            writer.reject(line_number, e.errors(include_url=False)[0]["msg"])
+            continue
+        
+        pending.append((line_number, item))
+        if len(pending) >= settings.METRIC_STREAM_CHUNK_SIZE:
+            await run_in_threadpool(writer.write_chunk, pending)
+            pending = []
+    
+    if pending:
+        await run_in_threadpool(writer.write_chunk, pending)
+    
+    return UptimeMetricStreamResponse(
+        accepted=writer.accepted,
+        rejected=writer.rejected,
+        errors=writer.errors,
+        errors_truncated=writer.errors_truncated,
+    )
@@ -1,24 +1,174 @@
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect
-from app.api.websockets.manager import manager
+import json
+from typing import Optional, Union
+
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, status
+from fastapi.concurrency import run_in_threadpool
+
+from app.api.websockets.bus import current_sequence, event_bus
+from app.api.websockets.manager import Topic, manager
+from app.core import security
+from app.db.session import SessionLocal
+from app.models.organization import OrganizationModel
+from app.models.service import ServiceModel
+from app.models.user import UserModel
 
 router = APIRouter()
 
-@router.websocket("/ws/status")
-async def websocket_status_endpoint(websocket: WebSocket):
-    await manager.connect(websocket, "status")
+def _authenticate(token: Optional[str]) -> Optional[UserModel]:
+    if not token:
+        return None
+    db = SessionLocal()
+    try:
+        user = security.get_user_from_token(db, token)
+        return user if user is not None and user.is_active else None
+    finally:
+        db.close()
+
+def _resolve_topic(user: UserModel, client_type: str, message: dict) -> Union[Topic, str]:
+    """The topic a subscribe/unsubscribe message names, or why the user can't have it."""
+    slug = message.get("organization")
+    service_id = message.get("service_id")
+    if not isinstance(slug, str) or not (service_id is None or isinstance(service_id, int)):
+        return "Expected an organization slug and an optional integer service_id"
+
+    db = SessionLocal()
     try:
+        organization = (
+            db.query(OrganizationModel)
+            .filter(OrganizationModel.slug == slug, OrganizationModel.is_active == True)
+            .first()
+        )
+        # Same answer for missing and foreign organizations
+        if organization is None or (not user.is_superuser and organization.id != user.organization_id):
+            return "The organization does not exist or you don't have access to it"
+        if service_id is not None:
+            service = (
+                db.query(ServiceModel.id)
+                .filter(ServiceModel.id == service_id, ServiceModel.organization_id == organization.id)
+                .first()
+            )
+            if service is None:
+                return "The service does not exist in this organization"
+        return (client_type, organization.id, service_id)
+    finally:
+        db.close()
+
+def _load_snapshot(organization_id: int) -> dict:
+    # Imported here: the public endpoints import this package for the status stream
+    from app.api.v1.endpoints.public import public_status_overview
+
+    db = SessionLocal()
+    try:
+        # Read first: deltas after it may already be in the data, and re-applying them is harmless
+        sequence = current_sequence(db, organization_id)
+        overview = public_status_overview(db, organization_id)
+    finally:
+        db.close()
+    return {
+        "type": "snapshot",
+        "organization_id": organization_id,
+        "sequence": sequence,
+        "data": overview.model_dump(mode="json"),
+    }
+
+async def _subscribe(websocket: WebSocket, topic: Topic, since: Optional[int]) -> None:
+    """
+    Subscribe, first catching the client up when it says which sequence it
+    last saw: with the deltas it missed if this worker still has them, or
+    with a snapshot plus any deltas after it.
+    """
+    client_type, organization_id, service_id = topic
+    # Followed until subscribed, from before any snapshot's sequence is
+    # read, so no event is skipped or evicted for want of a subscriber
+    event_bus.follow(organization_id)
+    try:
+        if since is not None:
+            deltas = event_bus.deltas_since(organization_id, since)
+            if deltas is None:
+                snapshot = await run_in_threadpool(_load_snapshot, organization_id)
+                manager.send(websocket, client_type, snapshot)
+                deltas = event_bus.deltas_after_snapshot(organization_id, snapshot["sequence"])
+                if deltas is None:
+                    manager.send(websocket, client_type, {"type": "resync", "organization_id": organization_id})
+                    deltas = []
+            missed = [
+                delta.data for delta in deltas
+                if delta.client_type == client_type
+                and (service_id is None or delta.service_id is None or delta.service_id == service_id)
+            ]
+            if missed:
+                # One message, so a long gap can't overflow the send queue
+                manager.send_encoded(websocket, client_type, '{"type":"batch","messages":[%s]}' % ",".join(missed))
+        # No await since the catch-up, so no delta can fall in between
+        manager.subscribe(websocket, topic)
+    finally:
+        event_bus.unfollow(organization_id)
+
+async def _handle_message(websocket: WebSocket, client_type: str, user: UserModel, text: str) -> dict:
+    try:
+        message = json.loads(text)
+    except ValueError:
+        return {"type": "error", "detail": "Messages must be JSON"}
+    action = message.get("action") if isinstance(message, dict) else None
+    if action not in ("subscribe", "unsubscribe"):
+        return {"type": "error", "detail": "Unknown action; expected subscribe or unsubscribe"}
+    since = message.get("since")
+    if since is not None and not isinstance(since, int):
+        return {"type": "error", "action": action, "detail": "since must be an integer sequence number"}
+
+    topic = await run_in_threadpool(_resolve_topic, user, client_type, message)
+    if isinstance(topic, str):
+        return {"type": "error", "action": action, "detail": topic}
+    if action == "subscribe":
+        await _subscribe(websocket, topic, since)
+    else:
+        manager.unsubscribe(websocket, topic)
+    return {
+        "type": f"{action}d",
+        "organization": message["organization"],
+        "service_id": message.get("service_id"),
+    }
+
+async def _serve(websocket: WebSocket, client_type: str):
+    """
+    Authenticate with ?token=<access token>, since browsers can't set headers
+    on WebSocket requests. Users start subscribed to their own organization
+    and can send {"action": "subscribe" | "unsubscribe", "organization":
+    "<slug>", "service_id": <id, optional>} to narrow or widen that.
+
+    Messages are deltas numbered by a per-organization "sequence". To resume
+    after a reconnect, pass the last sequence seen as ?since=<n> (for the
+    automatic subscription) or "since" in a subscribe message; the reply is
+    the missed deltas in one "batch" message, or a "snapshot" when they are
+    no longer available.
+    On a "resync" message, subscribe again with "since" to get a snapshot.
+    """
+    user = await run_in_threadpool(_authenticate, websocket.query_params.get("token"))
+    if user is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    since = websocket.query_params.get("since")
+
+    await manager.connect(websocket, client_type)
+    try:
+        if user.organization_id is not None:
+            await _subscribe(
+                websocket,
+                (client_type, user.organization_id, None),
+                int(since) if since and since.isdigit() else None,
+            )
         while True:
-            data = await websocket.receive_text()
-            # Handle any incoming messages if needed
+            text = await websocket.receive_text()
+            manager.send(websocket, client_type, await _handle_message(websocket, client_type, user, text))
     except WebSocketDisconnect:
-        manager.disconnect(websocket, "status")
+        pass
+    finally:
+        manager.disconnect(websocket, client_type)
+
+@router.websocket("/ws/status")
+async def websocket_status_endpoint(websocket: WebSocket):
+    await _serve(websocket, "status")
 
 @router.websocket("/ws/incidents")
 async def websocket_incidents_endpoint(websocket: WebSocket):
-    await manager.connect(websocket, "incidents")
-    try:
-        while True:
-            data = await websocket.receive_text()
-            # Handle any incoming messages if needed
-    except WebSocketDisconnect:
-        manager.disconnect(websocket, "incidents") 
\ No newline at end of file
+    await _serve(websocket, "incidents")
@@ -0,0 +1,400 @@
+import asyncio
+import json
+import logging
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Deque, Dict, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+import psycopg2
+import psycopg2.extensions
+from fastapi.concurrency import run_in_threadpool
+from psycopg2 import sql
+from sqlalchemy import inspect, text
+from sqlalchemy.orm import Session, selectinload
+
+from app.api.websockets.manager import ConnectionManager, encode, manager
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.incident import IncidentModel, IncidentUpdateModel
+from app.models.maintenance import MaintenanceModel
+from app.models.service import ServiceModel
+from app.monitoring.status_snapshot import status_snapshot
+from app.schemas.incident import Incident, IncidentUpdateInDB
+from app.schemas.maintenance import Maintenance
+from app.schemas.service import Service
+
+logger = logging.getLogger(__name__)
+
+
+def _maintenance_public(row: MaintenanceModel) -> bool:
+    end = row.scheduled_end
+    if end is not None and end.tzinfo is None:
+        end = end.replace(tzinfo=timezone.utc)
+    return bool(row.is_active) or (end is not None and end >= datetime.now(timezone.utc) - timedelta(days=7))
+
+
+# kind -> (client type, model, schema, relationships to load, whether a row
+# is on the public status page). The schemas are the ones StatusOverview
+# uses, so messages never carry more than the public page shows.
+_KINDS = {
+    "service": ("status", ServiceModel, Service, (), lambda row: bool(row.is_active)),
+    "maintenance": ("status", MaintenanceModel, Maintenance, (), _maintenance_public),
+    "incident": ("incidents", IncidentModel, Incident, (IncidentModel.updates,), lambda row: bool(row.is_active)),
+    "incident_update": (
+        "incidents", IncidentUpdateModel, IncidentUpdateInDB, (IncidentUpdateModel.incident,),
+        lambda row: row.incident is not None and bool(row.incident.is_active),
+    ),
+}
+
+# Columns whose change can move a row onto or off the public status page
+_VISIBILITY_FIELDS = {"is_active", "scheduled_end"}
+
+# The row lock taken here is held until commit, so an organization's
+# events commit, and are notified, in sequence order
+_NEXT_SEQUENCE = """
+    INSERT INTO organization_event_sequences (organization_id, last_sequence)
+    VALUES (:organization_id, 1)
+    ON CONFLICT (organization_id)
+    DO UPDATE SET last_sequence = organization_event_sequences.last_sequence + 1, updated_at = now()
+    RETURNING last_sequence
+"""
+
+_CURRENT_SEQUENCE = "SELECT last_sequence FROM organization_event_sequences WHERE organization_id = :organization_id"
+
+
+class Event(NamedTuple):
+    kind: str
+    action: str  # created, updated or deleted
+    id: int
+    organization_id: int
+    service_id: Optional[int]
+    sequence: int
+    fields: List[str]  # columns an update changed
+
+
+class Delta(NamedTuple):
+    sequence: int
+    client_type: str
+    service_id: Optional[int]
+    data: Optional[str]  # encoded message; None for an event with nothing left to send
+    public: Optional[str]  # the message for the public status stream; None when it shows nothing of it
+
+
+def changed_fields(entity) -> List[str]:
+    """Columns of an ORM object with changes not yet flushed."""
+    state = inspect(entity)
+    return [attr.key for attr in state.mapper.column_attrs if state.attrs[attr.key].history.has_changes()]
+
+
+def current_sequence(db: Session, organization_id: int) -> int:
+    return db.execute(text(_CURRENT_SEQUENCE), {"organization_id": organization_id}).scalar() or 0
+
+
+class EventBus:
+    """
+    Realtime events shared by every worker through Postgres LISTEN/NOTIFY.
+
+    Writers call publish() inside their transaction, so a notification goes
+    out exactly when the change commits, numbered by a per-organization
+    sequence. It carries only ids and changed column names, which keeps it
+    far below the 8000 byte NOTIFY limit however large the row. Each worker
+    holds one listening connection, watched by the event loop, and turns
+    notifications into delta messages for its own subscribers: created rows
+    in full, updates as just the changed fields, deletes as the id. Events
+    of organizations nobody here follows are skipped, the rest are loaded in
+    batches with one query per kind, and each message is encoded once for
+    all local sockets.
+
+    The last REALTIME_DELTA_BUFFER_SIZE deltas of each followed organization
+    are kept so a reconnecting client can be sent just the ones it missed.
+    An organization is followed while it has subscribers here or a snapshot
+    for one is loading; its buffer is dropped once neither is left.
+    A jump in the sequence (notifications lost while reconnecting, a failed
+    load) empties that buffer and tells subscribers to resync.
+
+    Sinks added with add_sink() receive the public version of every event,
+    followed or not: only rows the public status page shows, in full, and a
+    deletion when an update takes one off it.
+    Any notification also expires this worker's status snapshot, so writes
+    handled by other workers show up without waiting for its max age.
+    """
+
+    def __init__(
+        self,
+        manager: ConnectionManager,
+        channel: str = settings.REALTIME_CHANNEL,
+        batch_size: int = settings.REALTIME_LOAD_BATCH_SIZE,
+        reconnect_seconds: float = settings.REALTIME_RECONNECT_SECONDS,
+        buffer_size: int = settings.REALTIME_DELTA_BUFFER_SIZE,
+    ):
+        self.manager = manager
+        self.channel = channel
+        self.batch_size = batch_size
+        self.reconnect_seconds = reconnect_seconds
+        self.buffer_size = buffer_size
+        self.events_received = 0
+        self._conn: Optional[psycopg2.extensions.connection] = None
+        self._pending: List[Event] = []
+        self._sinks: List[Callable[[str, int, Optional[int], str], None]] = []
+        self._deltas: Dict[int, Deque[Delta]] = {}
+        self._last_sequence: Dict[int, int] = {}
+        self._loading: Dict[int, int] = {}  # organization -> snapshot loads in progress
+        self._flush_task: Optional[asyncio.Task] = None
+        self._listen_task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stopping = False
+        manager.add_idle_listener(self._release)
+
+    def publish(
+        self, db: Session, kind: str, action: str, entity_id: int,
+        organization_id: Optional[int], service_id: Optional[int] = None, fields: Sequence[str] = (),
+    ) -> None:
+        """
+        Number the event and queue its notification in the current
+        transaction; it is delivered on commit. Updates pass the changed
+        columns (see changed_fields); an update that changed nothing is not
+        an event.
+        """
+        if organization_id is None or (action == "updated" and not fields):
+            return
+        sequence = db.execute(text(_NEXT_SEQUENCE), {"organization_id": organization_id}).scalar()
+        payload = json.dumps(
+            [kind, action, entity_id, organization_id, service_id, sequence, list(fields)], separators=(",", ":")
+        )
+        db.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": self.channel, "payload": payload})
+
+    def add_sink(self, sink: Callable[[str, int, Optional[int], str], None]) -> None:
+        """Also pass every public message to sink(client_type, organization_id, service_id, data)."""
+        self._sinks.append(sink)
+
+    def deltas_since(self, organization_id: int, sequence: int) -> Optional[List[Delta]]:
+        """Buffered deltas after `sequence`, or None if the buffer can't tell what came after it."""
+        last = self._last_sequence.get(organization_id)
+        if last is None:
+            return None
+        deltas = self._deltas[organization_id]
+        first = deltas[0].sequence if deltas else last + 1
+        if sequence < first - 1:
+            return None
+        return [delta for delta in deltas if delta.sequence > sequence and delta.data is not None]
+
+    def follow(self, organization_id: int) -> None:
+        """Follow an organization while a subscriber is caught up, before it is subscribed."""
+        self._loading[organization_id] = self._loading.get(organization_id, 0) + 1
+
+    def unfollow(self, organization_id: int) -> None:
+        remaining = self._loading.pop(organization_id) - 1
+        if remaining:
+            self._loading[organization_id] = remaining
+        else:
+            self._release(organization_id)
+
+    def deltas_after_snapshot(self, organization_id: int, sequence: int) -> Optional[List[Delta]]:
+        """
+        Buffered deltas after a snapshot taken at `sequence`, read while the
+        organization is followed. With nothing buffered yet the buffer starts
+        at the snapshot; None means deltas after it were lost.
+        """
+        if organization_id not in self._last_sequence:
+            self._last_sequence[organization_id] = sequence
+            self._deltas[organization_id] = deque(maxlen=self.buffer_size)
+        return self.deltas_since(organization_id, sequence)
+
+    def start(self) -> None:
+        """Start listening in the background; never blocks or fails startup."""
+        self._stopping = False
+        self._loop = asyncio.get_running_loop()
+        self._listen_task = asyncio.ensure_future(self._listen())
+
+    async def stop(self) -> None:
+        self._stopping = True
+        for task in (self._listen_task, self._flush_task):
+            if task is not None:
+                task.cancel()
+        self._close()
+
+    def _connect(self) -> psycopg2.extensions.connection:
+        conn = psycopg2.connect(settings.SQLALCHEMY_DATABASE_URI)
+        conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+        with conn.cursor() as cursor:
+            cursor.execute(sql.SQL("LISTEN {}").format(sql.Identifier(self.channel)))
+        return conn
+
+    async def _listen(self) -> None:
+        while not self._stopping:
+            try:
+                self._conn = await run_in_threadpool(self._connect)
+            except Exception as exc:
+                logger.warning("Event bus could not connect (%s), retrying in %ss", exc, self.reconnect_seconds)
+                await asyncio.sleep(self.reconnect_seconds)
+                continue
+            self._loop.add_reader(self._conn.fileno(), self._on_readable)
+            logger.info("Event bus listening on %s", self.channel)
+            return
+
+    def _close(self) -> None:
+        if self._conn is None:
+            return
+        try:
+            self._loop.remove_reader(self._conn.fileno())
+        except Exception:
+            pass
+        try:
+            self._conn.close()
+        except Exception:
+            pass
+        self._conn = None
+
+    def _on_readable(self) -> None:
+        try:
+            self._conn.poll()
+        except psycopg2.Error:
+            logger.warning("Event bus connection lost, reconnecting")
+            self._close()
+            if not self._stopping:
+                self._listen_task = asyncio.ensure_future(self._listen())
+            return
+
+        notifies = self._conn.notifies
+        for notify in notifies:
+            try:
+                event = Event(*json.loads(notify.payload))
+            except (ValueError, TypeError):
+                logger.warning("Ignoring malformed event %r", notify.payload)
+                continue
+            if event.kind in _KINDS:
+                self._pending.append(event)
+        self.events_received += len(notifies)
+        if notifies:
+            status_snapshot.invalidate()
+        del notifies[:]
+
+        if self._pending and (self._flush_task is None or self._flush_task.done()):
+            self._flush_task = asyncio.ensure_future(self._flush())
+
+    def _tracks(self, organization_id: int) -> bool:
+        """Whether this worker buffers an organization's deltas."""
+        return organization_id in self._loading or self.manager.has_organization_subscribers(organization_id)
+
+    def _release(self, organization_id: int) -> None:
+        """Drop an organization's buffer once nobody here follows it."""
+        if not self._tracks(organization_id):
+            self._deltas.pop(organization_id, None)
+            self._last_sequence.pop(organization_id, None)
+
+    def _follows(self, event: Event) -> bool:
+        return bool(self._sinks) or self._tracks(event.organization_id)
+
+    def _resync(self, organization_id: int) -> None:
+        """Forget an organization's buffer after a gap and have its subscribers fetch a snapshot."""
+        self._deltas.pop(organization_id, None)
+        self._last_sequence.pop(organization_id, None)
+        data = encode({"type": "resync", "organization_id": organization_id})
+        for client_type in self.manager.active_connections:
+            self.manager.fan_out(client_type, organization_id, None, data)
+
+    def _record(self, event: Event, delta: Delta) -> bool:
+        """Buffer a delta; False if it is one this worker has already seen."""
+        organization_id = event.organization_id
+        last = self._last_sequence.get(organization_id)
+        if last is not None and event.sequence <= last:
+            return False
+        if last is not None and event.sequence != last + 1:
+            logger.warning("Events %d-%d of organization %d were missed", last + 1, event.sequence - 1, organization_id)
+            self._resync(organization_id)
+        self._last_sequence[organization_id] = event.sequence
+        self._deltas.setdefault(organization_id, deque(maxlen=self.buffer_size)).append(delta)
+        return True
+
+    async def _flush(self) -> None:
+        # Events keep arriving while a batch loads; they form the next batch
+        while self._pending:
+            batch, self._pending = self._pending[:self.batch_size], self._pending[self.batch_size:]
+            wanted = [event for event in batch if self._follows(event)]
+            if not wanted:
+                continue
+            try:
+                deltas = await run_in_threadpool(self._load, wanted)
+            except Exception:
+                logger.exception("Loading %d realtime events failed", len(wanted))
+                for organization_id in {event.organization_id for event in wanted}:
+                    self._resync(organization_id)
+                continue
+            for event, delta in zip(wanted, deltas):
+                # Organizations loaded only for the sinks get no buffer
+                if self._tracks(event.organization_id) and not self._record(event, delta):
+                    continue
+                if delta.data is not None:
+                    self.manager.fan_out(delta.client_type, event.organization_id, delta.service_id, delta.data)
+                if delta.public is not None:
+                    for sink in self._sinks:
+                        sink(delta.client_type, event.organization_id, delta.service_id, delta.public)
+
+    def _load(self, events: List[Event]) -> List[Delta]:
+        """The delta of each event, loading the rows it needs with one query per kind."""
+        ids: Dict[str, Set[int]] = {}
+        for event in events:
+            if event.action != "deleted":
+                ids.setdefault(event.kind, set()).add(event.id)
+
+        rows: Dict[Tuple[str, int], Tuple[dict, bool]] = {}
+        db = SessionLocal()
+        try:
+            for kind, kind_ids in ids.items():
+                _, model, schema, relationships, public = _KINDS[kind]
+                query = db.query(model).options(*(selectinload(relationship) for relationship in relationships))
+                for row in query.filter(model.id.in_(kind_ids)):
+                    rows[kind, row.id] = schema.model_validate(row).model_dump(mode="json"), public(row)
+        finally:
+            db.close()
+
+        deltas = []
+        for event in events:
+            client_type = _KINDS[event.kind][0]
+            message = {
+                "type": f"{event.kind}_{event.action}",
+                "organization_id": event.organization_id,
+                "sequence": event.sequence,
+            }
+            row, visible = rows.get((event.kind, event.id), (None, False))
+            if event.action == "deleted":
+                message["id"] = event.id
+                public = encode(message)
+            elif row is None:
+                # Deleted since; its own deleted event follows
+                deltas.append(Delta(event.sequence, client_type, event.service_id, None, None))
+                continue
+            else:
+                public = self._public_message(event, row, visible)
+                if event.action == "created":
+                    message["data"] = row
+                else:
+                    # Values are the row's latest, so applying deltas is idempotent
+                    message["id"] = event.id
+                    message["changes"] = {field: row[field] for field in [*event.fields, "updated_at"] if field in row}
+            deltas.append(Delta(event.sequence, client_type, event.service_id, encode(message), public))
+        return deltas
+
+    def _public_message(self, event: Event, row: dict, visible: bool) -> Optional[str]:
+        """
+        The public stream's message for a created or updated row: the full
+        row while the public page shows it, a deletion when an update takes
+        it off, and nothing for rows it never showed.
+        """
+        if visible:
+            # In full, since the row may have only just become visible
+            action, key, value = event.action, "data", row
+        elif event.action == "updated" and _VISIBILITY_FIELDS.intersection(event.fields):
+            action, key, value = "deleted", "id", event.id
+        else:
+            return None
+        message = {
+            "type": f"{event.kind}_{action}",
+            "organization_id": event.organization_id,
+            "sequence": event.sequence,
+            key: value,
+        }
+        return encode(message)
+
+
+event_bus = EventBus(manager)
@@ -1,33 +1,207 @@
-from typing import Dict, Set
-from fastapi import WebSocket
+import asyncio
 import json
+import logging
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+from fastapi import WebSocket
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# "Try Again Later": the client fell behind and should reconnect
+SLOW_CONSUMER_CLOSE_CODE = 1013
+
+# (client type, organization id, service id or None for the whole organization)
+Topic = Tuple[str, int, Optional[int]]
+
+
+def encode(message: Any) -> str:
+    """Serialize a message once for every subscriber."""
+    return json.dumps(message, separators=(",", ":"), default=str)
+
+
+class Connection:
+    """
+    A socket with a bounded queue of encoded messages, drained by its own
+    writer task. Lighter than asyncio.Queue: queueing for an idle writer
+    costs one future wakeup and nothing at all for a busy one.
+    """
+
+    def __init__(self, websocket: WebSocket, max_queue: int):
+        self.websocket = websocket
+        self.max_queue = max_queue
+        self.pending: Deque[str] = deque()
+        self.writer: Optional[asyncio.Task] = None
+        self.topics: Set[Topic] = set()
+        self._waiter: Optional[asyncio.Future] = None
+
+    def offer(self, data: str) -> bool:
+        """Queue without waiting; False if the queue is full."""
+        if len(self.pending) >= self.max_queue:
+            return False
+        self.pending.append(data)
+        waiter = self._waiter
+        if waiter is not None:
+            self._waiter = None
+            if not waiter.done():
+                waiter.set_result(None)
+        return True
+
+    async def write(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            while not self.pending:
+                self._waiter = loop.create_future()
+                await self._waiter
+            await self.websocket.send_text(self.pending.popleft())
+
 
 class ConnectionManager:
-    def __init__(self):
-        self.active_connections: Dict[str, Set[WebSocket]] = {
-            "status": set(),
-            "incidents": set(),
+    """
+    Fan-out of realtime messages to WebSocket clients.
+
+    Clients subscribe to topics: an organization, or one service in it.
+    Publishing an event looks up only the topics it concerns, so its cost
+    grows with the number of interested sockets, not of connected ones. An
+    event without a service (an organization-wide maintenance, say) reaches
+    every topic of its organization.
+
+    A broadcast encodes the message once and puts the same string on every
+    subscriber's queue without awaiting, so its cost does not depend on how
+    fast clients read. Each connection's writer task sends at the client's
+    own pace; a client whose queue overflows is closed with 1013 instead of
+    holding up the others or buffering without bound.
+    """
+
+    def __init__(self, max_queue: int = settings.WEBSOCKET_SEND_QUEUE_SIZE):
+        self.max_queue = max_queue
+        self.active_connections: Dict[str, Dict[WebSocket, Connection]] = {
+            "status": {},
+            "incidents": {},
         }
+        self.topics: Dict[Topic, Dict[WebSocket, Connection]] = {}
+        self._organization_topics: Dict[Tuple[str, int], Set[Topic]] = {}
+        self.dropped_slow_consumers = 0
+        self._idle_listeners: List[Callable[[int], None]] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
 
     async def connect(self, websocket: WebSocket, client_type: str):
         await websocket.accept()
-        self.active_connections[client_type].add(websocket)
+        self._loop = asyncio.get_running_loop()
+        connection = Connection(websocket, self.max_queue)
+        connection.writer = asyncio.create_task(self._run_writer(connection, client_type))
+        self.active_connections[client_type][websocket] = connection
 
     def disconnect(self, websocket: WebSocket, client_type: str):
-        self.active_connections[client_type].remove(websocket)
-
-    async def broadcast_status_update(self, message: dict):
-        for connection in self.active_connections["status"]:
-            try:
-                await connection.send_json(message)
-            except:
-                await self.disconnect(connection, "status")
-
-    async def broadcast_incident_update(self, message: dict):
-        for connection in self.active_connections["incidents"]:
-            try:
-                await connection.send_json(message)
-            except:
-                await self.disconnect(connection, "incidents")
-
-manager = ConnectionManager() 
\ No newline at end of file
+        """Forget a connection and its subscriptions and stop its writer. Safe to call more than once."""
+        connection = self.active_connections[client_type].pop(websocket, None)
+        if connection is None:
+            return
+        for topic in list(connection.topics):
+            self.unsubscribe(websocket, topic)
+        if connection.writer is not asyncio.current_task():
+            connection.writer.cancel()
+
+    def subscribe(self, websocket: WebSocket, topic: Topic) -> None:
+        connection = self.active_connections[topic[0]].get(websocket)
+        if connection is None:
+            return
+        self.topics.setdefault(topic, {})[websocket] = connection
+        self._organization_topics.setdefault(topic[:2], set()).add(topic)
+        connection.topics.add(topic)
+
+    def unsubscribe(self, websocket: WebSocket, topic: Topic) -> None:
+        subscribers = self.topics.get(topic)
+        if subscribers is None:
+            return
+        connection = subscribers.pop(websocket, None)
+        if connection is not None:
+            connection.topics.discard(topic)
+        if not subscribers:
+            del self.topics[topic]
+            organization_topics = self._organization_topics[topic[:2]]
+            organization_topics.discard(topic)
+            if not organization_topics:
+                del self._organization_topics[topic[:2]]
+                if not self.has_organization_subscribers(topic[1]):
+                    for listener in self._idle_listeners:
+                        listener(topic[1])
+
+    def add_idle_listener(self, listener: Callable[[int], None]) -> None:
+        """Call listener(organization_id) when an organization loses its last subscriber."""
+        self._idle_listeners.append(listener)
+
+    def send(self, websocket: WebSocket, client_type: str, message: Any) -> None:
+        """Queue a message for one client, e.g. a reply to its request."""
+        self.send_encoded(websocket, client_type, encode(message))
+
+    def send_encoded(self, websocket: WebSocket, client_type: str, data: str) -> None:
+        connection = self.active_connections[client_type].get(websocket)
+        if connection is not None and not connection.offer(data):
+            self._drop([connection], client_type)
+
+    async def _run_writer(self, connection: Connection, client_type: str) -> None:
+        try:
+            await connection.write()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # The client went away; its receive loop sees the disconnect too
+            self.disconnect(connection.websocket, client_type)
+
+    async def _close(self, websocket: WebSocket, code: int) -> None:
+        try:
+            await websocket.close(code=code)
+        except Exception:
+            pass
+
+    def _drop(self, connections: List[Connection], client_type: str) -> None:
+        for connection in connections:
+            self.disconnect(connection.websocket, client_type)
+            asyncio.ensure_future(self._close(connection.websocket, SLOW_CONSUMER_CLOSE_CODE))
+        self.dropped_slow_consumers += len(connections)
+        logger.warning("Dropped %d slow %s subscribers", len(connections), client_type)
+
+    def _subscribers(self, client_type: str, organization_id: int, service_id: Optional[int]) -> Dict[WebSocket, Connection]:
+        if service_id is None:
+            topics = self._organization_topics.get((client_type, organization_id), ())
+        else:
+            topics = ((client_type, organization_id, None), (client_type, organization_id, service_id))
+        groups = [self.topics[topic] for topic in topics if topic in self.topics]
+        if len(groups) == 1:
+            return groups[0]
+        # A client on several matching topics still gets the message once
+        subscribers: Dict[WebSocket, Connection] = {}
+        for group in groups:
+            subscribers.update(group)
+        return subscribers
+
+    def has_subscribers(self, client_type: str, organization_id: int, service_id: Optional[int] = None) -> bool:
+        if service_id is None:
+            return (client_type, organization_id) in self._organization_topics
+        return (
+            (client_type, organization_id, None) in self.topics
+            or (client_type, organization_id, service_id) in self.topics
+        )
+
+    def has_organization_subscribers(self, organization_id: int) -> bool:
+        return any((client_type, organization_id) in self._organization_topics for client_type in self.active_connections)
+
+    def fan_out(self, client_type: str, organization_id: int, service_id: Optional[int], data: str) -> int:
+        """Queue encoded data for every interested subscriber; returns how many got it."""
+        subscribers = self._subscribers(client_type, organization_id, service_id)
+        count = len(subscribers)
+        slow = [connection for connection in subscribers.values() if not connection.offer(data)]
+        if slow:
+            self._drop(slow, client_type)
+        return count - len(slow)
+
+    async def broadcast(
+        self, client_type: str, message: Any, organization_id: int, service_id: Optional[int] = None
+    ) -> int:
+        """Send to this process's subscribers only; writes go through the event bus to reach every worker."""
+        return self.fan_out(client_type, organization_id, service_id, encode(message))
+
+manager = ConnectionManager()
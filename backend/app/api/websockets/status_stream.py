@@ -0,0 +1,97 @@
+import asyncio
+import secrets
+from collections import deque
+from itertools import islice
+from typing import AsyncIterator, Awaitable, Callable, Deque, Optional, Tuple
+
+from app.api.websockets.bus import EventBus, event_bus
+from app.core.config import settings
+from app.monitoring.status_snapshot import Snapshot
+
+
+def _frame(event_id: str, event: str, data: bytes) -> bytes:
+    return b"id: %s\nevent: %s\ndata: %s\n\n" % (event_id.encode(), event.encode(), data)
+
+
+class StatusStream:
+    """
+    Server-Sent Events for the public status page.
+
+    Change events from the event bus are framed once and kept in a bounded
+    log. Event ids are "<process epoch>-<position>": a client reconnecting
+    with a Last-Event-ID from this process that is still in the log gets
+    only the events it missed; anything else (another worker, a restart, a
+    gap older than the log) starts over with a snapshot. Idle clients all
+    wait on one shared future, so they cost nothing per event until one
+    arrives, plus a keepalive comment now and then for proxies.
+    """
+
+    def __init__(self, bus: EventBus, capacity: int, keepalive_seconds: float):
+        self.bus = bus
+        self.epoch = secrets.token_hex(4)
+        self.keepalive_seconds = keepalive_seconds
+        self._log: Deque[Tuple[int, bytes]] = deque(maxlen=capacity)
+        self._last_position = 0
+        self._changed: Optional[asyncio.Future] = None
+        self._attached = False
+
+    def _event_id(self, position: int) -> str:
+        return f"{self.epoch}-{position}"
+
+    def _append(self, client_type: str, organization_id: int, service_id: Optional[int], data: str) -> None:
+        self._last_position += 1
+        self._log.append((self._last_position, _frame(self._event_id(self._last_position), "change", data.encode())))
+        changed, self._changed = self._changed, None
+        if changed is not None and not changed.done():
+            changed.set_result(None)
+
+    def _oldest_position(self) -> int:
+        return self._log[0][0] if self._log else self._last_position + 1
+
+    def resume_position(self, last_event_id: Optional[str]) -> Optional[int]:
+        """The log position to continue after, or None if the client needs a snapshot."""
+        epoch, _, position = (last_event_id or "").partition("-")
+        if epoch != self.epoch or not position.isdigit():
+            return None
+        position = int(position)
+        if position > self._last_position or position < self._oldest_position() - 1:
+            return None
+        return position
+
+    async def stream(
+        self, last_event_id: Optional[str], load_snapshot: Callable[[], Awaitable[Snapshot]]
+    ) -> AsyncIterator[bytes]:
+        if not self._attached:
+            # Only processes that serve the stream pay for loading every event
+            self.bus.add_sink(self._append)
+            self._attached = True
+
+        position = self.resume_position(last_event_id)
+        if position is None:
+            # Events after this point follow the snapshot; a change already
+            # in it arrives once more as the full, idempotent row
+            position = self._last_position
+            snapshot = await load_snapshot()
+            yield _frame(self._event_id(position), "snapshot", snapshot.body)
+
+        loop = asyncio.get_running_loop()
+        while True:
+            if position < self._last_position:
+                oldest = self._oldest_position()
+                if position < oldest - 1:
+                    # Fell further behind than the log reaches; reconnecting gets a snapshot
+                    return
+                frames = [frame for _, frame in islice(self._log, position - oldest + 1, None)]
+                position = self._last_position
+                yield b"".join(frames)
+                continue
+
+            if self._changed is None:
+                self._changed = loop.create_future()
+            try:
+                await asyncio.wait_for(asyncio.shield(self._changed), self.keepalive_seconds)
+            except asyncio.TimeoutError:
+                yield b": keepalive\n\n"
+
+
+status_stream = StatusStream(event_bus, settings.STATUS_STREAM_LOG_SIZE, settings.STATUS_STREAM_KEEPALIVE_SECONDS)
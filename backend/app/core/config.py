@@ -19,6 +19,58 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     
+    # Metric ingestion
+    METRIC_STREAM_CHUNK_SIZE: int = 1000  # rows per INSERT while draining an NDJSON stream
+    METRIC_STREAM_MAX_LINE_BYTES: int = 65536
+    METRIC_STREAM_MAX_ERRORS: int = 100  # per-line errors echoed back to the agent
+    METRIC_WRITE_BEHIND_ENABLED: bool = True  # group-commit single metrics instead of committing each one
+    METRIC_BUFFER_MAX_BATCH_ROWS: int = 5000
+    METRIC_BUFFER_MAX_DELAY_MS: int = 200
+    METRIC_BUFFER_MAX_PENDING_ROWS: int = 200000
+    METRIC_PARTITION_INTERVAL: str = "day"  # "day" or "week"
+    METRIC_PARTITION_PRECREATE_DAYS: int = 7
+    METRIC_RETENTION_DAYS: int = 90  # used when no organization defines a retention
+    ROLLUP_BATCH_ROWS: int = 50000  # raw ids folded into the rollups per transaction
+    ROLLUP_ID_OVERLAP: int = 10000  # ids below the watermark re-read to catch late commits
+    ROLLUP_MINUTE_RETENTION_DAYS: int = 14  # older minute buckets are pruned; hour and day buckets are kept
+    ROLLUP_MAX_OVERSAMPLE: int = 8  # graphs read at most this many buckets per returned point
+    REPORT_LOOKBACK_DAYS: int = 2  # closed days regenerated on every report run
+    OUTAGE_FAILURE_THRESHOLD: int = 2  # consecutive failed samples before a run counts as an outage
+    
+    # Background jobs run by the API process (rollups, outages, reports, partitions)
+    BACKGROUND_JOBS_ENABLED: bool = True  # turn off when the jobs run from cron or a separate process
+    ROLLUP_INTERVAL_SECONDS: float = 30.0
+    OUTAGE_INTERVAL_SECONDS: float = 30.0
+    REPORT_INTERVAL_SECONDS: float = 3600.0
+    PARTITION_MAINTENANCE_INTERVAL_SECONDS: float = 3600.0
+    
+    # Built-in probes
+    PROBES_ENABLED: bool = False
+    PROBE_MAX_CONCURRENCY: int = 1000
+    PROBE_PER_HOST_CONCURRENCY: int = 10
+    PROBE_REFRESH_SECONDS: int = 30  # how often check configuration and shard ownership are reloaded
+    PROBE_TICK_SECONDS: float = 1.0
+    PROBE_JITTER_FRACTION: float = 0.1  # each run fires within +/-10% of the check interval
+    PROBE_SHARDING_ENABLED: bool = True
+    PROBE_LEASE_SECONDS: int = 90  # must be comfortably longer than PROBE_REFRESH_SECONDS
+    
+    # Public status page
+    STATUS_SNAPSHOT_MAX_AGE_SECONDS: int = 60  # rebuild even without local writes, for other processes and time windows
+    STATUS_SNAPSHOT_RETRY_SECONDS: float = 1.0  # first backoff after a failed rebuild, doubling up to the max age
+    PUBLIC_CACHE_MAX_AGE_SECONDS: int = 10
+    PUBLIC_CACHE_STALE_WHILE_REVALIDATE_SECONDS: int = 60
+    STATUS_EXPORT_DIR: str = "public-status"  # static pages for CDN hosting, one directory per organization slug
+    STATUS_EXPORT_WORKERS: int = 4
+    
+    # Realtime
+    WEBSOCKET_SEND_QUEUE_SIZE: int = 64  # messages a client may fall behind before it is disconnected
+    REALTIME_CHANNEL: str = "statio_events"  # Postgres NOTIFY channel shared by every worker
+    REALTIME_LOAD_BATCH_SIZE: int = 500  # events whose rows are loaded together
+    REALTIME_RECONNECT_SECONDS: float = 5.0
+    REALTIME_DELTA_BUFFER_SIZE: int = 256  # recent deltas kept per organization for resuming clients
+    STATUS_STREAM_LOG_SIZE: int = 1000  # change events kept for Last-Event-ID resume
+    STATUS_STREAM_KEEPALIVE_SECONDS: float = 15.0
+    
     class Config:
         case_sensitive = True
         env_file = ".env"
@@ -6,6 +6,9 @@ from app.models.service import ServiceModel
 from app.models.incident import IncidentModel, IncidentUpdateModel 
 from app.models.maintenance import MaintenanceModel
 from app.models.password_reset import PasswordResetToken
-from app.models.organization import OrganizationModel
-# Temporarily comment out uptime imports to fix circular import
-# from app.models.uptime import UptimeMetric, UptimeReport
+from app.models.organization import OrganizationModel, OrganizationEventSequence
+from app.models.probe import ProbeWorkerModel, ProbeAssignmentModel
+from app.models.uptime import (
+    UptimeMetric, UptimeReport, UptimeRollupMinute, UptimeRollupHour, UptimeRollupDay, UptimeRollupState,
+    OutageInterval, OutageTracker
+)
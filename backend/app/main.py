@@ -1,12 +1,36 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
 from app.api.v1 import api_router
+from app.api.websockets import router as websocket_router
+from app.api.websockets.bus import event_bus
+from app.monitoring.buffer import metric_buffer
+from app.monitoring.jobs import job_scheduler
+from app.monitoring.probes import probe_runner
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.METRIC_WRITE_BEHIND_ENABLED:
+        metric_buffer.start()
+    if settings.PROBES_ENABLED:
+        probe_runner.start()
+    if settings.BACKGROUND_JOBS_ENABLED:
+        job_scheduler.start()
+    event_bus.start()
+    yield
+    await event_bus.stop()
+    await job_scheduler.stop()
+    await probe_runner.stop()
+    # Flush acknowledged metrics before the process exits
+    await run_in_threadpool(metric_buffer.stop)
 
 app = FastAPI(
     title="Statio API",
     description="API for Statio - Service Status Monitoring",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # Configure CORS
@@ -19,6 +43,7 @@ app.add_middleware(
 )
 
 app.include_router(api_router, prefix="/api/v1")
+app.include_router(websocket_router)
 
 @app.get("/")
 async def root():
@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, Integer, String, DateTime, Enum, ForeignKey, Text
+from sqlalchemy import Boolean, Column, Integer, String, DateTime, Enum, ForeignKey, Index, Text
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 import enum
@@ -16,6 +16,10 @@ class IncidentType(str, enum.Enum):
 
 class IncidentModel(Base):
     __tablename__ = "incidents"
+    __table_args__ = (
+        Index("ix_incidents_service_id_created_at", "service_id", "created_at"),
+        Index("ix_incidents_organization_id_created_at", "organization_id", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, nullable=False)
@@ -35,6 +39,9 @@ class IncidentModel(Base):
 
 class IncidentUpdateModel(Base):
     __tablename__ = "incident_updates"
+    __table_args__ = (
+        Index("ix_incident_updates_incident_id_created_at", "incident_id", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     incident_id = Column(Integer, ForeignKey("incidents.id"))
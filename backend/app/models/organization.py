@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text
+from sqlalchemy import BigInteger, Column, ForeignKey, Integer, String, DateTime, Boolean, Text
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.db.base_class import Base
@@ -12,6 +12,7 @@ class OrganizationModel(Base):
     description = Column(Text, nullable=True)
     logo_url = Column(String, nullable=True)
     is_active = Column(Boolean, default=True)
+    metrics_retention_days = Column(Integer, nullable=False, default=90, server_default="90")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
@@ -21,3 +22,15 @@ class OrganizationModel(Base):
     incidents = relationship("IncidentModel", back_populates="organization")
     incident_updates = relationship("IncidentUpdateModel", back_populates="organization")
     maintenances = relationship("MaintenanceModel", back_populates="organization")
+
+class OrganizationEventSequence(Base):
+    """
+    Last realtime event sequence number of an organization, incremented in
+    the writing transaction. Also the version of the status page data: every
+    service, incident and maintenance write bumps it.
+    """
+    __tablename__ = "organization_event_sequences"
+
+    organization_id = Column(Integer, ForeignKey("organizations.id", ondelete="CASCADE"), primary_key=True)
+    last_sequence = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy.sql import func
+from app.db.base_class import Base
+
+class ProbeWorkerModel(Base):
+    """A live probe worker process. Rows whose heartbeat is older than the lease TTL are dead."""
+    __tablename__ = "probe_workers"
+
+    worker_id = Column(String, primary_key=True)
+    hostname = Column(String, nullable=False)
+    started_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    heartbeat_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
+
+class ProbeAssignmentModel(Base):
+    """Lease giving one worker the exclusive right to check a service until lease_expires_at."""
+    __tablename__ = "probe_assignments"
+
+    service_id = Column(Integer, ForeignKey("services.id", ondelete="CASCADE"), primary_key=True)
+    worker_id = Column(String, nullable=False, index=True)
+    lease_expires_at = Column(DateTime(timezone=True), nullable=False)
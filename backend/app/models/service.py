@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, Integer, String, DateTime, Enum, ForeignKey
+from sqlalchemy import Boolean, Column, Integer, String, DateTime, Enum, Float, ForeignKey
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 import enum
@@ -11,6 +11,15 @@ class ServiceStatus(str, enum.Enum):
     MAJOR_OUTAGE = "major_outage"
     MAINTENANCE = "maintenance"
 
+class CheckType(str, enum.Enum):
+    HTTP = "http"
+    TCP = "tcp"
+    TCP_IP = "tcp_ip"  # TCP connect to an IP literal, no DNS lookup
+
+class SloType(str, enum.Enum):
+    AVAILABILITY = "availability"  # good = sample reported up
+    LATENCY = "latency"  # good = sample up and within slo_latency_threshold_ms
+
 class ServiceModel(Base):
     __tablename__ = "services"
 
@@ -23,6 +32,17 @@ class ServiceModel(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    # Built-in probe configuration (no probe runs while check_type is NULL)
+    check_type = Column(Enum(CheckType), nullable=True)
+    check_target = Column(String, nullable=True)  # URL for http, host:port for tcp/tcp_ip
+    check_interval_seconds = Column(Integer, nullable=False, default=60, server_default="60")
+    check_timeout_seconds = Column(Float, nullable=False, default=10.0, server_default="10")
+
+    # Service level objective over a rolling 30 days (not tracked while slo_type is NULL)
+    slo_type = Column(Enum(SloType), nullable=True)
+    slo_target = Column(Float, nullable=True)  # percentage of good samples, e.g. 99.9
+    slo_latency_threshold_ms = Column(Float, nullable=True)
+
     # Relationships
     organization = relationship("OrganizationModel", back_populates="services")
     incidents = relationship("IncidentModel", back_populates="service")
@@ -1,14 +1,20 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Float, Text
+from sqlalchemy import BigInteger, Column, Integer, String, DateTime, Boolean, ForeignKey, Float, Index, LargeBinary, Text, UniqueConstraint, text
 from sqlalchemy.orm import relationship
 from app.db.base_class import Base
 from datetime import datetime
 
 class UptimeMetric(Base):
+    # Range-partitioned on timestamp (see alembic revision 4f6a1c9e2d80), so the
+    # partition key is part of the primary key.
     __tablename__ = "uptime_metrics"
+    __table_args__ = (
+        Index("ix_uptime_metrics_service_id_timestamp", "service_id", "timestamp"),
+        Index("ix_uptime_metrics_organization_id_timestamp", "organization_id", "timestamp"),
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
     service_id = Column(Integer, ForeignKey("services.id"), nullable=False)
-    timestamp = Column(DateTime, default=datetime.utcnow, nullable=False)
+    timestamp = Column(DateTime, primary_key=True, default=datetime.utcnow, nullable=False)
     status = Column(String(50), nullable=False)  # operational, degraded, partial_outage, outage
     response_time = Column(Float, nullable=True)  # in milliseconds
     is_up = Column(Boolean, nullable=False, default=True)
@@ -20,6 +26,9 @@ class UptimeMetric(Base):
 
 class UptimeReport(Base):
     __tablename__ = "uptime_reports"
+    __table_args__ = (
+        UniqueConstraint("service_id", "period_type", "start_date", name="uq_uptime_reports_service_period"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     service_id = Column(Integer, ForeignKey("services.id"), nullable=False)
@@ -35,10 +44,89 @@ class UptimeReport(Base):
     total_incidents = Column(Integer, nullable=False, default=0)
     avg_response_time = Column(Float, nullable=True)
     
+    # Raw totals so weekly and monthly reports can be merged exactly from daily ones
+    sample_count = Column(Integer, nullable=False, default=0, server_default="0")
+    up_count = Column(Integer, nullable=False, default=0, server_default="0")
+    response_time_count = Column(Integer, nullable=False, default=0, server_default="0")
+    response_time_sum = Column(Float, nullable=True)
+    
     # Additional metadata
     generated_at = Column(DateTime, default=datetime.utcnow)
     period_type = Column(String(20), nullable=False)  # daily, weekly, monthly
     
     # Relationships
     service = relationship("ServiceModel")
-    organization = relationship("OrganizationModel") 
\ No newline at end of file
+    organization = relationship("OrganizationModel") 
+
+class UptimeRollupMixin:
+    """Pre-aggregated uptime_metrics for one service over one time bucket."""
+    service_id = Column(Integer, ForeignKey("services.id", ondelete="CASCADE"), primary_key=True)
+    bucket_start = Column(DateTime, primary_key=True)
+    organization_id = Column(Integer, nullable=False)
+
+    sample_count = Column(Integer, nullable=False, default=0)
+    up_count = Column(Integer, nullable=False, default=0)
+    response_time_count = Column(Integer, nullable=False, default=0)  # samples with a response_time
+    response_time_sum = Column(Float, nullable=True)
+    response_time_min = Column(Float, nullable=True)
+    response_time_max = Column(Float, nullable=True)
+    response_time_sketch = Column(LargeBinary, nullable=True)  # encoded app.monitoring.sketch.LatencySketch
+
+    # Samples per reported status
+    operational_count = Column(Integer, nullable=False, default=0)
+    degraded_count = Column(Integer, nullable=False, default=0)
+    partial_outage_count = Column(Integer, nullable=False, default=0)
+    major_outage_count = Column(Integer, nullable=False, default=0)
+    maintenance_count = Column(Integer, nullable=False, default=0)
+
+    # Up samples within the service's slo_latency_threshold_ms at rollup time
+    latency_good_count = Column(Integer, nullable=False, default=0, server_default="0")
+
+class UptimeRollupMinute(UptimeRollupMixin, Base):
+    __tablename__ = "uptime_rollups_1m"
+
+class UptimeRollupHour(UptimeRollupMixin, Base):
+    __tablename__ = "uptime_rollups_1h"
+
+class UptimeRollupDay(UptimeRollupMixin, Base):
+    __tablename__ = "uptime_rollups_1d"
+
+class UptimeRollupState(Base):
+    """Progress marker of the incremental rollup job: the highest uptime_metrics.id aggregated so far."""
+    __tablename__ = "uptime_rollup_state"
+
+    name = Column(String(50), primary_key=True)
+    last_metric_id = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class OutageInterval(Base):
+    """
+    A run of at least OUTAGE_FAILURE_THRESHOLD consecutive failed samples.
+    started_at is the first failed sample and ended_at the first successful
+    one after it; ended_at is NULL while the outage is still open.
+    """
+    __tablename__ = "outage_intervals"
+    __table_args__ = (
+        Index("ix_outage_intervals_service_id_started_at", "service_id", "started_at"),
+        Index(
+            "uq_outage_intervals_open", "service_id", unique=True,
+            postgresql_where=text("ended_at IS NULL"),
+        ),
+    )
+
+    id = Column(Integer, primary_key=True)
+    service_id = Column(Integer, ForeignKey("services.id", ondelete="CASCADE"), nullable=False)
+    organization_id = Column(Integer, nullable=False)
+    started_at = Column(DateTime, nullable=False)
+    ended_at = Column(DateTime, nullable=True)
+    failure_count = Column(Integer, nullable=False)
+    last_failure_at = Column(DateTime, nullable=False)
+
+class OutageTracker(Base):
+    """Where the outage job is in a service's sample stream, including a failure run too short to count yet."""
+    __tablename__ = "outage_trackers"
+
+    service_id = Column(Integer, ForeignKey("services.id", ondelete="CASCADE"), primary_key=True)
+    last_sample_at = Column(DateTime, nullable=False)
+    failure_run_start = Column(DateTime, nullable=True)
+    failure_run_length = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,217 @@
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.exc import DataError, IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.uptime import UptimeMetric
+
+logger = logging.getLogger(__name__)
+
+
+class MetricWriteBuffer:
+    """
+    In-process write-behind buffer for uptime_metrics rows.
+
+    Rows are acknowledged as soon as they are queued and a background thread
+    writes them in group commits: one INSERT and one COMMIT per flush, where a
+    flush happens once max_batch_rows are pending or the oldest pending row
+    has waited max_delay_ms, whichever comes first. stop() drains everything
+    that is still queued, so shutdown does not lose acknowledged rows.
+
+    A batch that fails on the database side (lost connection, say) goes back
+    to the front of the queue and is retried with backoff. A batch the
+    database rejects for its data (a constraint or value error) is written in
+    halves until the offending rows are isolated; only those are dropped and
+    counted in rows_rejected, so one bad row cannot hold up the rows behind it.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        max_batch_rows: int = 5000,
+        max_delay_ms: int = 200,
+        max_pending_rows: int = 200000,
+    ):
+        self.session_factory = session_factory
+        self.max_batch_rows = max_batch_rows
+        self.max_delay = max_delay_ms / 1000.0
+        self.max_pending_rows = max_pending_rows
+
+        self._pending: Deque[Dict[str, Any]] = deque()
+        self._oldest_at: Optional[float] = None
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+
+        self.rows_flushed = 0
+        self.rows_dropped = 0
+        self.rows_rejected = 0
+        self.flush_count = 0
+        self.failed_flushes = 0
+        self.last_flush_ms: Optional[float] = None
+        self.max_flush_ms = 0.0
+        self._total_flush_ms = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="metric-write-buffer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = 30.0) -> None:
+        """Stop the flusher thread after writing every queued row."""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def submit(self, rows: List[Dict[str, Any]]) -> bool:
+        """
+        Queue rows for the next group commit.
+        Returns False without queueing anything if the buffer is full or stopped,
+        so callers can shed load instead of growing memory without bound.
+        """
+        if not rows:
+            return True
+        with self._cond:
+            if self._stopping or len(self._pending) + len(rows) > self.max_pending_rows:
+                return False
+            if not self._pending:
+                self._oldest_at = time.monotonic()
+            self._pending.extend(rows)
+            if len(self._pending) >= self.max_batch_rows:
+                self._cond.notify()
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            queue_depth = len(self._pending)
+        return {
+            "running": self.running,
+            "queue_depth": queue_depth,
+            "max_pending_rows": self.max_pending_rows,
+            "rows_flushed": self.rows_flushed,
+            "rows_dropped": self.rows_dropped,
+            "rows_rejected": self.rows_rejected,
+            "flush_count": self.flush_count,
+            "failed_flushes": self.failed_flushes,
+            "last_flush_ms": self.last_flush_ms,
+            "avg_flush_ms": self._total_flush_ms / self.flush_count if self.flush_count else None,
+            "max_flush_ms": self.max_flush_ms,
+        }
+
+    def _take_batch(self) -> List[Dict[str, Any]]:
+        """Wait until a flush is due and pop up to max_batch_rows. Called without the lock held."""
+        with self._cond:
+            while True:
+                if self._pending:
+                    waited = time.monotonic() - (self._oldest_at or 0.0)
+                    if self._stopping or len(self._pending) >= self.max_batch_rows or waited >= self.max_delay:
+                        break
+                    self._cond.wait(self.max_delay - waited)
+                elif self._stopping:
+                    return []
+                else:
+                    self._cond.wait()
+
+            count = min(len(self._pending), self.max_batch_rows)
+            batch = [self._pending.popleft() for _ in range(count)]
+            self._oldest_at = time.monotonic() if self._pending else None
+            return batch
+
+    def _write(self, batch: List[Dict[str, Any]]) -> None:
+        started = time.perf_counter()
+        db = self.session_factory()
+        try:
+            db.execute(insert(UptimeMetric), batch)
+            db.commit()
+        finally:
+            db.close()
+        elapsed_ms = (time.perf_counter() - started) * 1000.0
+
+        self.flush_count += 1
+        self.rows_flushed += len(batch)
+        self.last_flush_ms = elapsed_ms
+        self.max_flush_ms = max(self.max_flush_ms, elapsed_ms)
+        self._total_flush_ms += elapsed_ms
+
+    def _write_isolating(self, batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Write a batch the database rejected in ever smaller parts, dropping
+        the single rows it still rejects. Returns the rows left unwritten when
+        some other error stops it, for the caller to retry.
+        """
+        parts = [batch]
+        while parts:
+            part = parts.pop()
+            try:
+                self._write(part)
+            except (IntegrityError, DataError) as exc:
+                if len(part) == 1:
+                    self.rows_rejected += 1
+                    logger.warning("Dropping uptime metric the database rejected: %s", exc.orig)
+                    continue
+                middle = len(part) // 2
+                parts.extend((part[middle:], part[:middle]))
+            except Exception:
+                logger.exception("Failed to flush %d uptime metrics", len(part))
+                return [row for unwritten in [part, *reversed(parts)] for row in unwritten]
+        return []
+
+    def _requeue(self, batch: List[Dict[str, Any]]) -> None:
+        """Put a failed batch back at the front of the queue, dropping what no longer fits."""
+        with self._cond:
+            room = max(0, self.max_pending_rows - len(self._pending))
+            kept = batch[:room]
+            self.rows_dropped += len(batch) - len(kept)
+            self._pending.extendleft(reversed(kept))
+            if self._pending and self._oldest_at is None:
+                self._oldest_at = time.monotonic()
+
+    def _run(self) -> None:
+        consecutive_failures = 0
+        while True:
+            batch = self._take_batch()
+            if not batch:
+                return
+            try:
+                self._write(batch)
+                unwritten = []
+            except (IntegrityError, DataError):
+                logger.warning("The database rejected a batch of %d uptime metrics, isolating the bad rows", len(batch))
+                unwritten = self._write_isolating(batch)
+            except Exception:
+                logger.exception("Failed to flush %d uptime metrics", len(batch))
+                unwritten = batch
+            if not unwritten:
+                consecutive_failures = 0
+                continue
+
+            self.failed_flushes += 1
+            consecutive_failures += 1
+            if self._stopping:
+                self.rows_dropped += len(unwritten)
+                continue
+            self._requeue(unwritten)
+            time.sleep(min(5.0, 0.1 * 2 ** consecutive_failures))
+
+
+metric_buffer = MetricWriteBuffer(
+    max_batch_rows=settings.METRIC_BUFFER_MAX_BATCH_ROWS,
+    max_delay_ms=settings.METRIC_BUFFER_MAX_DELAY_MS,
+    max_pending_rows=settings.METRIC_BUFFER_MAX_PENDING_ROWS,
+)
@@ -0,0 +1,73 @@
+from typing import Sequence
+
+import numpy as np
+
+
+def _normalize(y: np.ndarray) -> np.ndarray:
+    """
+    Scale every column to [0, 1] so series with different units weigh the
+    same in the triangle areas. Missing values (NaN) take the column
+    midpoint and therefore never look like spikes themselves.
+    """
+    y = np.array(y, dtype=float, copy=True)
+    if y.ndim == 1:
+        y = y[:, None]
+    for column in range(y.shape[1]):
+        values = y[:, column]
+        present = ~np.isnan(values)
+        if not present.any():
+            values[:] = 0.0
+            continue
+        low, high = values[present].min(), values[present].max()
+        span = high - low
+        values[~present] = (low + high) / 2
+        values[:] = (values - low) / span if span > 0 else 0.0
+    return y
+
+
+def lttb_indices(x: Sequence[float], y: Sequence, threshold: int) -> np.ndarray:
+    """
+    Indices of the points kept by Largest-Triangle-Three-Buckets.
+
+    `y` is one series or a (points, series) array; with several series the
+    area is summed over the normalized series, so a spike in any of them
+    (an outage in uptime, a latency peak) wins its bucket. The first and
+    last points are always kept and ties resolve to the earliest point,
+    so the result is deterministic.
+    """
+    x = np.asarray(x, dtype=float)
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    y = _normalize(np.asarray(y, dtype=float))
+    # Map x onto [0, 1] as well so time and value spans are comparable
+    x_span = x[-1] - x[0]
+    x = (x - x[0]) / x_span if x_span > 0 else np.zeros(n)
+
+    # Interior points split into threshold - 2 buckets of (almost) equal size
+    edges = np.floor(np.linspace(1, n - 1, threshold - 1)).astype(int)
+    selected = np.empty(threshold, dtype=int)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        # The third vertex is the average of the next bucket (or the last point)
+        if bucket + 2 < len(edges):
+            next_start, next_end = edges[bucket + 1], edges[bucket + 2]
+        else:
+            next_start, next_end = n - 1, n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean(axis=0)
+
+        # Twice the triangle area, vectorized over the bucket and summed over series
+        areas = np.abs(
+            (x[previous] - avg_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end, None]) * (avg_y - y[previous])
+        ).sum(axis=1)
+        previous = start + int(np.argmax(areas))
+        selected[bucket + 1] = previous
+
+    return selected
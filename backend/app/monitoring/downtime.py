@@ -0,0 +1,117 @@
+from calendar import timegm
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from app.models.incident import IncidentModel, IncidentType
+from app.models.maintenance import MaintenanceModel, MaintenanceStatus
+from app.models.service import ServiceModel
+from app.models.uptime import OutageInterval
+from app.monitoring.intervals import Interval, clip, coverage, subtract, total, union
+
+
+def epoch(value: datetime) -> float:
+    """Epoch seconds; naive datetimes are UTC, as everywhere in the uptime tables."""
+    if value.tzinfo is None:
+        return timegm(value.timetuple()) + value.microsecond / 1e6
+    return value.timestamp()
+
+
+def effective_downtime(
+    db: Session, services: Sequence[ServiceModel], start: datetime, end: datetime, now: Optional[datetime] = None
+) -> Dict[int, List[Interval]]:
+    """
+    Effective downtime per service within [start, end), as sorted, disjoint
+    epoch-second intervals: the union of outage intervals and incident spans
+    (created_at to resolved_at, or now while unresolved) minus maintenance
+    windows. A maintenance without a service covers its whole organization.
+    Three range queries regardless of the number of services.
+    """
+    now = now or datetime.utcnow()
+    service_ids = [service.id for service in services]
+    if not service_ids:
+        return {}
+    organization_ids = {service.organization_id for service in services if service.organization_id is not None}
+
+    down: Dict[int, List[Interval]] = {service_id: [] for service_id in service_ids}
+    outages = (
+        db.query(OutageInterval.service_id, OutageInterval.started_at, OutageInterval.ended_at)
+        .filter(
+            OutageInterval.service_id.in_(service_ids),
+            OutageInterval.started_at < end,
+            or_(OutageInterval.ended_at.is_(None), OutageInterval.ended_at > start),
+        )
+    )
+    for service_id, started_at, ended_at in outages:
+        down[service_id].append((epoch(started_at), epoch(ended_at or now)))
+
+    incidents = (
+        db.query(IncidentModel.service_id, IncidentModel.created_at, IncidentModel.resolved_at)
+        .filter(
+            IncidentModel.service_id.in_(service_ids),
+            or_(IncidentModel.type.is_(None), IncidentModel.type != IncidentType.MAINTENANCE),
+            IncidentModel.created_at < end,
+            or_(IncidentModel.resolved_at.is_(None), IncidentModel.resolved_at > start),
+        )
+    )
+    for service_id, created_at, resolved_at in incidents:
+        down[service_id].append((epoch(created_at), epoch(resolved_at or now)))
+
+    planned: Dict[int, List[Interval]] = {service_id: [] for service_id in service_ids}
+    organization_wide: Dict[int, List[Interval]] = {}
+    maintenances = (
+        db.query(
+            MaintenanceModel.service_id, MaintenanceModel.organization_id,
+            MaintenanceModel.scheduled_start, MaintenanceModel.scheduled_end,
+        )
+        .filter(
+            MaintenanceModel.is_active == True,
+            MaintenanceModel.status != MaintenanceStatus.CANCELLED,
+            MaintenanceModel.scheduled_start < end,
+            MaintenanceModel.scheduled_end > start,
+            or_(
+                MaintenanceModel.service_id.in_(service_ids),
+                MaintenanceModel.service_id.is_(None) & MaintenanceModel.organization_id.in_(organization_ids),
+            ),
+        )
+    )
+    for service_id, organization_id, scheduled_start, scheduled_end in maintenances:
+        window = (epoch(scheduled_start), epoch(scheduled_end))
+        if service_id is None:
+            organization_wide.setdefault(organization_id, []).append(window)
+        elif service_id in planned:
+            planned[service_id].append(window)
+
+    start_s, end_s = epoch(start), epoch(end)
+    result = {}
+    for service in services:
+        excluded = union(planned[service.id] + organization_wide.get(service.organization_id, []))
+        result[service.id] = clip(subtract(union(down[service.id]), excluded), start_s, end_s)
+    return result
+
+
+def uptime_between(downtime: List[Interval], start: datetime, end: datetime) -> float:
+    """Percentage of [start, end) not covered by effective downtime."""
+    start_s, end_s = epoch(start), epoch(end)
+    if end_s <= start_s:
+        return 100.0
+    return 100.0 * (1.0 - total(clip(downtime, start_s, end_s)) / (end_s - start_s))
+
+
+def bucket_uptime(downtime: List[Interval], bucket_starts: Sequence[datetime], width: float, now: datetime) -> np.ndarray:
+    """
+    Uptime percentage of each bucket of `width` seconds, counting only the
+    part of a bucket that has already elapsed. All buckets in one pass.
+    """
+    starts = np.array([epoch(bucket_start) for bucket_start in bucket_starts], dtype=float)
+    if not len(starts):
+        return starts
+    edges = np.minimum(np.append(starts, starts[-1] + width), epoch(now))
+    edges = np.maximum.accumulate(edges)
+    elapsed = np.diff(edges)
+    down = coverage(downtime, edges)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(elapsed > 0, 100.0 * (1.0 - down / elapsed), 100.0)
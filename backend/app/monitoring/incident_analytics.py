@@ -0,0 +1,95 @@
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+# Incidents in range with their time to resolve and time to first update, in
+# seconds. The first update comes from the (incident_id, created_at) index,
+# one index probe per incident.
+_SCOPED_INCIDENTS = """
+    WITH scoped AS (
+        SELECT
+            i.organization_id,
+            i.service_id,
+            i.created_at,
+            extract(epoch FROM i.resolved_at - i.created_at) AS ttr,
+            extract(epoch FROM first_update.created_at - i.created_at) AS tta
+        FROM incidents i
+        LEFT JOIN LATERAL (
+            SELECT u.created_at
+            FROM incident_updates u
+            WHERE u.incident_id = i.id
+            ORDER BY u.created_at
+            LIMIT 1
+        ) first_update ON true
+        WHERE i.created_at >= :start AND i.created_at < :end
+          AND i.type IS DISTINCT FROM 'MAINTENANCE'
+          AND i.organization_id IS NOT NULL
+          AND (CAST(:organization_id AS integer) IS NULL OR i.organization_id = :organization_id)
+          AND (CAST(:service_id AS integer) IS NULL OR i.service_id = :service_id)
+    )
+"""
+
+_TIMING_COLUMNS = """
+    count(*) AS incident_count,
+    count(ttr) AS resolved_count,
+    avg(ttr) AS mttr_seconds,
+    percentile_cont(0.5) WITHIN GROUP (ORDER BY ttr) AS ttr_p50_seconds,
+    percentile_cont(0.9) WITHIN GROUP (ORDER BY ttr) AS ttr_p90_seconds,
+    avg(tta) AS mtta_seconds,
+    percentile_cont(0.5) WITHIN GROUP (ORDER BY tta) AS tta_p50_seconds,
+    percentile_cont(0.9) WITHIN GROUP (ORDER BY tta) AS tta_p90_seconds
+"""
+
+# Per service and per organization totals in a single pass via GROUPING SETS.
+# is_total tells the organization rows apart: service_id is NULL there, but
+# also in the per-service row of incidents without a service.
+_SUMMARY = _SCOPED_INCIDENTS + f"""
+    SELECT organization_id, service_id, GROUPING(service_id) = 1 AS is_total, {_TIMING_COLUMNS}
+    FROM scoped
+    GROUP BY GROUPING SETS ((organization_id, service_id), (organization_id))
+    ORDER BY organization_id, GROUPING(service_id) DESC, service_id
+"""
+
+# Weekly buckets per organization, with a trailing four week MTTR/MTTA
+# weighted by incident count
+_WEEKLY_TRENDS = _SCOPED_INCIDENTS + f"""
+    , weekly AS (
+        SELECT organization_id, date_trunc('week', created_at) AS week_start, {_TIMING_COLUMNS},
+               sum(ttr) AS ttr_sum, sum(tta) AS tta_sum, count(tta) AS acknowledged_count
+        FROM scoped
+        GROUP BY organization_id, date_trunc('week', created_at)
+    )
+    SELECT
+        organization_id, week_start, incident_count, resolved_count,
+        mttr_seconds, ttr_p50_seconds, ttr_p90_seconds,
+        mtta_seconds, tta_p50_seconds, tta_p90_seconds,
+        sum(ttr_sum) OVER trailing / nullif(sum(resolved_count) OVER trailing, 0) AS mttr_4w_seconds,
+        sum(tta_sum) OVER trailing / nullif(sum(acknowledged_count) OVER trailing, 0) AS mtta_4w_seconds
+    FROM weekly
+    WINDOW trailing AS (PARTITION BY organization_id ORDER BY week_start RANGE BETWEEN interval '3 weeks' PRECEDING AND CURRENT ROW)
+    ORDER BY organization_id, week_start
+"""
+
+
+def _params(start: datetime, end: datetime, organization_id: Optional[int], service_id: Optional[int]) -> dict:
+    return {"start": start, "end": end, "organization_id": organization_id, "service_id": service_id}
+
+
+def incident_summary(
+    db: Session, start: datetime, end: datetime, organization_id: Optional[int] = None, service_id: Optional[int] = None
+) -> List:
+    """
+    Count, MTTR and MTTA (mean, p50, p90) per service and per organization
+    for incidents created in range, each organization's total row first.
+    Without organization_id, every organization is included.
+    """
+    return db.execute(text(_SUMMARY), _params(start, end, organization_id, service_id)).all()
+
+
+def incident_weekly_trends(
+    db: Session, start: datetime, end: datetime, organization_id: Optional[int] = None, service_id: Optional[int] = None
+) -> List:
+    """The same figures per organization and ISO week, plus trailing four week MTTR and MTTA."""
+    return db.execute(text(_WEEKLY_TRENDS), _params(start, end, organization_id, service_id)).all()
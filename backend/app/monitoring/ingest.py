@@ -0,0 +1,164 @@
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.models.service import ServiceModel
+from app.models.uptime import UptimeMetric
+from app.models.user import UserModel
+
+
+def get_accessible_service_organizations(
+    db: Session, service_ids: Iterable[int], current_user: UserModel
+) -> Dict[int, Optional[int]]:
+    """
+    Resolve which of the given services the user may write metrics for.
+    Returns a mapping of service_id -> organization_id using a single query.
+    """
+    ids = set(service_ids)
+    if not ids:
+        return {}
+
+    query = db.query(ServiceModel.id, ServiceModel.organization_id).filter(ServiceModel.id.in_(ids))
+    if not current_user.is_superuser:
+        query = query.filter(ServiceModel.organization_id == current_user.organization_id)
+
+    return {service_id: organization_id for service_id, organization_id in query.all()}
+
+
+def build_metric_row(
+    service_id: int,
+    organization_id: int,
+    status: str,
+    response_time: Optional[float] = None,
+    is_up: bool = True,
+    timestamp: Optional[datetime] = None,
+) -> Dict[str, Any]:
+    """Build a plain row dict ready for a multi-row insert into uptime_metrics."""
+    return {
+        "service_id": service_id,
+        "organization_id": organization_id,
+        "status": status,
+        "response_time": response_time,
+        "is_up": is_up,
+        "timestamp": timestamp or datetime.utcnow(),
+    }
+
+
+def insert_metric_rows(db: Session, rows: List[Dict[str, Any]]) -> List[int]:
+    """
+    Write rows with one multi-row INSERT ... RETURNING id.
+    Ids are returned in the same order as the input rows. The caller commits.
+    """
+    if not rows:
+        return []
+
+    result = db.execute(
+        insert(UptimeMetric).returning(UptimeMetric.id, sort_by_parameter_order=True),
+        rows,
+    )
+    return list(result.scalars().all())
+
+
+async def iter_ndjson_lines(
+    chunks: AsyncIterator[bytes], max_line_bytes: int
+) -> AsyncIterator[Tuple[int, Optional[bytes]]]:
+    """
+    Split a byte stream into NDJSON lines as it arrives.
+    Yields (line_number, line) pairs, skipping blank lines. Lines longer than
+    max_line_bytes are discarded without being buffered and yielded as None,
+    so memory stays bounded regardless of what the client sends.
+    """
+    buffer = bytearray()
+    line_number = 0
+    oversized = False
+
+    async for chunk in chunks:
+        start = 0
+        while True:
+            newline = chunk.find(b"\n", start)
+            if newline == -1:
+                if not oversized:
+                    buffer += chunk[start:]
+                    if len(buffer) > max_line_bytes:
+                        buffer.clear()
+                        oversized = True
+                break
+
+            line_number += 1
+            if oversized:
+                oversized = False
+                yield line_number, None
+            else:
+                buffer += chunk[start:newline]
+                if len(buffer) > max_line_bytes:
+                    yield line_number, None
+                elif buffer.strip():
+                    yield line_number, bytes(buffer)
+            buffer.clear()
+            start = newline + 1
+
+    if oversized or buffer.strip():
+        line_number += 1
+        yield line_number, None if oversized else bytes(buffer)
+
+
+class MetricStreamWriter:
+    """
+    Writes NDJSON metric records to uptime_metrics in bounded chunks.
+    Service access is resolved lazily and cached for the lifetime of the stream,
+    so each service costs at most one lookup no matter how many samples it sends.
+    """
+
+    def __init__(self, db: Session, current_user: UserModel, max_errors: int):
+        self.db = db
+        self.current_user = current_user
+        self.max_errors = max_errors
+        self.accepted = 0
+        self.rejected = 0
+        self.errors: List[Dict[str, Any]] = []
+        self.errors_truncated = False
+        self._service_orgs: Dict[int, Optional[int]] = {}
+        self._denied: Set[int] = set()
+
+    def reject(self, line: int, error: str, service_id: Optional[int] = None) -> None:
+        self.rejected += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"line": line, "service_id": service_id, "error": error})
+        else:
+            self.errors_truncated = True
+
+    def write_chunk(self, items: List[Tuple[int, Any]]) -> None:
+        """Validate service access for a chunk of (line, item) pairs and insert it in one statement."""
+        unknown = {
+            item.service_id for _, item in items
+            if item.service_id not in self._service_orgs and item.service_id not in self._denied
+        }
+        if unknown:
+            resolved = get_accessible_service_organizations(self.db, unknown, self.current_user)
+            self._service_orgs.update(resolved)
+            self._denied.update(unknown - resolved.keys())
+
+        rows = []
+        for line, item in items:
+            if item.service_id in self._denied:
+                self.reject(line, "Service not found", item.service_id)
+                continue
+            organization_id = self._service_orgs[item.service_id]
+            if organization_id is None:
+                self.reject(line, "Service does not belong to an organization", item.service_id)
+                continue
+            rows.append(build_metric_row(
+                service_id=item.service_id,
+                organization_id=organization_id,
+                status=item.status,
+                response_time=item.response_time,
+                is_up=item.is_up,
+                timestamp=item.timestamp,
+            ))
+
+        if rows:
+            insert_metric_rows(self.db, rows)
+            self.db.commit()
+            self.accepted += len(rows)
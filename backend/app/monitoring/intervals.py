@@ -0,0 +1,69 @@
+from typing import Iterable, List, Tuple
+
+import numpy as np
+
+# Half-open [start, end) spans in epoch seconds
+Interval = Tuple[float, float]
+
+
+def union(intervals: Iterable[Interval]) -> List[Interval]:
+    """Sorted, disjoint union of possibly overlapping intervals. O(n log n)."""
+    merged: List[Interval] = []
+    for start, end in sorted(interval for interval in intervals if interval[1] > interval[0]):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def subtract(base: List[Interval], cut: List[Interval]) -> List[Interval]:
+    """Parts of `base` not covered by `cut`; both sorted and disjoint. Linear sweep."""
+    result: List[Interval] = []
+    j = 0
+    for start, end in base:
+        # Cuts ending before this interval can't affect it or any later one
+        while j < len(cut) and cut[j][1] <= start:
+            j += 1
+        k = j
+        while k < len(cut) and cut[k][0] < end:
+            if cut[k][0] > start:
+                result.append((start, cut[k][0]))
+            start = max(start, cut[k][1])
+            k += 1
+        if start < end:
+            result.append((start, end))
+    return result
+
+
+def clip(intervals: List[Interval], start: float, end: float) -> List[Interval]:
+    """Restrict sorted, disjoint intervals to [start, end)."""
+    return [(max(s, start), min(e, end)) for s, e in intervals if s < end and e > start]
+
+
+def total(intervals: List[Interval]) -> float:
+    return sum(end - start for start, end in intervals)
+
+
+def coverage(intervals: List[Interval], edges: np.ndarray) -> np.ndarray:
+    """
+    Covered time in each [edges[i], edges[i+1]) for sorted, disjoint
+    intervals, for any number of buckets at once: cumulative coverage at
+    every edge is found by binary search, so the cost is O((n + m) log n).
+    """
+    edges = np.asarray(edges, dtype=float)
+    if not intervals:
+        return np.zeros(max(len(edges) - 1, 0))
+    starts = np.array([start for start, _ in intervals])
+    ends = np.array([end for _, end in intervals])
+    covered_before = np.concatenate(([0.0], np.cumsum(ends - starts)))
+
+    # Intervals entirely before each edge, plus the part of the one it falls into
+    index = np.searchsorted(ends, edges, side="right")
+    partial = np.where(
+        index < len(intervals),
+        np.clip(edges - starts[np.minimum(index, len(intervals) - 1)], 0.0, None),
+        0.0,
+    )
+    return np.diff(covered_before[index] + partial)
@@ -0,0 +1,88 @@
+import asyncio
+import logging
+from typing import Any, Callable, List, NamedTuple, Optional
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.monitoring.outages import track_outages
+from app.monitoring.partitions import run_maintenance
+from app.monitoring.reports import generate_reports
+from app.monitoring.rollups import run_rollups
+
+logger = logging.getLogger(__name__)
+
+
+class Job(NamedTuple):
+    name: str
+    interval_seconds: float
+    run: Callable[[Session], Any]
+
+
+def _drain_rollups(db: Session) -> None:
+    while run_rollups(db) >= settings.ROLLUP_BATCH_ROWS:
+        pass
+
+
+def _drain_outages(db: Session) -> None:
+    while track_outages(db) >= settings.ROLLUP_BATCH_ROWS:
+        pass
+
+
+def default_jobs() -> List[Job]:
+    """The jobs every uptime figure depends on; each is also runnable on its own with python -m."""
+    return [
+        Job("partitions", settings.PARTITION_MAINTENANCE_INTERVAL_SECONDS, run_maintenance),
+        Job("rollups", settings.ROLLUP_INTERVAL_SECONDS, _drain_rollups),
+        Job("outages", settings.OUTAGE_INTERVAL_SECONDS, _drain_outages),
+        Job("reports", settings.REPORT_INTERVAL_SECONDS, generate_reports),
+    ]
+
+
+class JobScheduler:
+    """
+    Runs the maintenance jobs from the API process: partition upkeep and
+    retention, rollups, outage tracking and reports. Each job runs right
+    away at startup and then every interval, in the threadpool with its own
+    session; a failed run is logged and retried at the next interval.
+
+    Every API worker starts one. The jobs serialize on Postgres advisory
+    locks (reports are idempotent upserts), so extra workers skip or wait
+    instead of doing the work twice.
+    """
+
+    def __init__(self, jobs: Optional[List[Job]] = None):
+        self.jobs = jobs
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self) -> None:
+        if self._tasks:
+            return
+        for job in self.jobs if self.jobs is not None else default_jobs():
+            self._tasks.append(asyncio.create_task(self._loop(job)))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def _run(self, job: Job) -> None:
+        db = SessionLocal()
+        try:
+            job.run(db)
+        finally:
+            db.close()
+
+    async def _loop(self, job: Job) -> None:
+        while True:
+            try:
+                await run_in_threadpool(self._run, job)
+            except Exception:
+                logger.exception("Background job %s failed", job.name)
+            await asyncio.sleep(job.interval_seconds)
+
+
+job_scheduler = JobScheduler()
@@ -0,0 +1,234 @@
+import argparse
+import logging
+import time
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.uptime import OutageInterval, OutageTracker, UptimeRollupState
+
+logger = logging.getLogger(__name__)
+
+STATE_NAME = "outage_intervals"
+
+# Arbitrary constant so concurrent outage runs serialize on one advisory lock
+_OUTAGE_LOCK_ID = 0x5747_7076
+
+_NEW_SAMPLES = """
+    SELECT id, service_id, organization_id, "timestamp", is_up
+    FROM uptime_metrics
+    WHERE id > :from_id AND id <= :to_id
+    ORDER BY service_id, "timestamp", id
+"""
+
+# Downtime of each service clipped to [start, end); open outages last until now
+_OUTAGE_SUMMARY = """
+    SELECT
+        service_id,
+        count(*) AS outage_count,
+        sum(extract(epoch FROM least(coalesce(ended_at, :now), :end) - greatest(started_at, :start))) AS downtime_seconds,
+        max(extract(epoch FROM coalesce(ended_at, :now) - started_at)) AS longest_seconds
+    FROM outage_intervals
+    WHERE service_id = ANY(:service_ids)
+      AND started_at < :end
+      AND coalesce(ended_at, :now) > :start
+    GROUP BY service_id
+"""
+
+
+class OutageSummary(NamedTuple):
+    outage_count: int
+    downtime_seconds: float
+    longest_seconds: float
+
+
+NO_OUTAGES = OutageSummary(0, 0.0, 0.0)
+
+
+def run_length_encode(service_ids: np.ndarray, is_up: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Start and end (exclusive) positions of the runs of equal is_up within each
+    service, for samples sorted by service and time.
+    """
+    if not len(is_up):
+        return np.empty(0, dtype=int), np.empty(0, dtype=int)
+    boundaries = np.flatnonzero((np.diff(service_ids) != 0) | (np.diff(is_up.astype(np.int8)) != 0)) + 1
+    return np.concatenate(([0], boundaries)), np.concatenate((boundaries, [len(is_up)]))
+
+
+def apply_samples(db: Session, samples: Sequence, threshold: int, watermark: int = 0) -> int:
+    """
+    Extend the outage intervals with samples sorted by service and time.
+
+    Runs are handled whole: a failed run continues the service's pending
+    failure run or open outage, and an up run closes them. Samples at or
+    before a service's last processed sample are skipped, so re-reading
+    overlapping id ranges is harmless. Intervals only grow forward in time,
+    so samples that arrive late (backfills, delayed flushes) are skipped
+    too; returns how many of those there were among ids above watermark.
+    """
+    service_ids = list({sample.service_id for sample in samples})
+    trackers = {
+        tracker.service_id: tracker
+        for tracker in db.query(OutageTracker).filter(OutageTracker.service_id.in_(service_ids))
+    }
+    open_outages = {
+        outage.service_id: outage
+        for outage in db.query(OutageInterval).filter(
+            OutageInterval.service_id.in_(service_ids), OutageInterval.ended_at.is_(None)
+        )
+    }
+
+    late = 0
+    current = []
+    for sample in samples:
+        tracker = trackers.get(sample.service_id)
+        if tracker is None or sample.timestamp > tracker.last_sample_at:
+            current.append(sample)
+        elif sample.id > watermark:
+            late += 1
+    samples = current
+    starts, ends = run_length_encode(
+        np.fromiter((sample.service_id for sample in samples), dtype=np.int64, count=len(samples)),
+        np.fromiter((sample.is_up for sample in samples), dtype=bool, count=len(samples)),
+    )
+
+    for start, end in zip(starts.tolist(), ends.tolist()):
+        first, last = samples[start], samples[end - 1]
+        tracker = trackers.get(first.service_id)
+        if tracker is None:
+            tracker = OutageTracker(service_id=first.service_id, failure_run_length=0)
+            trackers[first.service_id] = tracker
+            db.add(tracker)
+
+        if first.is_up:
+            outage = open_outages.pop(first.service_id, None)
+            if outage is not None:
+                outage.ended_at = first.timestamp
+            tracker.failure_run_start = None
+            tracker.failure_run_length = 0
+        else:
+            if not tracker.failure_run_length:
+                tracker.failure_run_start = first.timestamp
+            tracker.failure_run_length += end - start
+            outage = open_outages.get(first.service_id)
+            if outage is not None:
+                outage.failure_count += end - start
+                outage.last_failure_at = last.timestamp
+            elif tracker.failure_run_length >= threshold:
+                outage = OutageInterval(
+                    service_id=first.service_id,
+                    organization_id=first.organization_id,
+                    started_at=tracker.failure_run_start,
+                    failure_count=tracker.failure_run_length,
+                    last_failure_at=last.timestamp,
+                )
+                open_outages[first.service_id] = outage
+                db.add(outage)
+        tracker.last_sample_at = last.timestamp
+    return late
+
+
+def track_outages(db: Session, batch_rows: Optional[int] = None, threshold: Optional[int] = None) -> int:
+    """
+    Fold every uptime_metrics row inserted since the last run into the outage
+    intervals. Returns the number of raw ids covered. Uses the same id
+    watermark and overlap as the rollup job.
+    """
+    batch_rows = batch_rows or settings.ROLLUP_BATCH_ROWS
+    threshold = threshold or settings.OUTAGE_FAILURE_THRESHOLD
+    if not db.execute(text("SELECT pg_try_advisory_xact_lock(:lock_id)"), {"lock_id": _OUTAGE_LOCK_ID}).scalar():
+        logger.info("Another outage run holds the lock, skipping")
+        return 0
+
+    state = db.get(UptimeRollupState, STATE_NAME)
+    watermark = state.last_metric_id if state else 0
+    max_id = db.execute(text("SELECT max(id) FROM uptime_metrics")).scalar() or 0
+    if max_id <= watermark:
+        db.commit()
+        return 0
+
+    from_id = max(0, watermark - settings.ROLLUP_ID_OVERLAP)
+    to_id = min(max_id, watermark + batch_rows)
+    samples = db.execute(text(_NEW_SAMPLES), {"from_id": from_id, "to_id": to_id}).all()
+    if samples:
+        late = apply_samples(db, samples, threshold, watermark)
+        if late:
+            logger.warning(
+                "Ignored %d uptime metrics older than their service's latest processed sample "
+                "(ids %d-%d); their downtime is not in the outage intervals", late, watermark + 1, to_id
+            )
+
+    if state is None:
+        state = UptimeRollupState(name=STATE_NAME)
+    state.last_metric_id = to_id
+    db.add(state)
+    db.commit()
+    return to_id - watermark
+
+
+def outages_in_range(db: Session, service_id: int, start: datetime, end: datetime) -> List[OutageInterval]:
+    """Outages of a service overlapping [start, end), oldest first."""
+    return (
+        db.query(OutageInterval)
+        .filter(
+            OutageInterval.service_id == service_id,
+            OutageInterval.started_at < end,
+            (OutageInterval.ended_at.is_(None)) | (OutageInterval.ended_at > start),
+        )
+        .order_by(OutageInterval.started_at)
+        .all()
+    )
+
+
+def outage_summary(
+    db: Session, service_ids: List[int], start: datetime, end: datetime, now: Optional[datetime] = None
+) -> Dict[int, OutageSummary]:
+    """Outage count, downtime within the range and longest outage per service, in one grouped query."""
+    if not service_ids:
+        return {}
+    rows = db.execute(text(_OUTAGE_SUMMARY), {
+        "service_ids": list(service_ids),
+        "start": start,
+        "end": end,
+        "now": now or datetime.utcnow(),
+    }).all()
+    return {
+        row.service_id: OutageSummary(row.outage_count, float(row.downtime_seconds or 0), float(row.longest_seconds or 0))
+        for row in rows
+    }
+
+
+def main() -> None:
+    """
+    Keep the outage intervals up to date, once or continuously:
+
+        python -m app.monitoring.outages --interval 30
+    """
+    parser = argparse.ArgumentParser(description="Maintain outage intervals")
+    parser.add_argument("--interval", type=float, default=0, help="seconds between runs; 0 runs once")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    while True:
+        db = SessionLocal()
+        try:
+            # Drain the backlog in batches before sleeping
+            while track_outages(db) >= settings.ROLLUP_BATCH_ROWS:
+                pass
+        except Exception:
+            logger.exception("Outage run failed")
+        finally:
+            db.close()
+        if not args.interval:
+            return
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
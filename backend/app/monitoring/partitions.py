@@ -0,0 +1,227 @@
+import argparse
+import logging
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import List, Optional, Tuple
+
+from sqlalchemy import func, text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.organization import OrganizationModel
+from app.monitoring.rollups import prune_minute_rollups
+
+logger = logging.getLogger(__name__)
+
+PARENT_TABLE = "uptime_metrics"
+DEFAULT_PARTITION = f"{PARENT_TABLE}_default"
+
+# Arbitrary constant so concurrent maintenance runs serialize on one advisory lock
+_MAINTENANCE_LOCK_ID = 0x5747_7074
+
+
+@dataclass(frozen=True)
+class Partition:
+    name: str
+    start: datetime
+    end: datetime
+
+
+def partition_bounds(day: date, interval: str = "day") -> Tuple[datetime, datetime]:
+    """Start (inclusive) and end (exclusive) of the partition holding `day`."""
+    if interval == "week":
+        start = day - timedelta(days=day.weekday())
+        length = timedelta(days=7)
+    elif interval == "day":
+        start = day
+        length = timedelta(days=1)
+    else:
+        raise ValueError(f"Unsupported partition interval {interval!r}")
+    start_dt = datetime(start.year, start.month, start.day)
+    return start_dt, start_dt + length
+
+
+def partition_for(day: date, interval: str = "day") -> Partition:
+    start, end = partition_bounds(day, interval)
+    return Partition(name=f"{PARENT_TABLE}_p{start:%Y%m%d}", start=start, end=end)
+
+
+def list_partitions(db: Session) -> List[Partition]:
+    """Existing range partitions of uptime_metrics, oldest first. The default partition is excluded."""
+    rows = db.execute(text("""
+        SELECT child.relname AS name,
+               pg_get_expr(child.relpartbound, child.oid) AS bound
+        FROM pg_inherits
+        JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE parent.relname = :parent
+    """), {"parent": PARENT_TABLE}).all()
+
+    partitions = []
+    for name, bound in rows:
+        # bound looks like: FOR VALUES FROM ('2026-10-18 00:00:00') TO ('2026-10-19 00:00:00')
+        if "FROM (" not in bound:
+            continue
+        start_literal = bound.split("FROM ('", 1)[1].split("')", 1)[0]
+        end_literal = bound.split("TO ('", 1)[1].split("')", 1)[0]
+        partitions.append(Partition(
+            name=name,
+            start=datetime.fromisoformat(start_literal),
+            end=datetime.fromisoformat(end_literal),
+        ))
+    return sorted(partitions, key=lambda p: p.start)
+
+
+def _range_sql(partition: Partition) -> str:
+    return f"FOR VALUES FROM ('{partition.start.isoformat(sep=' ')}') TO ('{partition.end.isoformat(sep=' ')}')"
+
+
+def create_partition(db: Session, partition: Partition) -> int:
+    """
+    Create one partition. Rows of its range already in the default partition
+    (written while maintenance was not running) would make a plain CREATE ...
+    PARTITION OF fail, so they are moved into the new table before it is
+    attached. Returns the number of rows moved.
+    """
+    params = {"start": partition.start, "end": partition.end}
+    stray = db.execute(
+        text(f'SELECT EXISTS (SELECT 1 FROM "{DEFAULT_PARTITION}" WHERE "timestamp" >= :start AND "timestamp" < :end)'),
+        params,
+    ).scalar()
+    if not stray:
+        db.execute(text(f'CREATE TABLE IF NOT EXISTS "{partition.name}" PARTITION OF "{PARENT_TABLE}" {_range_sql(partition)}'))
+        return 0
+
+    db.execute(text(
+        f'CREATE TABLE "{partition.name}" (LIKE "{PARENT_TABLE}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS)'
+    ))
+    moved = db.execute(
+        text(
+            f'WITH moved AS (DELETE FROM "{DEFAULT_PARTITION}" '
+            'WHERE "timestamp" >= :start AND "timestamp" < :end RETURNING *) '
+            f'INSERT INTO "{partition.name}" SELECT * FROM moved'
+        ),
+        params,
+    ).rowcount or 0
+    # Attaching builds the parent's indexes and foreign keys on the new table
+    db.execute(text(f'ALTER TABLE "{PARENT_TABLE}" ATTACH PARTITION "{partition.name}" {_range_sql(partition)}'))
+    return moved
+
+
+def ensure_partitions(db: Session, today: date, days_ahead: int, interval: str = "day") -> List[str]:
+    """
+    Create every missing partition from today through today + days_ahead, and
+    back to the oldest row left in the default partition after days without
+    maintenance. Each partition is created in its own savepoint, so one that
+    fails is logged and retried next run without undoing the others. Returns
+    the names created.
+    """
+    existing = {partition.name for partition in list_partitions(db)}
+    oldest_stray = db.execute(text(f'SELECT min("timestamp") FROM "{DEFAULT_PARTITION}"')).scalar()
+    day = min(today, oldest_stray.date()) if oldest_stray is not None else today
+    created = []
+    while day <= today + timedelta(days=days_ahead):
+        partition = partition_for(day, interval)
+        day = partition.end.date()
+        if partition.name in existing:
+            continue
+        try:
+            with db.begin_nested():
+                moved = create_partition(db, partition)
+        except Exception:
+            logger.exception("Could not create partition %s", partition.name)
+            continue
+        if moved:
+            logger.info("Moved %d rows from %s into %s", moved, DEFAULT_PARTITION, partition.name)
+        existing.add(partition.name)
+        created.append(partition.name)
+    return created
+
+
+def apply_retention(db: Session, today: date) -> Tuple[List[str], int]:
+    """
+    Enforce each organization's metrics_retention_days.
+
+    Partitions past the longest retention of any organization hold no data
+    anyone may keep, so they are detached and dropped without touching rows.
+    Organizations with a shorter retention only have their rows removed from
+    the few partitions between their cutoff and that global cutoff, using the
+    (organization_id, timestamp) index, so the work per run stays bounded.
+    Returns the dropped partition names and the number of rows deleted.
+    """
+    longest = db.query(func.max(OrganizationModel.metrics_retention_days)).scalar()
+    longest = longest or settings.METRIC_RETENTION_DAYS
+    global_cutoff = datetime(today.year, today.month, today.day) - timedelta(days=longest)
+
+    dropped = []
+    remaining = []
+    for partition in list_partitions(db):
+        if partition.end <= global_cutoff:
+            db.execute(text(f'ALTER TABLE "{PARENT_TABLE}" DETACH PARTITION "{partition.name}"'))
+            db.execute(text(f'DROP TABLE "{partition.name}"'))
+            dropped.append(partition.name)
+        else:
+            remaining.append(partition)
+
+    # Rows that landed in the default partition are not covered by a droppable range
+    deleted = db.execute(
+        text(f'DELETE FROM "{DEFAULT_PARTITION}" WHERE "timestamp" < :cutoff'),
+        {"cutoff": global_cutoff},
+    ).rowcount or 0
+
+    oldest = remaining[0].start if remaining else global_cutoff
+    organizations = (
+        db.query(OrganizationModel.id, OrganizationModel.metrics_retention_days)
+        .filter(OrganizationModel.metrics_retention_days < longest)
+        .all()
+    )
+    for organization_id, retention_days in organizations:
+        cutoff = datetime(today.year, today.month, today.day) - timedelta(days=retention_days)
+        if cutoff <= oldest:
+            continue
+        deleted += db.execute(
+            text(
+                f'DELETE FROM "{PARENT_TABLE}" '
+                'WHERE organization_id = :organization_id AND "timestamp" >= :start AND "timestamp" < :cutoff'
+            ),
+            {"organization_id": organization_id, "start": oldest, "cutoff": cutoff},
+        ).rowcount or 0
+
+    return dropped, deleted
+
+
+def run_maintenance(db: Session, today: Optional[date] = None) -> None:
+    """Pre-create upcoming partitions and enforce metric and minute rollup retention, serialized across processes."""
+    today = today or datetime.utcnow().date()
+    db.execute(text("SELECT pg_advisory_xact_lock(:lock_id)"), {"lock_id": _MAINTENANCE_LOCK_ID})
+    # Retention first: expired rows in the default partition need no partition of their own
+    dropped, deleted = apply_retention(db, today)
+    created = ensure_partitions(
+        db, today - timedelta(days=1), settings.METRIC_PARTITION_PRECREATE_DAYS, settings.METRIC_PARTITION_INTERVAL
+    )
+    pruned = prune_minute_rollups(db)
+    db.commit()
+    logger.info(
+        "Partition maintenance: created %d, dropped %d, deleted %d expired rows and %d minute rollups",
+        len(created), len(dropped), deleted, pruned,
+    )
+
+
+def main() -> None:
+    """
+    Run once from cron, e.g. hourly:
+
+        python -m app.monitoring.partitions
+    """
+    argparse.ArgumentParser(description="Maintain uptime_metrics partitions").parse_args()
+    logging.basicConfig(level=logging.INFO)
+    db = SessionLocal()
+    try:
+        run_maintenance(db)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,426 @@
+import argparse
+import asyncio
+import ipaddress
+import logging
+import multiprocessing
+import os
+import random
+import signal
+import socket
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.service import CheckType, ServiceModel, ServiceStatus
+from app.models.uptime import UptimeMetric
+from app.monitoring.buffer import metric_buffer
+from app.monitoring.ingest import build_metric_row
+from app.monitoring.scheduling import ShardCoordinator, TimerWheel, initial_offset
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ProbeConfig:
+    service_id: int
+    organization_id: int
+    check_type: CheckType
+    target: str
+    interval_seconds: int = 60
+    timeout_seconds: float = 10.0
+
+    @property
+    def host_key(self) -> str:
+        """Key used for per-host concurrency limits."""
+        if self.check_type == CheckType.HTTP:
+            return urlsplit(self.target).netloc.lower()
+        return self.target.rsplit(":", 1)[0].lower()
+
+
+@dataclass
+class ProbeResult:
+    service_id: int
+    organization_id: int
+    is_up: bool
+    response_time: Optional[float]  # milliseconds, None if the check never completed
+    timestamp: datetime
+    error: Optional[str] = None
+
+    @property
+    def status(self) -> str:
+        return ServiceStatus.OPERATIONAL.value if self.is_up else ServiceStatus.MAJOR_OUTAGE.value
+
+    def to_row(self) -> Dict:
+        return build_metric_row(
+            service_id=self.service_id,
+            organization_id=self.organization_id,
+            status=self.status,
+            response_time=self.response_time,
+            is_up=self.is_up,
+            timestamp=self.timestamp,
+        )
+
+
+def parse_host_port(target: str) -> Tuple[str, int]:
+    """Split "host:port" or "[v6]:port" into its parts."""
+    host, sep, port = target.rpartition(":")
+    if not sep or not host or not port.isdigit():
+        raise ValueError(f"Invalid host:port target {target!r}")
+    return host.strip("[]"), int(port)
+
+
+class ProbeEngine:
+    """
+    Runs HTTP and TCP checks concurrently on the running event loop.
+
+    A global semaphore caps in-flight checks for the whole process and a
+    per-host semaphore keeps one slow or rate-limited host from taking every
+    slot. HTTP checks share a single httpx.AsyncClient so keep-alive
+    connections are reused across rounds.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 1000,
+        per_host_concurrency: int = 10,
+        client: Optional[httpx.AsyncClient] = None,
+    ):
+        self.max_concurrency = max_concurrency
+        self.per_host_concurrency = per_host_concurrency
+        self._global = asyncio.Semaphore(max_concurrency)
+        self._per_host: Dict[str, asyncio.Semaphore] = {}
+        self._owns_client = client is None
+        self.client = client or httpx.AsyncClient(
+            follow_redirects=True,
+            limits=httpx.Limits(
+                max_connections=max_concurrency,
+                max_keepalive_connections=max_concurrency,
+            ),
+            headers={"User-Agent": f"{settings.PROJECT_NAME}-probe/1.0"},
+        )
+
+    async def aclose(self) -> None:
+        if self._owns_client:
+            await self.client.aclose()
+
+    def _host_semaphore(self, host: str) -> asyncio.Semaphore:
+        semaphore = self._per_host.get(host)
+        if semaphore is None:
+            semaphore = self._per_host[host] = asyncio.Semaphore(self.per_host_concurrency)
+        return semaphore
+
+    async def check(self, config: ProbeConfig) -> ProbeResult:
+        """Run one check. Never raises; failures are reported as down results."""
+        # Host first: probes queued behind a slow host must not hold global slots
+        async with self._host_semaphore(config.host_key), self._global:
+            timestamp = datetime.utcnow()
+            started = time.perf_counter()
+            try:
+                if config.check_type == CheckType.HTTP:
+                    is_up = await self._check_http(config)
+                elif config.check_type == CheckType.TCP:
+                    await self._check_tcp(config)
+                    is_up = True
+                else:
+                    await self._check_tcp_ip(config)
+                    is_up = True
+                error = None
+            except Exception as e:
+                is_up = False
+                error = str(e) or e.__class__.__name__
+            elapsed_ms = (time.perf_counter() - started) * 1000.0
+
+        return ProbeResult(
+            service_id=config.service_id,
+            organization_id=config.organization_id,
+            is_up=is_up,
+            response_time=elapsed_ms if error is None else None,
+            timestamp=timestamp,
+            error=error,
+        )
+
+    async def run(self, configs: List[ProbeConfig]) -> List[ProbeResult]:
+        return await asyncio.gather(*(self.check(config) for config in configs))
+
+    async def _check_http(self, config: ProbeConfig) -> bool:
+        response = await self.client.get(config.target, timeout=config.timeout_seconds)
+        return response.status_code < 400
+
+    async def _check_tcp(self, config: ProbeConfig) -> None:
+        host, port = parse_host_port(config.target)
+        _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), config.timeout_seconds)
+        writer.close()
+        await writer.wait_closed()
+
+    async def _check_tcp_ip(self, config: ProbeConfig) -> None:
+        """Connect straight to an IP literal, skipping the resolver entirely."""
+        host, port = parse_host_port(config.target)
+        address = ipaddress.ip_address(host)
+        family = socket.AF_INET6 if address.version == 6 else socket.AF_INET
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        sock.setblocking(False)
+        try:
+            loop = asyncio.get_running_loop()
+            await asyncio.wait_for(loop.sock_connect(sock, (str(address), port)), config.timeout_seconds)
+        finally:
+            sock.close()
+
+
+def load_probe_configs(db: Session) -> List[ProbeConfig]:
+    """Load the probe configuration of every active service that has a check defined."""
+    rows = (
+        db.query(
+            ServiceModel.id,
+            ServiceModel.organization_id,
+            ServiceModel.check_type,
+            ServiceModel.check_target,
+            ServiceModel.check_interval_seconds,
+            ServiceModel.check_timeout_seconds,
+        )
+        .filter(
+            ServiceModel.is_active == True,
+            ServiceModel.check_type.isnot(None),
+            ServiceModel.check_target.isnot(None),
+            ServiceModel.organization_id.isnot(None),
+        )
+        .all()
+    )
+    return [
+        ProbeConfig(
+            service_id=row.id,
+            organization_id=row.organization_id,
+            check_type=row.check_type,
+            target=row.check_target,
+            interval_seconds=row.check_interval_seconds,
+            timeout_seconds=row.check_timeout_seconds,
+        )
+        for row in rows
+    ]
+
+
+def write_probe_results(results: List[ProbeResult]) -> None:
+    """Hand results to the write-behind buffer, or insert them directly if it is not running."""
+    rows = [result.to_row() for result in results]
+    if not rows:
+        return
+    if metric_buffer.running and metric_buffer.submit(rows):
+        return
+    db = SessionLocal()
+    try:
+        db.execute(insert(UptimeMetric), rows)
+        db.commit()
+    finally:
+        db.close()
+
+
+class ProbeRunner:
+    """
+    Schedules every check this worker owns on a timer wheel and records results.
+
+    Configuration and shard ownership are refreshed every PROBE_REFRESH_SECONDS,
+    so new, edited or removed checks and workers joining or leaving take effect
+    without a restart. Each service first fires at a stable phase within its
+    interval and every later run is jittered by PROBE_JITTER_FRACTION, so checks
+    do not line up in bursts on the minute.
+
+    If syncing keeps failing until the leases taken at the last successful
+    sync run out, the runner drops its checks rather than keep probing
+    services a peer may already have taken over, and resumes on the next
+    successful sync.
+    """
+
+    def __init__(
+        self,
+        engine: Optional[ProbeEngine] = None,
+        coordinator: Optional[ShardCoordinator] = None,
+    ):
+        self.engine = engine
+        self.coordinator = coordinator
+        self.wheel = TimerWheel(tick_seconds=settings.PROBE_TICK_SECONDS)
+        self._configs: Dict[int, ProbeConfig] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._in_flight: Set[asyncio.Task] = set()
+        self._lease_deadline: Optional[float] = None  # monotonic time the current leases run out
+
+    def set_configs(self, configs: List[ProbeConfig]) -> None:
+        previous = self._configs
+        self._configs = {config.service_id: config for config in configs}
+        for service_id in previous.keys() - self._configs.keys():
+            self.wheel.cancel(service_id)
+        for service_id, config in self._configs.items():
+            old = previous.get(service_id)
+            if old is None or old.interval_seconds != config.interval_seconds:
+                self.wheel.schedule(service_id, initial_offset(service_id, config.interval_seconds))
+
+    def _load(self) -> List[ProbeConfig]:
+        db = SessionLocal()
+        try:
+            configs = load_probe_configs(db)
+            if self.coordinator is not None:
+                owned = self.coordinator.sync(db, [config.service_id for config in configs])
+                configs = [config for config in configs if config.service_id in owned]
+            return configs
+        finally:
+            db.close()
+
+    async def refresh(self) -> None:
+        started = time.monotonic()
+        self.set_configs(await run_in_threadpool(self._load))
+        if self.coordinator is not None:
+            # Leases run from the database's now(), which is no earlier than `started`
+            self._lease_deadline = started + self.coordinator.lease_seconds
+
+    def _drop_expired_leases(self) -> None:
+        if self._lease_deadline is None or time.monotonic() < self._lease_deadline:
+            return
+        logger.warning("Probe leases expired without a successful sync; pausing %d checks", len(self._configs))
+        self._lease_deadline = None
+        self.set_configs([])
+
+    def advance(self) -> List[ProbeConfig]:
+        """Advance the wheel one tick, reschedule what fired and return its configs."""
+        due = []
+        for service_id in self.wheel.advance():
+            config = self._configs.get(service_id)
+            if config is None:
+                continue
+            due.append(config)
+            jitter = random.uniform(-settings.PROBE_JITTER_FRACTION, settings.PROBE_JITTER_FRACTION)
+            self.wheel.schedule(service_id, config.interval_seconds * (1.0 + jitter))
+        return due
+
+    async def _run_round(self, configs: List[ProbeConfig]) -> None:
+        results = await self.engine.run(configs)
+        try:
+            await run_in_threadpool(write_probe_results, results)
+        except Exception:
+            logger.exception("Failed to record %d probe results", len(results))
+
+    async def _loop(self) -> None:
+        tick = self.wheel.tick_seconds
+        next_tick = time.monotonic()
+        next_refresh = 0.0
+        while True:
+            now = time.monotonic()
+            if now >= next_refresh:
+                try:
+                    await self.refresh()
+                except Exception:
+                    logger.exception("Failed to refresh probe configuration")
+                next_refresh = now + settings.PROBE_REFRESH_SECONDS
+            self._drop_expired_leases()
+
+            # Catch up on any ticks missed while the loop was busy
+            due: List[ProbeConfig] = []
+            while next_tick <= time.monotonic():
+                due.extend(self.advance())
+                next_tick += tick
+            if due:
+                task = asyncio.create_task(self._run_round(due))
+                self._in_flight.add(task)
+                task.add_done_callback(self._in_flight.discard)
+
+            await asyncio.sleep(max(0.0, next_tick - time.monotonic()))
+
+    def start(self) -> None:
+        if self._task is not None:
+            return
+        if self.engine is None:
+            self.engine = ProbeEngine(
+                max_concurrency=settings.PROBE_MAX_CONCURRENCY,
+                per_host_concurrency=settings.PROBE_PER_HOST_CONCURRENCY,
+            )
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight, return_exceptions=True)
+        if self.coordinator is not None:
+            await run_in_threadpool(self._leave)
+        if self.engine is not None:
+            await self.engine.aclose()
+
+    def _leave(self) -> None:
+        db = SessionLocal()
+        try:
+            self.coordinator.leave(db)
+        except Exception:
+            logger.exception("Failed to release probe leases")
+        finally:
+            db.close()
+
+
+def _make_coordinator() -> Optional[ShardCoordinator]:
+    if not settings.PROBE_SHARDING_ENABLED:
+        return None
+    return ShardCoordinator(lease_seconds=settings.PROBE_LEASE_SECONDS)
+
+
+probe_runner = ProbeRunner(coordinator=_make_coordinator())
+
+
+async def _run_worker() -> None:
+    runner = ProbeRunner(coordinator=_make_coordinator())
+    metric_buffer.start()
+    runner.start()
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    await stop.wait()
+    await runner.stop()
+    await run_in_threadpool(metric_buffer.stop)
+
+
+def run_worker() -> None:
+    """Entry point of one probe worker process."""
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_run_worker())
+
+
+def main() -> None:
+    """
+    Run N probe worker processes on this host:
+
+        python -m app.monitoring.probes --workers 4
+
+    Workers on any number of hosts share the checks through Postgres leases.
+    """
+    parser = argparse.ArgumentParser(description="Run Statio probe workers")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    if args.workers <= 1:
+        run_worker()
+        return
+
+    processes = [multiprocessing.Process(target=run_worker, name=f"probe-worker-{i}") for i in range(args.workers)]
+    for process in processes:
+        process.start()
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        for process in processes:
+            process.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+import argparse
+import logging
+from datetime import date, datetime, timedelta
+from typing import Optional, Tuple
+
+from sqlalchemy import func, text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.service import ServiceModel
+from app.models.uptime import UptimeReport, UptimeRollupDay
+from app.monitoring.downtime import effective_downtime, uptime_between
+from app.monitoring.intervals import total
+
+logger = logging.getLogger(__name__)
+
+_UPSERT_SET = """
+    end_date = EXCLUDED.end_date,
+    uptime_percentage = EXCLUDED.uptime_percentage,
+    total_downtime_minutes = EXCLUDED.total_downtime_minutes,
+    total_incidents = EXCLUDED.total_incidents,
+    avg_response_time = EXCLUDED.avg_response_time,
+    sample_count = EXCLUDED.sample_count,
+    up_count = EXCLUDED.up_count,
+    response_time_count = EXCLUDED.response_time_count,
+    response_time_sum = EXCLUDED.response_time_sum,
+    generated_at = EXCLUDED.generated_at
+"""
+
+_REPORT_COLUMNS = """
+    service_id, organization_id, start_date, end_date, period_type,
+    uptime_percentage, total_downtime_minutes, total_incidents, avg_response_time,
+    sample_count, up_count, response_time_count, response_time_sum, generated_at
+"""
+
+# One day for every service from the daily rollup. Uptime and downtime are
+# filled in afterwards from the effective downtime intervals.
+_DAILY_REPORT = f"""
+    INSERT INTO uptime_reports ({_REPORT_COLUMNS})
+    SELECT
+        d.service_id, d.organization_id, :start, :end, 'daily',
+        100.0,
+        0,
+        coalesce(inc.total, 0),
+        d.response_time_sum / nullif(d.response_time_count, 0),
+        d.sample_count, d.up_count, d.response_time_count, d.response_time_sum,
+        now() AT TIME ZONE 'utc'
+    FROM uptime_rollups_1d d
+    LEFT JOIN (
+        SELECT service_id, count(*) AS total
+        FROM incidents
+        WHERE created_at >= :start AND created_at < :end
+        GROUP BY service_id
+    ) inc ON inc.service_id = d.service_id
+    WHERE d.bucket_start = :start AND d.sample_count > 0
+    ON CONFLICT (service_id, period_type, start_date) DO UPDATE SET {_UPSERT_SET}
+"""
+
+# Weekly and monthly reports merge the daily reports inside the period, so they
+# never touch raw metrics and stay exact because the daily rows carry raw totals
+# (and every day has the same length, so uptime is the mean daily uptime).
+_MERGED_REPORT = f"""
+    INSERT INTO uptime_reports ({_REPORT_COLUMNS})
+    SELECT
+        service_id, max(organization_id), :start, :end, :period_type,
+        avg(uptime_percentage),
+        sum(total_downtime_minutes),
+        sum(total_incidents),
+        sum(response_time_sum) / nullif(sum(response_time_count), 0),
+        sum(sample_count), sum(up_count), sum(response_time_count), sum(response_time_sum),
+        now() AT TIME ZONE 'utc'
+    FROM uptime_reports
+    WHERE period_type = 'daily' AND start_date >= :start AND start_date < :end
+    GROUP BY service_id
+    HAVING sum(sample_count) > 0
+    ON CONFLICT (service_id, period_type, start_date) DO UPDATE SET {_UPSERT_SET}
+"""
+
+
+def week_bounds(day: date) -> Tuple[datetime, datetime]:
+    start = day - timedelta(days=day.weekday())
+    start_dt = datetime(start.year, start.month, start.day)
+    return start_dt, start_dt + timedelta(days=7)
+
+
+def month_bounds(day: date) -> Tuple[datetime, datetime]:
+    start = datetime(day.year, day.month, 1)
+    end = datetime(day.year + 1, 1, 1) if day.month == 12 else datetime(day.year, day.month + 1, 1)
+    return start, end
+
+
+_SET_DAILY_DOWNTIME = """
+    UPDATE uptime_reports
+    SET uptime_percentage = :uptime_percentage, total_downtime_minutes = :downtime_minutes
+    WHERE service_id = :service_id AND period_type = 'daily' AND start_date = :start
+"""
+
+
+def _apply_effective_downtime(db: Session, start: datetime, end: datetime) -> None:
+    """Set uptime and downtime of the day's daily reports from outages and incidents minus maintenance."""
+    services = (
+        db.query(ServiceModel)
+        .join(UptimeReport, UptimeReport.service_id == ServiceModel.id)
+        .filter(UptimeReport.period_type == "daily", UptimeReport.start_date == start)
+        .all()
+    )
+    downtime = effective_downtime(db, services, start, end)
+    params = [
+        {
+            "service_id": service.id,
+            "start": start,
+            "uptime_percentage": uptime_between(downtime[service.id], start, end),
+            "downtime_minutes": round(total(downtime[service.id]) / 60),
+        }
+        for service in services
+    ]
+    if params:
+        db.execute(text(_SET_DAILY_DOWNTIME), params)
+
+
+def generate_reports_for_day(db: Session, day: date) -> None:
+    """Upsert the daily reports for `day` and refresh the weekly and monthly reports containing it."""
+    start = datetime(day.year, day.month, day.day)
+    db.execute(text(_DAILY_REPORT), {"start": start, "end": start + timedelta(days=1)})
+    _apply_effective_downtime(db, start, start + timedelta(days=1))
+
+    for period_type, (period_start, period_end) in (
+        ("weekly", week_bounds(day)),
+        ("monthly", month_bounds(day)),
+    ):
+        db.execute(
+            text(_MERGED_REPORT),
+            {"start": period_start, "end": period_end, "period_type": period_type},
+        )
+
+
+def generate_reports(db: Session, today: Optional[date] = None, since: Optional[date] = None) -> int:
+    """
+    Generate reports for every closed day that has not been reported yet.
+
+    The last REPORT_LOOKBACK_DAYS closed days are always regenerated so late
+    samples folded into the rollups after a day closed still reach its reports.
+    Every write is an upsert on (service_id, period_type, start_date), so runs
+    are idempotent. Returns the number of days processed.
+    """
+    today = today or datetime.utcnow().date()
+    last_closed = today - timedelta(days=1)
+
+    if since is None:
+        last_reported = db.query(func.max(UptimeReport.start_date)).filter(UptimeReport.period_type == "daily").scalar()
+        if last_reported is not None:
+            since = min(last_reported.date() + timedelta(days=1), today - timedelta(days=settings.REPORT_LOOKBACK_DAYS))
+        else:
+            first_rollup = db.query(func.min(UptimeRollupDay.bucket_start)).scalar()
+            if first_rollup is None:
+                return 0
+            since = first_rollup.date()
+
+    day = since
+    processed = 0
+    while day <= last_closed:
+        generate_reports_for_day(db, day)
+        db.commit()
+        processed += 1
+        day += timedelta(days=1)
+    return processed
+
+
+def main() -> None:
+    """
+    Run after the rollup job, e.g. every hour from cron:
+
+        python -m app.monitoring.reports [--since 2026-01-01]
+    """
+    parser = argparse.ArgumentParser(description="Generate uptime reports")
+    parser.add_argument("--since", type=date.fromisoformat, help="regenerate reports from this day on")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    db = SessionLocal()
+    try:
+        processed = generate_reports(db, since=args.since)
+        logger.info("Generated uptime reports for %d day(s)", processed)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,432 @@
+import argparse
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Type
+
+from sqlalchemy import func, text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.uptime import (
+    UptimeRollupDay, UptimeRollupHour, UptimeRollupMinute, UptimeRollupMixin, UptimeRollupState
+)
+from app.monitoring.sketch import LOG_GAMMA, MIN_VALUE, LatencySketch
+
+logger = logging.getLogger(__name__)
+
+STATE_NAME = "uptime_rollups"
+
+# Statuses with their own counter column; anything else only counts towards sample_count
+ROLLUP_STATUSES = ("operational", "degraded", "partial_outage", "major_outage", "maintenance")
+
+# Arbitrary constant so concurrent rollup runs serialize on one advisory lock
+_ROLLUP_LOCK_ID = 0x5747_7075
+
+_COUNTER_COLUMNS = [
+    "sample_count", "up_count", "response_time_count", "response_time_sum",
+    "response_time_min", "response_time_max",
+] + [f"{status}_count" for status in ROLLUP_STATUSES] + ["latency_good_count"]
+
+_UPSERT_SET = ", ".join(f"{column} = EXCLUDED.{column}" for column in _COUNTER_COLUMNS)
+
+# Minute buckets are recomputed from raw samples. Only the buckets touched by
+# newly inserted rows are rebuilt, and every rebuild reads the complete bucket,
+# so rows arriving late for an old minute simply update that minute again.
+_MINUTE_FROM_RAW = f"""
+    WITH touched AS (
+        SELECT DISTINCT service_id, date_trunc('minute', "timestamp") AS bucket_start
+        FROM uptime_metrics
+        WHERE id > :from_id AND id <= :to_id
+    )
+    INSERT INTO uptime_rollups_1m (
+        service_id, bucket_start, organization_id, {", ".join(_COUNTER_COLUMNS)}
+    )
+    SELECT
+        m.service_id,
+        t.bucket_start,
+        max(m.organization_id),
+        count(*),
+        count(*) FILTER (WHERE m.is_up),
+        count(m.response_time),
+        sum(m.response_time),
+        min(m.response_time),
+        max(m.response_time),
+        {", ".join(f"count(*) FILTER (WHERE m.status = '{status}')" for status in ROLLUP_STATUSES)},
+        count(*) FILTER (WHERE m.is_up AND m.response_time <= s.slo_latency_threshold_ms)
+    FROM touched t
+    JOIN uptime_metrics m
+      ON m.service_id = t.service_id
+     AND m."timestamp" >= t.bucket_start
+     AND m."timestamp" < t.bucket_start + interval '1 minute'
+    JOIN services s ON s.id = t.service_id
+    GROUP BY m.service_id, t.bucket_start, s.slo_latency_threshold_ms
+    ON CONFLICT (service_id, bucket_start) DO UPDATE SET {_UPSERT_SET}
+    RETURNING service_id, bucket_start
+"""
+
+# Coarser buckets are rebuilt by merging the finer rollup rows inside them
+_MERGE_TEMPLATE = f"""
+    WITH touched AS (
+        SELECT * FROM unnest(CAST(:service_ids AS integer[]), CAST(:bucket_starts AS timestamp[]))
+            AS t(service_id, bucket_start)
+    )
+    INSERT INTO {{target}} (
+        service_id, bucket_start, organization_id, {", ".join(_COUNTER_COLUMNS)}
+    )
+    SELECT
+        r.service_id,
+        t.bucket_start,
+        max(r.organization_id),
+        sum(r.sample_count),
+        sum(r.up_count),
+        sum(r.response_time_count),
+        sum(r.response_time_sum),
+        min(r.response_time_min),
+        max(r.response_time_max),
+        {", ".join(f"sum(r.{status}_count)" for status in ROLLUP_STATUSES)},
+        sum(r.latency_good_count)
+    FROM touched t
+    JOIN {{source}} r
+      ON r.service_id = t.service_id
+     AND r.bucket_start >= t.bucket_start
+     AND r.bucket_start < t.bucket_start + interval '{{width}}'
+    GROUP BY r.service_id, t.bucket_start
+    ON CONFLICT (service_id, bucket_start) DO UPDATE SET {_UPSERT_SET}
+"""
+
+_HOUR_FROM_MINUTES = _MERGE_TEMPLATE.format(target="uptime_rollups_1h", source="uptime_rollups_1m", width="1 hour")
+_DAY_FROM_HOURS = _MERGE_TEMPLATE.format(target="uptime_rollups_1d", source="uptime_rollups_1h", width="1 day")
+
+
+def _truncate(buckets: Iterable[Tuple[int, datetime]], unit: str) -> Tuple[List[int], List[datetime]]:
+    """Distinct (service_id, bucket) pairs truncated to the hour or day, as parallel arrays."""
+    seen: Set[Tuple[int, datetime]] = set()
+    for service_id, bucket_start in buckets:
+        if unit == "hour":
+            bucket_start = bucket_start.replace(minute=0, second=0, microsecond=0)
+        else:
+            bucket_start = bucket_start.replace(hour=0, minute=0, second=0, microsecond=0)
+        seen.add((service_id, bucket_start))
+    return [service_id for service_id, _ in seen], [bucket_start for _, bucket_start in seen]
+
+
+# Log-bin histogram of the samples in each touched minute; bin_index() in
+# app.monitoring.sketch computes the same bins in Python
+_MINUTE_SKETCH_BINS = f"""
+    WITH touched AS (
+        SELECT * FROM unnest(CAST(:service_ids AS integer[]), CAST(:bucket_starts AS timestamp[]))
+            AS t(service_id, bucket_start)
+    )
+    SELECT
+        m.service_id,
+        t.bucket_start,
+        CASE WHEN m.response_time > {MIN_VALUE} THEN ceil(ln(m.response_time) / {LOG_GAMMA!r})::int END AS bin,
+        count(*) AS samples
+    FROM touched t
+    JOIN uptime_metrics m
+      ON m.service_id = t.service_id
+     AND m."timestamp" >= t.bucket_start
+     AND m."timestamp" < t.bucket_start + interval '1 minute'
+    WHERE m.response_time IS NOT NULL
+    GROUP BY 1, 2, 3
+"""
+
+_CHILD_SKETCHES = """
+    WITH touched AS (
+        SELECT * FROM unnest(CAST(:service_ids AS integer[]), CAST(:bucket_starts AS timestamp[]))
+            AS t(service_id, bucket_start)
+    )
+    SELECT r.service_id, t.bucket_start, r.response_time_sketch
+    FROM touched t
+    JOIN {source} r
+      ON r.service_id = t.service_id
+     AND r.bucket_start >= t.bucket_start
+     AND r.bucket_start < t.bucket_start + interval '{width}'
+    WHERE r.response_time_sketch IS NOT NULL
+"""
+
+_STORE_SKETCH = "UPDATE {target} SET response_time_sketch = :sketch WHERE service_id = :service_id AND bucket_start = :bucket_start"
+
+
+def _store_sketches(db: Session, table: str, sketches: Dict[Tuple[int, datetime], LatencySketch]) -> None:
+    if sketches:
+        db.execute(
+            text(_STORE_SKETCH.format(target=table)),
+            [
+                {"service_id": service_id, "bucket_start": bucket_start, "sketch": sketch.encode()}
+                for (service_id, bucket_start), sketch in sketches.items()
+            ],
+        )
+
+
+def _refresh_sketches(
+    db: Session,
+    minutes: Tuple[List[int], List[datetime]],
+    hours: Tuple[List[int], List[datetime]],
+    days: Tuple[List[int], List[datetime]],
+) -> None:
+    """
+    Rebuild the latency sketches of the touched buckets: minute sketches from
+    per-bin counts computed in SQL, hour and day sketches by merging the
+    sketches one level down. Raw response times never leave the database.
+    """
+    sketches: Dict[Tuple[int, datetime], LatencySketch] = {}
+    rows = db.execute(text(_MINUTE_SKETCH_BINS), {"service_ids": minutes[0], "bucket_starts": minutes[1]})
+    for service_id, bucket_start, index, samples in rows:
+        sketches.setdefault((service_id, bucket_start), LatencySketch()).add_bin(index, samples)
+    _store_sketches(db, "uptime_rollups_1m", sketches)
+
+    for target, source, width, touched in (
+        ("uptime_rollups_1h", "uptime_rollups_1m", "1 hour", hours),
+        ("uptime_rollups_1d", "uptime_rollups_1h", "1 day", days),
+    ):
+        sketches = {}
+        rows = db.execute(
+            text(_CHILD_SKETCHES.format(source=source, width=width)),
+            {"service_ids": touched[0], "bucket_starts": touched[1]},
+        )
+        for service_id, bucket_start, blob in rows:
+            sketches.setdefault((service_id, bucket_start), LatencySketch()).merge(LatencySketch.decode(blob))
+        _store_sketches(db, target, sketches)
+
+
+def get_watermark(db: Session) -> int:
+    state = db.get(UptimeRollupState, STATE_NAME)
+    return state.last_metric_id if state else 0
+
+
+def run_rollups(db: Session, batch_rows: Optional[int] = None) -> int:
+    """
+    Fold every uptime_metrics row inserted since the last run into the
+    1-minute, 1-hour and 1-day rollups. Returns the number of raw ids covered.
+
+    Progress is tracked by uptime_metrics.id rather than by timestamp, so a
+    sample that arrives late is still picked up. Each run also re-reads the
+    last ROLLUP_ID_OVERLAP ids below the watermark, catching rows from
+    transactions that committed after a higher id had already been rolled up;
+    rebuilding a bucket is idempotent, so the overlap only costs a little work.
+    """
+    batch_rows = batch_rows or settings.ROLLUP_BATCH_ROWS
+    if not db.execute(text("SELECT pg_try_advisory_xact_lock(:lock_id)"), {"lock_id": _ROLLUP_LOCK_ID}).scalar():
+        logger.info("Another rollup run holds the lock, skipping")
+        return 0
+
+    watermark = get_watermark(db)
+    max_id = db.execute(text("SELECT max(id) FROM uptime_metrics")).scalar() or 0
+    if max_id <= watermark:
+        db.commit()
+        return 0
+
+    from_id = max(0, watermark - settings.ROLLUP_ID_OVERLAP)
+    to_id = min(max_id, watermark + batch_rows)
+
+    minutes = db.execute(text(_MINUTE_FROM_RAW), {"from_id": from_id, "to_id": to_id}).all()
+    if minutes:
+        hours = _truncate(minutes, "hour")
+        db.execute(text(_HOUR_FROM_MINUTES), {"service_ids": hours[0], "bucket_starts": hours[1]})
+        days = _truncate(minutes, "day")
+        db.execute(text(_DAY_FROM_HOURS), {"service_ids": days[0], "bucket_starts": days[1]})
+        _refresh_sketches(
+            db,
+            ([service_id for service_id, _ in minutes], [bucket_start for _, bucket_start in minutes]),
+            hours,
+            days,
+        )
+
+    state = db.get(UptimeRollupState, STATE_NAME)
+    if state is None:
+        state = UptimeRollupState(name=STATE_NAME)
+    state.last_metric_id = to_id
+    db.add(state)
+    db.commit()
+    return to_id - watermark
+
+
+_SERIES_STATUS = " ".join(
+    f"WHEN r.{status}_count = greatest({', '.join(f'r.{other}_count' for other in ROLLUP_STATUSES)}) THEN '{status}'"
+    for status in ROLLUP_STATUSES
+)
+
+# Gap-filled bucket series for one service: generate_series yields every
+# bucket in the range and the rollup rows are left-joined onto it.
+_BUCKET_SERIES = f"""
+    SELECT
+        s.bucket_start,
+        100.0 * r.up_count / nullif(r.sample_count, 0) AS uptime_percentage,
+        r.response_time_sum / nullif(r.response_time_count, 0) AS response_time,
+        CASE WHEN coalesce(r.sample_count, 0) = 0 THEN 'no_data' {_SERIES_STATUS} END AS status,
+        r.response_time_sketch
+    FROM generate_series(
+        date_trunc(:unit, CAST(:start AS timestamp)),
+        date_trunc(:unit, CAST(:end AS timestamp)),
+        CAST(:step AS interval)
+    ) AS s(bucket_start)
+    LEFT JOIN {{table}} r ON r.service_id = :service_id AND r.bucket_start = s.bucket_start
+    ORDER BY s.bucket_start
+"""
+
+
+def bucket_series(db: Session, service_id: int, start: datetime, end: datetime, bucket: timedelta) -> List:
+    """
+    (bucket_start, uptime_percentage, response_time, status, response_time_sketch) for every bucket
+    between start and end, in one statement. Buckets without samples have
+    NULL uptime and response time and the status "no_data".
+    """
+    model = rollup_model_for(bucket)
+    unit = {UptimeRollupDay: "day", UptimeRollupHour: "hour", UptimeRollupMinute: "minute"}[model]
+    return db.execute(
+        text(_BUCKET_SERIES.format(table=model.__tablename__)),
+        {"service_id": service_id, "start": start, "end": end, "unit": unit, "step": f"1 {unit}"},
+    ).all()
+
+
+# Stored rollup resolutions, coarsest first
+RESOLUTIONS: Tuple[Tuple[str, timedelta], ...] = (
+    ("1d", timedelta(days=1)),
+    ("1h", timedelta(hours=1)),
+    ("1m", timedelta(minutes=1)),
+)
+
+
+def minute_rollup_cutoff(now: Optional[datetime] = None) -> datetime:
+    """Minute buckets before this have been pruned; only hour and day buckets remain."""
+    return (now or datetime.utcnow()) - timedelta(days=settings.ROLLUP_MINUTE_RETENTION_DAYS)
+
+
+def select_resolution(
+    start: datetime, end: datetime, max_points: int, max_oversample: Optional[int] = None
+) -> Tuple[str, timedelta]:
+    """
+    Coarsest stored resolution that still yields at least `max_points`
+    buckets between start and end, or the finest one for short ranges. When
+    that would read more than max_points * max_oversample buckets (a range
+    just short of max_points hours read by the minute, say), the next coarser
+    resolution is used instead, so the rows read stay proportional to
+    max_points; callers reduce the series to max_points. Minute buckets are
+    only used for ranges that start after minute_rollup_cutoff().
+    """
+    max_oversample = max_oversample or settings.ROLLUP_MAX_OVERSAMPLE
+    resolutions = RESOLUTIONS if start >= minute_rollup_cutoff() else RESOLUTIONS[:-1]
+    span = end - start
+    index = next(
+        (i for i, (_, width) in enumerate(resolutions) if span / width >= max_points), len(resolutions) - 1
+    )
+    if index > 0 and span / resolutions[index][1] > max_points * max_oversample:
+        index -= 1
+    return resolutions[index]
+
+
+def prune_minute_rollups(db: Session, now: Optional[datetime] = None) -> int:
+    """
+    Delete minute buckets older than ROLLUP_MINUTE_RETENTION_DAYS, walking
+    the (service_id, bucket_start) key of each service. The hour and day
+    buckets built from them are kept. Returns the number of rows deleted.
+    """
+    return db.execute(
+        text(
+            "DELETE FROM uptime_rollups_1m r USING services s "
+            "WHERE r.service_id = s.id AND r.bucket_start < :cutoff"
+        ),
+        {"cutoff": minute_rollup_cutoff(now)},
+    ).rowcount or 0
+
+
+def rollup_model_for(bucket: timedelta) -> Type[UptimeRollupMixin]:
+    """Rollup table whose bucket width matches `bucket`."""
+    if bucket >= timedelta(days=1):
+        return UptimeRollupDay
+    if bucket >= timedelta(hours=1):
+        return UptimeRollupHour
+    return UptimeRollupMinute
+
+
+def window_totals(
+    db: Session, service_ids: List[int], windows: Dict[str, datetime], model: Type[UptimeRollupMixin] = UptimeRollupHour
+) -> Dict[int, Dict[str, Tuple[int, int, int, Optional[float]]]]:
+    """
+    Per-service (sample_count, up_count, response_time_count, response_time_sum)
+    for several windows that all end now, using one grouped query.
+    """
+    if not service_ids or not windows:
+        return {}
+
+    columns = [model.service_id]
+    names = list(windows)
+    for name in names:
+        in_window = model.bucket_start >= windows[name]
+        columns += [
+            func.coalesce(func.sum(model.sample_count).filter(in_window), 0),
+            func.coalesce(func.sum(model.up_count).filter(in_window), 0),
+            func.coalesce(func.sum(model.response_time_count).filter(in_window), 0),
+            func.sum(model.response_time_sum).filter(in_window),
+        ]
+
+    rows = (
+        db.query(*columns)
+        .filter(model.service_id.in_(service_ids), model.bucket_start >= min(windows.values()))
+        .group_by(model.service_id)
+        .all()
+    )
+    totals: Dict[int, Dict[str, Tuple[int, int, int, Optional[float]]]] = {}
+    for row in rows:
+        totals[row[0]] = {
+            name: tuple(row[1 + 4 * i:5 + 4 * i]) for i, name in enumerate(names)
+        }
+    return totals
+
+
+def window_sketches(
+    db: Session, service_ids: List[int], since: datetime, model: Type[UptimeRollupMixin] = UptimeRollupHour
+) -> Dict[int, LatencySketch]:
+    """Latency sketch per service covering the buckets since `since`, merged from the stored bucket sketches."""
+    if not service_ids:
+        return {}
+    rows = (
+        db.query(model.service_id, model.response_time_sketch)
+        .filter(
+            model.service_id.in_(service_ids),
+            model.bucket_start >= since,
+            model.response_time_sketch.isnot(None),
+        )
+        .all()
+    )
+    sketches: Dict[int, LatencySketch] = {}
+    for service_id, blob in rows:
+        sketches.setdefault(service_id, LatencySketch()).merge(LatencySketch.decode(blob))
+    return sketches
+
+
+def average_response_time(response_time_count: int, response_time_sum: Optional[float]) -> Optional[float]:
+    return response_time_sum / response_time_count if response_time_count else None
+
+
+def main() -> None:
+    """
+    Bring the rollups up to date, once or continuously:
+
+        python -m app.monitoring.rollups --interval 30
+    """
+    parser = argparse.ArgumentParser(description="Maintain uptime rollup tables")
+    parser.add_argument("--interval", type=float, default=0, help="seconds between runs; 0 runs once")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    while True:
+        db = SessionLocal()
+        try:
+            # Drain the backlog in batches before sleeping
+            while run_rollups(db) >= settings.ROLLUP_BATCH_ROWS:
+                pass
+        except Exception:
+            logger.exception("Rollup run failed")
+        finally:
+            db.close()
+        if not args.interval:
+            return
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
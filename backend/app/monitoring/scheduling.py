@@ -0,0 +1,182 @@
+import bisect
+import hashlib
+import math
+import os
+import socket
+import uuid
+from datetime import timedelta
+from typing import Dict, Hashable, Iterable, List, Optional, Set
+
+from sqlalchemy import func, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.models.probe import ProbeAssignmentModel, ProbeWorkerModel
+
+
+def stable_hash(value: str) -> int:
+    """64-bit hash that is identical in every process, unlike the builtin hash()."""
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """
+    Consistent hash ring over worker ids.
+    Each worker gets `replicas` virtual nodes so services spread evenly, and
+    adding or removing a worker only moves the services on its own arcs.
+    """
+
+    def __init__(self, workers: Iterable[str], replicas: int = 128):
+        self.replicas = replicas
+        self._points: List[int] = []
+        self._owners: List[str] = []
+        ring = sorted(
+            (stable_hash(f"{worker}#{i}"), worker)
+            for worker in set(workers)
+            for i in range(replicas)
+        )
+        for point, worker in ring:
+            self._points.append(point)
+            self._owners.append(worker)
+
+    def __len__(self) -> int:
+        return len(set(self._owners))
+
+    def owner(self, key: Hashable) -> Optional[str]:
+        if not self._points:
+            return None
+        index = bisect.bisect(self._points, stable_hash(str(key))) % len(self._points)
+        return self._owners[index]
+
+
+class TimerWheel:
+    """
+    Hashed timer wheel for recurring checks.
+    Scheduling and cancelling are O(1); each tick only touches the keys in
+    the current slot. Delays longer than one revolution carry a round count.
+    """
+
+    def __init__(self, tick_seconds: float = 1.0, slots: int = 512):
+        self.tick_seconds = tick_seconds
+        self._slots: List[Dict[Hashable, int]] = [{} for _ in range(slots)]
+        self._slot_of: Dict[Hashable, int] = {}
+        self.position = 0
+
+    def __len__(self) -> int:
+        return len(self._slot_of)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._slot_of
+
+    def schedule(self, key: Hashable, delay_seconds: float) -> None:
+        """(Re)schedule key to fire after delay_seconds, rounded up to whole ticks."""
+        self.cancel(key)
+        ticks = max(1, math.ceil(delay_seconds / self.tick_seconds))
+        slot = (self.position + ticks) % len(self._slots)
+        self._slots[slot][key] = (ticks - 1) // len(self._slots)
+        self._slot_of[key] = slot
+
+    def cancel(self, key: Hashable) -> None:
+        slot = self._slot_of.pop(key, None)
+        if slot is not None:
+            del self._slots[slot][key]
+
+    def advance(self) -> List[Hashable]:
+        """Move one tick forward and return the keys that fire on it."""
+        self.position = (self.position + 1) % len(self._slots)
+        bucket = self._slots[self.position]
+        due = []
+        for key, rounds in list(bucket.items()):
+            if rounds == 0:
+                due.append(key)
+                del bucket[key]
+                del self._slot_of[key]
+            else:
+                bucket[key] = rounds - 1
+        return due
+
+
+def initial_offset(service_id: int, interval_seconds: float) -> float:
+    """
+    Deterministic phase for a service within its interval.
+    Spreads first runs evenly so checks do not all fire on the minute, and
+    keeps the phase stable when a service moves between workers.
+    """
+    return (stable_hash(f"phase:{service_id}") % 10000) / 10000.0 * interval_seconds
+
+
+class ShardCoordinator:
+    """
+    Splits probe work across worker processes through Postgres.
+
+    Every sync() heartbeats this worker, builds a consistent hash ring from
+    all live workers and claims leases on the services the ring assigns to
+    it. A lease can only be taken over once its previous holder released it
+    or let it expire, so two workers never check the same service even while
+    they briefly disagree about membership.
+    """
+
+    def __init__(self, worker_id: Optional[str] = None, lease_seconds: int = 90):
+        self.hostname = socket.gethostname()
+        self.worker_id = worker_id or f"{self.hostname}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.lease_seconds = lease_seconds
+
+    def live_workers(self, db: Session) -> List[str]:
+        cutoff = func.now() - timedelta(seconds=self.lease_seconds)
+        db.query(ProbeWorkerModel).filter(ProbeWorkerModel.heartbeat_at < cutoff).delete(
+            synchronize_session=False
+        )
+        return [row.worker_id for row in db.query(ProbeWorkerModel.worker_id).all()]
+
+    def heartbeat(self, db: Session) -> None:
+        stmt = pg_insert(ProbeWorkerModel).values(worker_id=self.worker_id, hostname=self.hostname)
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=[ProbeWorkerModel.worker_id],
+            set_={"heartbeat_at": func.now()},
+        ))
+
+    def sync(self, db: Session, service_ids: Iterable[int]) -> Set[int]:
+        """Heartbeat, rebalance and return the service ids this worker holds a lease on."""
+        self.heartbeat(db)
+        ring = HashRing(self.live_workers(db))
+        wanted = [service_id for service_id in service_ids if ring.owner(service_id) == self.worker_id]
+
+        # Hand back services the ring now gives to someone else
+        db.execute(
+            update(ProbeAssignmentModel)
+            .where(
+                ProbeAssignmentModel.worker_id == self.worker_id,
+                ProbeAssignmentModel.service_id.notin_(wanted),
+            )
+            .values(lease_expires_at=func.now())
+        )
+
+        owned: Set[int] = set()
+        if wanted:
+            lease_until = func.now() + timedelta(seconds=self.lease_seconds)
+            stmt = pg_insert(ProbeAssignmentModel).values([
+                {"service_id": service_id, "worker_id": self.worker_id, "lease_expires_at": lease_until}
+                for service_id in wanted
+            ])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[ProbeAssignmentModel.service_id],
+                set_={"worker_id": self.worker_id, "lease_expires_at": lease_until},
+                where=(ProbeAssignmentModel.worker_id == self.worker_id)
+                | (ProbeAssignmentModel.lease_expires_at <= func.now()),
+            ).returning(ProbeAssignmentModel.service_id)
+            owned = set(db.execute(stmt).scalars().all())
+
+        db.commit()
+        return owned
+
+    def leave(self, db: Session) -> None:
+        """Release every lease and deregister so peers pick up the work immediately."""
+        db.execute(
+            update(ProbeAssignmentModel)
+            .where(ProbeAssignmentModel.worker_id == self.worker_id)
+            .values(lease_expires_at=func.now())
+        )
+        db.query(ProbeWorkerModel).filter(ProbeWorkerModel.worker_id == self.worker_id).delete(
+            synchronize_session=False
+        )
+        db.commit()
@@ -0,0 +1,157 @@
+import math
+from typing import Dict, Iterable, Optional, Tuple
+
+# Quantiles are returned within 1% of the true value
+RELATIVE_ACCURACY = 0.01
+GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+LOG_GAMMA = math.log(GAMMA)
+
+# Response times at or below this (in ms) are counted in a dedicated zero bin
+MIN_VALUE = 1e-3
+
+# Hard cap on bins per sketch. With 1% accuracy, 1µs..1h of latency spans
+# about 1100 bins, so collapsing only ever happens for absurd inputs.
+MAX_BINS = 2048
+
+_FORMAT_VERSION = 1
+
+
+def bin_index(value: float) -> Optional[int]:
+    """Log bin of a response time; None for the zero bin. Mirrored in SQL by the rollup job."""
+    if value <= MIN_VALUE:
+        return None
+    return math.ceil(math.log(value) / LOG_GAMMA)
+
+
+def _write_varint(out: bytearray, value: int) -> None:
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data: bytes, pos: int) -> Tuple[int, int]:
+    result = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+def _zigzag(value: int) -> int:
+    return (value << 1) if value >= 0 else ((-value << 1) - 1)
+
+
+def _unzigzag(value: int) -> int:
+    return (value >> 1) if not value & 1 else -((value + 1) >> 1)
+
+
+class LatencySketch:
+    """
+    Mergeable log-bucketed histogram of response times (a DDSketch variant).
+
+    Each bin covers (GAMMA^(i-1), GAMMA^i], so any quantile is answered within
+    RELATIVE_ACCURACY, and merging two sketches is adding their bin counts.
+    That makes sketches of minute buckets combinable into hour, day or
+    arbitrary-window sketches without going back to raw samples.
+    """
+
+    __slots__ = ("bins", "zero_count", "count")
+
+    def __init__(self) -> None:
+        self.bins: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def add(self, value: float, count: int = 1) -> None:
+        self.add_bin(bin_index(value), count)
+
+    def add_bin(self, index: Optional[int], count: int) -> None:
+        if index is None:
+            self.zero_count += count
+        else:
+            self.bins[index] = self.bins.get(index, 0) + count
+        self.count += count
+        if len(self.bins) > MAX_BINS:
+            self._collapse()
+
+    def merge(self, other: "LatencySketch") -> "LatencySketch":
+        for index, count in other.bins.items():
+            self.bins[index] = self.bins.get(index, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        if len(self.bins) > MAX_BINS:
+            self._collapse()
+        return self
+
+    def _collapse(self) -> None:
+        """Fold the lowest bins together so the highest quantiles keep full accuracy."""
+        indexes = sorted(self.bins)
+        excess = indexes[: len(indexes) - MAX_BINS + 1]
+        target = excess[-1]
+        self.bins[target] = sum(self.bins.pop(index) for index in excess[:-1]) + self.bins[target]
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Approximate q-quantile (0 <= q <= 1) in ms, or None for an empty sketch."""
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        if rank < self.zero_count:
+            return 0.0
+        seen = self.zero_count
+        for index in sorted(self.bins):
+            seen += self.bins[index]
+            if seen > rank:
+                # Midpoint of the bin in relative terms
+                return 2.0 * GAMMA ** index / (GAMMA + 1)
+        return 2.0 * GAMMA ** max(self.bins) / (GAMMA + 1)
+
+    def encode(self) -> bytes:
+        """
+        Compact binary form: version, zero count, bin count, then each bin as a
+        zigzag delta from the previous index plus its count, all as varints.
+        Typically a few bytes per occupied bin.
+        """
+        out = bytearray([_FORMAT_VERSION])
+        _write_varint(out, self.zero_count)
+        _write_varint(out, len(self.bins))
+        previous = 0
+        for index in sorted(self.bins):
+            _write_varint(out, _zigzag(index - previous))
+            _write_varint(out, self.bins[index])
+            previous = index
+        return bytes(out)
+
+    @classmethod
+    def decode(cls, data: Optional[bytes]) -> "LatencySketch":
+        sketch = cls()
+        if not data:
+            return sketch
+        if data[0] != _FORMAT_VERSION:
+            raise ValueError(f"Unsupported sketch format {data[0]}")
+        pos = 1
+        sketch.zero_count, pos = _read_varint(data, pos)
+        bin_count, pos = _read_varint(data, pos)
+        index = 0
+        for _ in range(bin_count):
+            delta, pos = _read_varint(data, pos)
+            count, pos = _read_varint(data, pos)
+            index += _unzigzag(delta)
+            sketch.bins[index] = count
+        sketch.count = sketch.zero_count + sum(sketch.bins.values())
+        return sketch
+
+    @classmethod
+    def merged(cls, blobs: Iterable[Optional[bytes]]) -> "LatencySketch":
+        sketch = cls()
+        for blob in blobs:
+            if blob:
+                sketch.merge(cls.decode(blob))
+        return sketch
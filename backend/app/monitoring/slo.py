@@ -0,0 +1,113 @@
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, List, Sequence
+
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models.service import ServiceModel, SloType
+from app.models.uptime import UptimeRollupHour
+
+# SLOs are evaluated over a rolling period; burn rates over the shorter windows
+SLO_PERIOD = timedelta(days=30)
+BURN_WINDOWS = (
+    ("1h", timedelta(hours=1)),
+    ("6h", timedelta(hours=6)),
+    ("24h", timedelta(hours=24)),
+    ("30d", SLO_PERIOD),
+)
+
+# Multi-window burn-rate alerting: a burn rate of 14.4 spends 2% of a 30 day
+# budget per hour, 6 spends 5% in 6 hours and 3 spends 10% in a day
+FAST_BURN_RATE = 14.4
+SLOW_BURN_RATE = 6.0
+DAILY_BURN_RATE = 3.0
+
+
+@dataclass
+class SloEvaluation:
+    """Per-service results, aligned with the service_ids passed to evaluate_slos."""
+    compliance: np.ndarray  # percentage of good samples over SLO_PERIOD, NaN without samples
+    budget_remaining: np.ndarray  # fraction of the error budget left; negative once overspent
+    burn_rates: np.ndarray  # (services, windows), in BURN_WINDOWS order
+    status: np.ndarray  # "critical", "exhausted", "warning" or "ok"
+
+
+def evaluate_slos(total: np.ndarray, good: np.ndarray, targets: np.ndarray) -> SloEvaluation:
+    """
+    Evaluate every SLO at once.
+
+    `total` and `good` are (services, windows) sample counts in BURN_WINDOWS
+    order and `targets` the objectives in percent. A window without samples
+    burns nothing.
+    """
+    total = np.asarray(total, dtype=float)
+    good = np.asarray(good, dtype=float)
+    budget = 1.0 - np.asarray(targets, dtype=float) / 100.0
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        error_rate = np.where(total > 0, (total - good) / total, 0.0)
+        compliance = np.where(total[:, -1] > 0, 100.0 * good[:, -1] / total[:, -1], np.nan)
+    burn_rates = error_rate / budget[:, None]
+    budget_remaining = 1.0 - burn_rates[:, -1]
+
+    burn_1h, burn_6h, burn_24h = burn_rates[:, 0], burn_rates[:, 1], burn_rates[:, 2]
+    status = np.select(
+        [
+            (burn_1h >= FAST_BURN_RATE) & (burn_6h >= SLOW_BURN_RATE),
+            budget_remaining <= 0,
+            (burn_6h >= SLOW_BURN_RATE) | (burn_24h >= DAILY_BURN_RATE),
+        ],
+        ["critical", "exhausted", "warning"],
+        default="ok",
+    )
+    return SloEvaluation(compliance, budget_remaining, burn_rates, status)
+
+
+def load_slo_counts(db: Session, service_ids: Sequence[int], now: datetime) -> Dict[str, np.ndarray]:
+    """
+    Per-window sample, up and latency-good counts from the hourly rollups,
+    as (services, windows) arrays aligned with service_ids, in one grouped
+    query. Windows start at the hour containing `now - window`.
+    """
+    shape = (len(service_ids), len(BURN_WINDOWS))
+    counts = {name: np.zeros(shape) for name in ("sample", "up", "latency_good")}
+    if not service_ids:
+        return counts
+
+    columns = [UptimeRollupHour.service_id]
+    starts = [(now - window).replace(minute=0, second=0, microsecond=0) for _, window in BURN_WINDOWS]
+    for start in starts:
+        in_window = UptimeRollupHour.bucket_start >= start
+        columns += [
+            func.coalesce(func.sum(UptimeRollupHour.sample_count).filter(in_window), 0),
+            func.coalesce(func.sum(UptimeRollupHour.up_count).filter(in_window), 0),
+            func.coalesce(func.sum(UptimeRollupHour.latency_good_count).filter(in_window), 0),
+        ]
+    rows = (
+        db.query(*columns)
+        .filter(UptimeRollupHour.service_id.in_(service_ids), UptimeRollupHour.bucket_start >= min(starts))
+        .group_by(UptimeRollupHour.service_id)
+        .all()
+    )
+    if not rows:
+        return counts
+
+    data = np.array(rows, dtype=float)
+    order = np.argsort(service_ids)
+    positions = order[np.searchsorted(np.asarray(service_ids)[order], data[:, 0])]
+    values = data[:, 1:].reshape(len(rows), len(BURN_WINDOWS), 3)
+    counts["sample"][positions] = values[:, :, 0]
+    counts["up"][positions] = values[:, :, 1]
+    counts["latency_good"][positions] = values[:, :, 2]
+    return counts
+
+
+def evaluate_services(db: Session, services: List[ServiceModel], now: datetime) -> SloEvaluation:
+    """Load the counts for services with an SLO and evaluate them together."""
+    counts = load_slo_counts(db, [service.id for service in services], now)
+    is_latency = np.array([service.slo_type == SloType.LATENCY for service in services], dtype=bool)
+    good = np.where(is_latency[:, None], counts["latency_good"], counts["up"])
+    targets = np.array([service.slo_target for service in services], dtype=float)
+    return evaluate_slos(counts["sample"], good, targets)
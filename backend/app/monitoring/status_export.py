@@ -0,0 +1,210 @@
+import argparse
+import hashlib
+import html
+import logging
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import text
+
+from app.api.v1.endpoints.public import RECENT_MAINTENANCE_WINDOW, public_status_overview
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.organization import OrganizationModel
+from app.schemas.service import StatusOverview
+
+logger = logging.getLogger(__name__)
+
+VERSION_FILE = "version"
+
+# The data behind one organization's page. The maintenances it shows are
+# counted with the overview's own window boundary, so one leaving the
+# recent window changes the fingerprint as soon as it leaves the page.
+_ORGANIZATION_FINGERPRINT = """
+    SELECT concat_ws('|',
+        (SELECT concat_ws(':', name, slug, coalesce(updated_at, created_at)) FROM organizations WHERE id = :organization_id),
+        (SELECT concat_ws(':', count(*), max(id), max(coalesce(updated_at, created_at))) FROM services WHERE organization_id = :organization_id),
+        (SELECT concat_ws(':', count(*), max(id), max(coalesce(updated_at, created_at))) FROM incidents WHERE organization_id = :organization_id),
+        (SELECT concat_ws(':', count(*), max(id)) FROM incident_updates WHERE organization_id = :organization_id),
+        (SELECT concat_ws(':', count(*), max(id), max(coalesce(updated_at, created_at))) FROM maintenances WHERE organization_id = :organization_id),
+        (SELECT count(*) FROM maintenances WHERE organization_id = :organization_id AND (is_active OR scheduled_end >= :window_start))
+    )
+"""
+
+
+def write_atomic(path: str, data: bytes) -> None:
+    """Write to a temporary file in the same directory, then rename over `path`, so readers never see a partial file."""
+    directory = os.path.dirname(path)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as tmp:
+            tmp.write(data)
+            tmp.flush()
+            os.fsync(tmp.fileno())
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def _read(path: str) -> Optional[str]:
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except FileNotFoundError:
+        return None
+
+
+def _label(status: str) -> str:
+    return status.replace("_", " ")
+
+
+def render_html(organization: OrganizationModel, overview: StatusOverview) -> bytes:
+    """A minimal page that works without JavaScript; status.json holds the full data."""
+    esc = html.escape
+    services = "\n".join(
+        f'<li><span class="name">{esc(service.name)}</span> '
+        f'<span class="status {esc(service.status.value)}">{esc(_label(service.status.value))}</span></li>'
+        for service in overview.services
+    )
+    incidents = "\n".join(
+        f"<li><strong>{esc(incident.title)}</strong> ({esc(_label(incident.status.value))})"
+        f"<p>{esc(incident.description or '')}</p></li>"
+        for incident in overview.incidents
+    )
+    maintenances = "\n".join(
+        f"<li><strong>{esc(maintenance.title)}</strong> "
+        f"{maintenance.scheduled_start:%Y-%m-%d %H:%M} to {maintenance.scheduled_end:%Y-%m-%d %H:%M} UTC</li>"
+        for maintenance in overview.maintenances
+    )
+    title = esc(f"{organization.name} status")
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>{title}</title>
+<style>
+body {{ font-family: system-ui, sans-serif; max-width: 48rem; margin: 2rem auto; padding: 0 1rem; }}
+.operational {{ color: #15803d; }} .degraded {{ color: #a16207; }}
+.partial_outage {{ color: #c2410c; }} .major_outage {{ color: #b91c1c; }} .maintenance {{ color: #1d4ed8; }}
+li {{ margin: 0.5rem 0; }}
+</style>
+</head>
+<body>
+<h1>{title}</h1>
+<p class="status {esc(overview.overall_status)}">Overall: {esc(_label(overview.overall_status))}</p>
+<h2>Services</h2>
+<ul>
+{services or "<li>No services</li>"}
+</ul>
+<h2>Active incidents</h2>
+<ul>
+{incidents or "<li>No active incidents</li>"}
+</ul>
+<h2>Maintenance</h2>
+<ul>
+{maintenances or "<li>No scheduled maintenance</li>"}
+</ul>
+<p><small>Last updated {overview.last_updated:%Y-%m-%d %H:%M:%S} UTC. <a href="status.json">JSON</a></small></p>
+</body>
+</html>
+""".encode()
+
+
+def publish_organization(organization_id: int, output_dir: str, force: bool = False) -> bool:
+    """
+    Render one organization's status into {output_dir}/{slug}/ as status.json
+    and index.html. Skipped when the data fingerprint matches the version
+    file of the last export. Returns whether anything was written.
+    """
+    db = SessionLocal()
+    try:
+        organization = db.get(OrganizationModel, organization_id)
+        if organization is None:
+            return False
+        now = datetime.utcnow()
+        fingerprint = db.execute(text(_ORGANIZATION_FINGERPRINT), {
+            "organization_id": organization_id,
+            "window_start": now - RECENT_MAINTENANCE_WINDOW,
+        }).scalar()
+        data_version = hashlib.blake2b(fingerprint.encode(), digest_size=16).hexdigest()
+
+        directory = os.path.join(output_dir, organization.slug)
+        os.makedirs(directory, exist_ok=True)
+        if not force and _read(os.path.join(directory, VERSION_FILE)) == data_version:
+            return False
+
+        overview = public_status_overview(db, organization_id, now)
+        write_atomic(os.path.join(directory, "status.json"), overview.model_dump_json().encode())
+        write_atomic(os.path.join(directory, "index.html"), render_html(organization, overview))
+        # Written last: a crash before this point just republishes next run
+        write_atomic(os.path.join(directory, VERSION_FILE), data_version.encode())
+        return True
+    finally:
+        db.close()
+
+
+def publish_all(output_dir: str, workers: int = 4, force: bool = False) -> Dict[str, int]:
+    """Publish every active organization in parallel, one session per export. Returns counts by outcome."""
+    db = SessionLocal()
+    try:
+        organization_ids: List[int] = [
+            organization_id for (organization_id,) in
+            db.query(OrganizationModel.id).filter(OrganizationModel.is_active == True)
+        ]
+    finally:
+        db.close()
+
+    os.makedirs(output_dir, exist_ok=True)
+    counts = {"written": 0, "unchanged": 0, "failed": 0}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(publish_organization, organization_id, output_dir, force): organization_id
+            for organization_id in organization_ids
+        }
+        for future, organization_id in futures.items():
+            try:
+                counts["written" if future.result() else "unchanged"] += 1
+            except Exception:
+                logger.exception("Status export failed for organization %s", organization_id)
+                counts["failed"] += 1
+    return counts
+
+
+def main() -> None:
+    """
+    Export static status pages for every organization, once or continuously:
+
+        python -m app.monitoring.status_export --output /var/www/status --interval 30
+    """
+    parser = argparse.ArgumentParser(description="Export static status pages")
+    parser.add_argument("--output", default=settings.STATUS_EXPORT_DIR, help="directory served by the CDN or web server")
+    parser.add_argument("--workers", type=int, default=settings.STATUS_EXPORT_WORKERS)
+    parser.add_argument("--force", action="store_true", help="rewrite pages even if the data is unchanged")
+    parser.add_argument("--interval", type=float, default=0, help="seconds between runs; 0 runs once")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    while True:
+        started = datetime.utcnow()
+        try:
+            counts = publish_all(args.output, args.workers, args.force)
+            logger.info("Status export at %s: %s", started.isoformat(), counts)
+        except Exception:
+            logger.exception("Status export run failed")
+        if not args.interval:
+            return
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
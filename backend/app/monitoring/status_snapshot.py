@@ -0,0 +1,150 @@
+import hashlib
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, NamedTuple, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+# Every write behind the status pages bumps its organization's event
+# sequence (see EventBus.publish), so the sequences, one small row per
+# organization, version the data without scanning the tables themselves.
+# Identical in every process for the same data.
+_DATA_FINGERPRINT = """
+    SELECT concat_ws(':', count(*), sum(last_sequence)), max(updated_at)
+    FROM organization_event_sequences
+"""
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+class Snapshot(NamedTuple):
+    body: bytes  # encoded JSON response
+    data_version: str  # fingerprint of the data behind every public endpoint
+    last_modified: datetime  # latest change to the data, in UTC
+    built_at: datetime
+    version: int
+
+
+def _digest(value: bytes) -> str:
+    return hashlib.blake2b(value, digest_size=16).hexdigest()
+
+
+class StatusSnapshotCache:
+    """
+    Pre-encoded status page responses.
+
+    Endpoints that change services, incidents, incident updates or
+    maintenances call refresh() after committing, which rebuilds every
+    registered snapshot. Reads are a dict lookup. Snapshots also expire
+    after STATUS_SNAPSHOT_MAX_AGE_SECONDS so changes made by other processes
+    and time-based windows show up; one reader then rebuilds while the
+    others keep serving the previous bytes. An invalidate() that arrives
+    during a rebuild leaves the result stale, since the rebuild may have
+    read the data from before that change.
+
+    When a rebuild fails (the database is down, say) the previous bytes keep
+    being served and further attempts back off exponentially, from
+    STATUS_SNAPSHOT_RETRY_SECONDS up to the max age, so an outage does not
+    turn every status page hit into a database round trip.
+    """
+
+    def __init__(self, max_age_seconds: float, retry_seconds: float = settings.STATUS_SNAPSHOT_RETRY_SECONDS):
+        self.max_age_seconds = max_age_seconds
+        self.retry_seconds = retry_seconds
+        self.failures = 0
+        self._retry_at = 0.0
+        self.version = 0
+        self._builders: Dict[str, Callable[[Session], bytes]] = {}
+        self._snapshots: Dict[str, Snapshot] = {}
+        self._built_monotonic = 0.0
+        self._stale = True
+        self._invalidations = 0
+        self._lock = threading.Lock()
+
+    def register(self, name: str, builder: Callable[[Session], bytes]) -> None:
+        self._builders[name] = builder
+        self.invalidate()
+
+    def invalidate(self) -> None:
+        self._invalidations += 1
+        self._stale = True
+
+    def _expired(self) -> bool:
+        return self._stale or time.monotonic() - self._built_monotonic > self.max_age_seconds
+
+    def _rebuild(self, db: Session) -> None:
+        # An invalidation during the rebuild may be for data it read too early
+        invalidations = self._invalidations
+        fingerprint, changed_at = db.execute(text(_DATA_FINGERPRINT)).one()
+        data_version = _digest(fingerprint.encode())
+        # HTTP dates are UTC with whole seconds
+        if changed_at is None:
+            last_modified = _EPOCH
+        elif changed_at.tzinfo is None:
+            last_modified = changed_at.replace(tzinfo=timezone.utc, microsecond=0)
+        else:
+            last_modified = changed_at.astimezone(timezone.utc).replace(microsecond=0)
+        bodies = {name: builder(db) for name, builder in self._builders.items()}
+        built_at = datetime.utcnow()
+        self.version += 1
+        self._snapshots = {
+            name: Snapshot(body, data_version, last_modified, built_at, self.version)
+            for name, body in bodies.items()
+        }
+        self._built_monotonic = time.monotonic()
+        self._stale = self._invalidations != invalidations
+        self.failures = 0
+
+    def _failed(self) -> None:
+        logger.exception("Status snapshot rebuild failed")
+        self.failures += 1
+        delay = min(self.retry_seconds * 2 ** (self.failures - 1), max(self.max_age_seconds, self.retry_seconds))
+        self._retry_at = time.monotonic() + delay
+
+    def refresh(self, db: Session) -> None:
+        """Write-through rebuild after a change; on failure the next read rebuilds instead."""
+        self.invalidate()
+        try:
+            with self._lock:
+                self._rebuild(db)
+        except Exception:
+            self._failed()
+
+    def peek(self, name: str) -> Optional[Snapshot]:
+        """The snapshot if it is current, without ever blocking or touching the database."""
+        return None if self._expired() else self._snapshots.get(name)
+
+    def get(self, name: str) -> Snapshot:
+        """
+        The snapshot, rebuilding it first if needed. Blocks only while no
+        snapshot exists yet, and only then lets a failed rebuild raise.
+        """
+        snapshot = self._snapshots.get(name)
+        if snapshot is not None and (not self._expired() or time.monotonic() < self._retry_at):
+            return snapshot
+        if self._lock.acquire(blocking=snapshot is None):
+            try:
+                if name not in self._snapshots or self._expired():
+                    db = SessionLocal()
+                    try:
+                        self._rebuild(db)
+                    except Exception:
+                        self._failed()
+                        if name not in self._snapshots:
+                            raise
+                    finally:
+                        db.close()
+            finally:
+                self._lock.release()
+        return self._snapshots[name]
+
+
+status_snapshot = StatusSnapshotCache(settings.STATUS_SNAPSHOT_MAX_AGE_SECONDS)
@@ -50,4 +50,31 @@ class IncidentInDBBase(IncidentBase):
         from_attributes = True
 
 class Incident(IncidentInDBBase):
-    pass
\ No newline at end of file
+    pass
+
+class IncidentTimingStats(BaseModel):
+    incident_count: int
+    resolved_count: int
+    incidents_per_week: float
+    mttr_seconds: Optional[float] = None  # mean time to resolve
+    ttr_p50_seconds: Optional[float] = None
+    ttr_p90_seconds: Optional[float] = None
+    mtta_seconds: Optional[float] = None  # mean time to the first update
+    tta_p50_seconds: Optional[float] = None
+    tta_p90_seconds: Optional[float] = None
+
+class ServiceIncidentAnalytics(IncidentTimingStats):
+    service_id: int
+
+class IncidentWeeklyTrend(IncidentTimingStats):
+    week_start: datetime
+    mttr_4w_seconds: Optional[float] = None  # trailing four weeks
+    mtta_4w_seconds: Optional[float] = None
+
+class IncidentAnalytics(BaseModel):
+    organization_id: Optional[int] = None
+    start: datetime
+    end: datetime
+    overall: IncidentTimingStats
+    services: List[ServiceIncidentAnalytics]
+    weekly: List[IncidentWeeklyTrend]
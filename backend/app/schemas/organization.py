@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional
 from datetime import datetime
 
@@ -8,6 +8,7 @@ class OrganizationBase(BaseModel):
     description: Optional[str] = None
     logo_url: Optional[str] = None
     is_active: Optional[bool] = True
+    metrics_retention_days: int = Field(90, ge=1, le=3650)
 
 class OrganizationCreate(OrganizationBase):
     pass
@@ -17,6 +18,7 @@ class OrganizationUpdate(BaseModel):
     description: Optional[str] = None
     logo_url: Optional[str] = None
     is_active: Optional[bool] = None
+    metrics_retention_days: Optional[int] = Field(None, ge=1, le=3650)
 
 class OrganizationInDBBase(OrganizationBase):
     id: int
@@ -1,10 +1,42 @@
-from pydantic import BaseModel
+import ipaddress
+from pydantic import BaseModel, Field, field_validator, model_validator
 from typing import Optional, List, Any
 from datetime import datetime
-from app.models.service import ServiceStatus
+from urllib.parse import urlsplit
+from app.models.service import ServiceStatus, CheckType, SloType
 from app.schemas.incident import Incident
 from app.schemas.maintenance import Maintenance
 
+def check_target_error(check_type: Optional[CheckType], check_target: Optional[str]) -> Optional[str]:
+    """Why check_target is not a valid target for check_type, or None if it is."""
+    if check_type is None or check_target is None:
+        return None
+    if check_type == CheckType.HTTP:
+        parts = urlsplit(check_target)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            return "An http check needs an http:// or https:// URL"
+        return None
+    host, sep, port = check_target.rpartition(":")
+    host = host.strip("[]")
+    if not sep or not host or not port.isdigit() or not 0 < int(port) < 65536:
+        return f"A {check_type.value} check needs a host:port target"
+    if check_type == CheckType.TCP_IP:
+        try:
+            ipaddress.ip_address(host)
+        except ValueError:
+            return "A tcp_ip check needs an IP address, e.g. 10.0.0.5:5432 or [::1]:5432"
+    return None
+
+def slo_error(slo_type: Optional[SloType], slo_target: Optional[float], latency_threshold_ms: Optional[float]) -> Optional[str]:
+    """Why an SLO configuration can't be evaluated, or None if it can."""
+    if slo_type is None:
+        return None
+    if slo_target is None:
+        return "An SLO needs slo_target"
+    if slo_type == SloType.LATENCY and latency_threshold_ms is None:
+        return "A latency SLO needs slo_latency_threshold_ms"
+    return None
+
 class ServiceBase(BaseModel):
     name: str
     description: Optional[str] = None
@@ -13,13 +45,55 @@ class ServiceBase(BaseModel):
     is_active: bool = True
 
 class ServiceCreate(ServiceBase):
-    pass
+    check_type: Optional[CheckType] = None
+    check_target: Optional[str] = None
+    check_interval_seconds: int = Field(60, ge=5, le=86400)
+    check_timeout_seconds: float = Field(10.0, gt=0, le=60)
+    slo_type: Optional[SloType] = None
+    slo_target: Optional[float] = Field(None, gt=0, lt=100)
+    slo_latency_threshold_ms: Optional[float] = Field(None, gt=0)
+
+    @model_validator(mode="after")
+    def check_probe_and_slo(self) -> "ServiceCreate":
+        error = check_target_error(self.check_type, self.check_target) or slo_error(
+            self.slo_type, self.slo_target, self.slo_latency_threshold_ms
+        )
+        if error:
+            raise ValueError(error)
+        return self
 
 class ServiceUpdate(ServiceBase):
     name: Optional[str] = None
     status: Optional[ServiceStatus] = None
     organization_id: Optional[int] = None
     is_active: Optional[bool] = None
+    check_type: Optional[CheckType] = None
+    check_target: Optional[str] = None
+    check_interval_seconds: Optional[int] = Field(None, ge=5, le=86400)
+    check_timeout_seconds: Optional[float] = Field(None, gt=0, le=60)
+    slo_type: Optional[SloType] = None
+    slo_target: Optional[float] = Field(None, gt=0, lt=100)
+    slo_latency_threshold_ms: Optional[float] = Field(None, gt=0)
+
+    @field_validator("check_interval_seconds", "check_timeout_seconds")
+    @classmethod
+    def not_null(cls, value: Any) -> Any:
+        # Only runs for values that were sent: leave the field out to keep it
+        if value is None:
+            raise ValueError("may be omitted but not null")
+        return value
+
+    @model_validator(mode="after")
+    def check_probe_target(self) -> "ServiceUpdate":
+        # The endpoint checks the updated row as a whole too, since an update
+        # may name only some of the fields that go together
+        error = check_target_error(self.check_type, self.check_target)
+        if error is None and self.slo_type == SloType.LATENCY and self.slo_latency_threshold_ms is None \
+                and "slo_latency_threshold_ms" in self.model_fields_set:
+            error = "A latency SLO needs slo_latency_threshold_ms"
+        if error:
+            raise ValueError(error)
+        return self
 
 class ServiceInDBBase(ServiceBase):
     id: int
@@ -32,6 +106,16 @@ class ServiceInDBBase(ServiceBase):
 class Service(ServiceInDBBase):
     pass
 
+class ServiceAdmin(ServiceInDBBase):
+    """A service with its probe and SLO settings, for the authenticated services API only."""
+    check_type: Optional[CheckType] = None
+    check_target: Optional[str] = None
+    check_interval_seconds: int = 60
+    check_timeout_seconds: float = 10.0
+    slo_type: Optional[SloType] = None
+    slo_target: Optional[float] = None
+    slo_latency_threshold_ms: Optional[float] = None
+
 class TimelineEvent(BaseModel):
     type: str
     id: int
@@ -1,16 +1,16 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import Optional, List
+from typing import Dict, Optional, List
 
 class UptimeMetricBase(BaseModel):
     service_id: int
-    status: str
+    status: str = Field(..., max_length=50)  # uptime_metrics.status is String(50)
     response_time: Optional[float] = None
     is_up: bool = True
     organization_id: int
 
 class UptimeMetricCreate(UptimeMetricBase):
-    pass
+    organization_id: Optional[int] = None  # ignored: a metric belongs to its service's organization
 
 class UptimeMetric(UptimeMetricBase):
     id: int
@@ -40,6 +40,12 @@ class UptimeReport(UptimeReportBase):
     class Config:
         from_attributes = True
 
+class LatencyPercentiles(BaseModel):
+    p50: Optional[float] = None
+    p90: Optional[float] = None
+    p95: Optional[float] = None
+    p99: Optional[float] = None
+
 class UptimeStats(BaseModel):
     service_id: int
     service_name: str
@@ -48,6 +54,9 @@ class UptimeStats(BaseModel):
     uptime_7d: float
     uptime_30d: float
     avg_response_time: Optional[float] = None
+    latency_24h: Optional[LatencyPercentiles] = None
+    latency_7d: Optional[LatencyPercentiles] = None
+    latency_30d: Optional[LatencyPercentiles] = None
     total_incidents_24h: int = 0
     total_incidents_7d: int = 0
     total_incidents_30d: int = 0
@@ -56,13 +65,82 @@ class UptimeStats(BaseModel):
 
 class UptimeGraphData(BaseModel):
     timestamp: datetime
-    uptime_percentage: float
+    uptime_percentage: Optional[float] = None  # None when the bucket has no samples
     status: str
     response_time: Optional[float] = None
+    latency: Optional[LatencyPercentiles] = None
 
 class UptimeMetricsResponse(BaseModel):
     service_id: int
     service_name: str
     current_stats: UptimeStats
     graph_data: List[UptimeGraphData]
-    period: str  # "24h", "7d", "30d" 
\ No newline at end of file
+    period: str  # "24h", "7d", "30d", "90d" or "custom"
+    start: Optional[datetime] = None
+    end: Optional[datetime] = None
+    resolution: Optional[str] = None  # "1m", "1h" or "1d"
+
+class OutageIntervalSchema(BaseModel):
+    id: int
+    service_id: int
+    started_at: datetime
+    ended_at: Optional[datetime] = None  # None while the outage is ongoing
+    failure_count: int
+    last_failure_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class OutageReport(BaseModel):
+    service_id: int
+    start: datetime
+    end: datetime
+    outage_count: int
+    downtime_minutes: float  # within [start, end)
+    longest_outage_minutes: float
+    outages: List[OutageIntervalSchema]
+
+class SloStatus(BaseModel):
+    service_id: int
+    service_name: str
+    slo_type: str  # "availability" or "latency"
+    target: float
+    latency_threshold_ms: Optional[float] = None
+    compliance: Optional[float] = None  # percentage of good samples over the last 30 days
+    error_budget_remaining: float  # fraction of the 30 day budget left, negative once overspent
+    burn_rates: Dict[str, float]  # "1h", "6h", "24h", "30d"
+    status: str  # "ok", "warning", "exhausted" or "critical"
+
+
+class UptimeMetricBatchItem(BaseModel):
+    service_id: int
+    status: str = Field(..., max_length=50)  # uptime_metrics.status is String(50)
+    response_time: Optional[float] = None
+    is_up: bool = True
+    timestamp: Optional[datetime] = None
+
+class UptimeMetricBatchCreate(BaseModel):
+    metrics: List[UptimeMetricBatchItem] = Field(..., min_length=1, max_length=50000)
+
+class UptimeMetricBatchResult(BaseModel):
+    index: int
+    service_id: int
+    success: bool
+    metric_id: Optional[int] = None
+    error: Optional[str] = None
+
+class UptimeMetricBatchResponse(BaseModel):
+    accepted: int
+    rejected: int
+    results: List[UptimeMetricBatchResult]
+
+class UptimeMetricStreamError(BaseModel):
+    line: int
+    service_id: Optional[int] = None
+    error: str
+
+class UptimeMetricStreamResponse(BaseModel):
+    accepted: int
+    rejected: int
+    errors: List[UptimeMetricStreamError] = []
+    errors_truncated: bool = False
@@ -0,0 +1,27 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db.base import Base
+
+
+@pytest.fixture
+def engine():
+    # In-memory SQLite shared by every connection of the test
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    # uptime_metrics is range-partitioned on Postgres; its composite key with
+    # an autoincrement id has no SQLite equivalent, and these tests read rollups
+    tables = [table for table in Base.metadata.sorted_tables if table.name != "uptime_metrics"]
+    Base.metadata.create_all(engine, tables=tables)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db(engine):
+    session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    try:
+        yield session
+    finally:
+        session.close()
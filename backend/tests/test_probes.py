@@ -0,0 +1,176 @@
+import asyncio
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.models.service import CheckType
+from app.monitoring.probes import ProbeConfig, ProbeEngine
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == "/slow":
+            time.sleep(1.0)
+        code = {"/ok": 200, "/redirect": 302, "/error": 503}.get(self.path, 404)
+        self.send_response(code)
+        if code == 302:
+            self.send_header("Location", "/ok")
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def http_stub():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def listening_port():
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.bind(("127.0.0.1", 0))
+    sock.listen()
+    yield sock.getsockname()[1]
+    sock.close()
+
+
+@pytest.fixture
+def closed_port():
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+@pytest.fixture
+def unresponsive_port():
+    # A listener whose backlog is full: further SYNs get no answer, so connects hang
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.bind(("127.0.0.1", 0))
+    sock.listen(0)
+    port = sock.getsockname()[1]
+    filler = socket.create_connection(("127.0.0.1", port))
+    yield port
+    filler.close()
+    sock.close()
+
+
+def _config(check_type, target, timeout_seconds=2.0, service_id=1):
+    return ProbeConfig(
+        service_id=service_id,
+        organization_id=1,
+        check_type=check_type,
+        target=target,
+        timeout_seconds=timeout_seconds,
+    )
+
+
+def _run(*configs):
+    async def run():
+        engine = ProbeEngine(max_concurrency=10, per_host_concurrency=5)
+        try:
+            return await engine.run(list(configs))
+        finally:
+            await engine.aclose()
+
+    return asyncio.run(run())
+
+
+def test_http_up(http_stub):
+    [result] = _run(_config(CheckType.HTTP, f"{http_stub}/ok"))
+    assert result.is_up
+    assert result.error is None
+    assert result.response_time is not None and result.response_time >= 0
+    assert result.status == "operational"
+
+
+def test_http_follows_redirects(http_stub):
+    [result] = _run(_config(CheckType.HTTP, f"{http_stub}/redirect"))
+    assert result.is_up
+
+
+def test_http_error_status_is_down(http_stub):
+    [result] = _run(_config(CheckType.HTTP, f"{http_stub}/error"))
+    assert not result.is_up
+    assert result.status == "major_outage"
+
+
+def test_http_timeout_is_down(http_stub):
+    started = time.perf_counter()
+    [result] = _run(_config(CheckType.HTTP, f"{http_stub}/slow", timeout_seconds=0.2))
+    assert not result.is_up
+    assert result.error
+    assert result.response_time is None
+    assert time.perf_counter() - started < 1.0
+
+
+def test_http_connection_refused_is_down(closed_port):
+    [result] = _run(_config(CheckType.HTTP, f"http://127.0.0.1:{closed_port}/"))
+    assert not result.is_up
+    assert result.error
+
+
+def test_tcp_up_and_down(listening_port, closed_port):
+    up, down = _run(
+        _config(CheckType.TCP, f"localhost:{listening_port}", service_id=1),
+        _config(CheckType.TCP, f"localhost:{closed_port}", service_id=2),
+    )
+    assert (up.service_id, up.is_up) == (1, True)
+    assert (down.service_id, down.is_up) == (2, False)
+
+
+def test_tcp_ip_up_and_down(listening_port, closed_port):
+    up, down = _run(
+        _config(CheckType.TCP_IP, f"127.0.0.1:{listening_port}", service_id=1),
+        _config(CheckType.TCP_IP, f"127.0.0.1:{closed_port}", service_id=2),
+    )
+    assert up.is_up
+    assert not down.is_up
+
+
+def test_tcp_timeout_is_down(unresponsive_port):
+    started = time.perf_counter()
+    [result] = _run(_config(CheckType.TCP_IP, f"127.0.0.1:{unresponsive_port}", timeout_seconds=0.2))
+    assert not result.is_up
+    assert result.response_time is None
+    assert time.perf_counter() - started < 1.0
+
+
+def test_invalid_target_is_down():
+    [result] = _run(_config(CheckType.TCP, "no-port"))
+    assert not result.is_up
+    assert "host:port" in result.error
+
+
+def test_slow_host_does_not_block_other_hosts(http_stub, listening_port):
+    async def run():
+        engine = ProbeEngine(max_concurrency=2, per_host_concurrency=1)
+        try:
+            slow = [
+                asyncio.ensure_future(engine.check(_config(CheckType.HTTP, f"{http_stub}/slow", timeout_seconds=0.5)))
+                for _ in range(4)
+            ]
+            await asyncio.sleep(0)
+            started = time.perf_counter()
+            fast = await engine.check(_config(CheckType.TCP_IP, f"127.0.0.1:{listening_port}", service_id=2))
+            elapsed = time.perf_counter() - started
+            await asyncio.gather(*slow)
+            return fast, elapsed
+        finally:
+            await engine.aclose()
+
+    fast, elapsed = asyncio.run(run())
+    assert fast.is_up
+    assert elapsed < 0.4
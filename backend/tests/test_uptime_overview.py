@@ -0,0 +1,88 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from app.api.v1.endpoints.uptime import get_uptime_overview
+from app.models.incident import IncidentModel, IncidentStatus
+from app.models.maintenance import MaintenanceModel
+from app.models.organization import OrganizationModel
+from app.models.service import ServiceModel
+from app.models.uptime import OutageInterval, UptimeRollupHour
+from app.models.user import UserModel, UserRole
+
+
+def _seed(db, service_count):
+    now = datetime.utcnow()
+    organization = OrganizationModel(name="Acme", slug="acme")
+    db.add(organization)
+    db.flush()
+    user = UserModel(
+        email="viewer@acme.test", hashed_password="x", role=UserRole.VIEWER, organization_id=organization.id
+    )
+    db.add(user)
+    for i in range(service_count):
+        service = ServiceModel(name=f"service-{i}", organization_id=organization.id)
+        db.add(service)
+        db.flush()
+        # Data in every source the overview reads, so any per-service query would show
+        for hours_ago in range(1, 4):
+            db.add(UptimeRollupHour(
+                service_id=service.id, organization_id=organization.id,
+                bucket_start=(now - timedelta(hours=hours_ago)).replace(minute=0, second=0, microsecond=0),
+                sample_count=60, up_count=59, response_time_count=60, response_time_sum=6000.0,
+            ))
+        db.add(IncidentModel(
+            title="Outage", service_id=service.id, organization_id=organization.id,
+            status=IncidentStatus.RESOLVED, created_at=now - timedelta(hours=5), resolved_at=now - timedelta(hours=4),
+        ))
+        db.add(OutageInterval(
+            service_id=service.id, organization_id=organization.id, started_at=now - timedelta(days=2),
+            ended_at=now - timedelta(days=2) + timedelta(minutes=10), failure_count=3,
+            last_failure_at=now - timedelta(days=2) + timedelta(minutes=9),
+        ))
+        db.add(MaintenanceModel(
+            title="Upgrade", service_id=service.id, organization_id=organization.id,
+            scheduled_start=now - timedelta(days=3), scheduled_end=now - timedelta(days=3) + timedelta(hours=1),
+        ))
+    db.commit()
+    return user
+
+
+def _count_overview_queries(engine, db, user):
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        overview = get_uptime_overview(db=db, current_user=user)
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+    return overview, statements
+
+
+@pytest.mark.parametrize("service_count", [1, 25])
+def test_overview_returns_every_service(engine, db, service_count):
+    user = _seed(db, service_count)
+    overview, _ = _count_overview_queries(engine, db, user)
+    assert len(overview) == service_count
+    stats = overview[0]
+    assert stats.total_incidents_24h == 1
+    assert stats.avg_response_time == pytest.approx(100.0)
+    assert stats.uptime_24h < 100.0
+
+
+def test_overview_query_count_is_constant(engine, db):
+    user = _seed(db, 1)
+    _, one = _count_overview_queries(engine, db, user)
+
+    db.query(ServiceModel).delete()
+    db.commit()
+    for i in range(50):
+        db.add(ServiceModel(name=f"more-{i}", organization_id=user.organization_id))
+    db.commit()
+    _, many = _count_overview_queries(engine, db, user)
+
+    assert len(many) == len(one), many